@@ -1,3 +1,6 @@
+import time
+from datetime import timedelta
+
 import pytest
 from flask import json
 from flask_jwt_extended import create_access_token
@@ -73,6 +76,87 @@ def test_unknown_role(client):
     data = json.loads(response.data)
     assert data['error'] == 'Role not recognized'
 
+def test_repeated_token_served_from_cache(client):
+    """Test that a repeated token is verified once and then served from the cache"""
+    with app.app_context():
+        access_token = create_access_token(
+            identity='cached_user',
+            additional_claims={'role': 'Admin'}
+        )
+
+    headers = {'Authorization': f'Bearer {access_token}'}
+    before = client.get('/auth/cache-stats').get_json()
+    for _ in range(3):
+        response = client.get('/auth', headers=headers)
+        assert response.status_code == 200
+
+    stats = client.get('/auth/cache-stats').get_json()
+    assert stats['misses'] - before['misses'] == 1
+    assert stats['hits'] - before['hits'] == 2
+
+def test_cached_token_still_expires(client):
+    """Test that a cached token is rejected once its exp claim has passed"""
+    with app.app_context():
+        access_token = create_access_token(
+            identity='expiring_user',
+            additional_claims={'role': 'User'},
+            expires_delta=timedelta(seconds=1)
+        )
+
+    headers = {'Authorization': f'Bearer {access_token}'}
+    assert client.get('/auth', headers=headers).status_code == 200
+
+    time.sleep(1.5)
+    response = client.get('/auth', headers=headers)
+    assert response.status_code == 401
+    assert json.loads(response.data)['msg'] == 'Token has expired'
+
+def test_batch_introspection(client):
+    """Test per-token results from the batch endpoint, in request order"""
+    with app.app_context():
+        admin_token = create_access_token(identity='admin_user', additional_claims={'role': 'Admin'})
+        user_token = create_access_token(identity='regular_user', additional_claims={'role': 'User'})
+        unknown_token = create_access_token(identity='unknown_user', additional_claims={'role': 'Unknown'})
+        expired_token = create_access_token(
+            identity='expired_user',
+            additional_claims={'role': 'User'},
+            expires_delta=timedelta(seconds=-1)
+        )
+
+    tokens = [admin_token, user_token, unknown_token, 'invalid_token', expired_token, admin_token]
+    response = client.post('/auth/batch', json={'tokens': tokens})
+
+    assert response.status_code == 200
+    results = json.loads(response.data)['results']
+    assert [result['status'] for result in results] == [200, 200, 403, 422, 401, 200]
+    assert "Authorized Admin" in results[0]['message']
+    assert results[0]['identity'] == 'admin_user'
+    assert "Unauthorized Admin" in results[1]['message']
+    assert results[2]['error'] == 'Role not recognized'
+    assert "Not enough segments" in results[3]['msg']
+    assert results[4]['msg'] == 'Token has expired'
+    assert results[5] == results[0]
+
+def test_batch_rejects_bad_body(client):
+    """Test that the batch endpoint requires a bounded list of token strings"""
+    assert client.post('/auth/batch', json={'token': 'x'}).status_code == 400
+    assert client.post('/auth/batch', json={'tokens': [1, 2]}).status_code == 400
+
+    max_tokens = app.config['AUTH_BATCH_MAX_TOKENS']
+    response = client.post('/auth/batch', json={'tokens': ['x'] * (max_tokens + 1)})
+    assert response.status_code == 400
+
 # Additional configuration for running tests
 if __name__ == '__main__':
     pytest.main([__file__])
+
+def test_metrics_report_cache_and_requests(client):
+    """Test that /metrics reports requests per route and the token cache counters"""
+    client.get('/auth', headers={'Authorization': 'Bearer invalid_token'})
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert 'http_requests_total{route="/auth",method="GET",status="422"}' in body
+    assert '# TYPE jwt_cache_hits_total counter' in body
+    assert 'jwt_cache_entries ' in body
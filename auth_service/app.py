@@ -1,16 +1,32 @@
 # auth_service/app.py
 import os
-import ast
 from flask import Flask, jsonify, request
-from flask_jwt_extended import JWTManager, jwt_required, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt, decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException, WrongTokenError
+from jwt.exceptions import PyJWTError
 from werkzeug.exceptions import Unauthorized
-from flasgger import Swagger
-import re
+from common.apidocs import install_apidocs
+from common.jwks import SIGNING_ALGORITHMS, JWKSClient, KeySetUnavailable
+from common.jwt_cache import CachingJWTManager
+from common.json_provider import install_json_provider
+from common.metrics import MetricsRegistry, install_metrics
+from common.profiling import install_profiling
 
 app = Flask(__name__)
 
-# Swagger configuration
-swagger = Swagger(
+# JSON encoding of responses and request bodies: JSON_ENCODER is "auto" (orjson
+# when it is installed, otherwise the standard library), "orjson" or "stdlib"
+app.config["JSON_ENCODER"] = os.environ.get("JSON_ENCODER", "auto")
+install_json_provider(app)
+
+# API docs: Swagger UI at /apidocs/ and the spec at /apispec_1.json. APIDOCS is
+# "lazy" (flasgger loads on the first docs request), "static" (serve the spec
+# precomputed into APIDOCS_SPEC_FILE by python -m common.apidocs), "eager" or "off"
+app.config["APIDOCS"] = os.environ.get("APIDOCS", "lazy")
+app.config["APIDOCS_SPEC_FILE"] = os.environ.get(
+    "APIDOCS_SPEC_FILE", os.path.join(os.path.dirname(__file__), "apispec.json")
+)
+install_apidocs(
     app,
     template={
         "swagger": "2.0",
@@ -34,9 +50,59 @@ swagger = Swagger(
     },
 )
 
-# JWT configuration
+# Prometheus-style metrics served at /metrics
+metrics = MetricsRegistry()
+install_metrics(app, metrics)
+metrics.counter_callback(
+    "jwt_cache_hits_total", "Token verifications served from the verified-token cache.", lambda: jwt.token_cache.hits
+)
+metrics.counter_callback(
+    "jwt_cache_misses_total", "Token verifications that checked the signature.", lambda: jwt.token_cache.misses
+)
+metrics.gauge("jwt_cache_entries", "Verified tokens cached.", lambda: len(jwt.token_cache))
+
+# Opt-in request profiling: profile PROFILE_SAMPLE_RATE of all requests, plus
+# requests whose X-Profile header equals PROFILE_TOKEN, writing "collapsed"
+# stacks or "cprofile" stats per route under PROFILE_DIR. Disabled (and not
+# installed) while both are unset.
+app.config["PROFILE_SAMPLE_RATE"] = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+app.config["PROFILE_TOKEN"] = os.environ.get("PROFILE_TOKEN")
+app.config["PROFILE_FORMAT"] = os.environ.get("PROFILE_FORMAT", "collapsed")
+app.config["PROFILE_DIR"] = os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(__file__), "profiles"))
+install_profiling(app)
+
+# JWT configuration: set JWT_JWKS_URL (e.g. http://user_service:5001/.well-known/jwks.json)
+# to verify RS256/EdDSA tokens locally with the user service's published public
+# keys, refetched every JWKS_MAX_AGE seconds; otherwise tokens are HS256 with JWT_SECRET_KEY
 app.config["JWT_SECRET_KEY"] = "your-secret-key"
-jwt = JWTManager(app)
+app.config["JWT_JWKS_URL"] = os.environ.get("JWT_JWKS_URL")
+app.config["JWKS_MAX_AGE"] = 300
+# Verified-token cache: maximum number of tokens and seconds before a cached
+# token is verified again (entries never outlive the token's exp claim)
+app.config["JWT_CACHE_SIZE"] = 10000
+app.config["JWT_CACHE_MAX_AGE"] = 300
+jwt = CachingJWTManager(
+    app,
+    maxsize=app.config["JWT_CACHE_SIZE"],
+    max_age=app.config["JWT_CACHE_MAX_AGE"],
+)
+if app.config["JWT_JWKS_URL"]:
+    app.config["JWT_ALGORITHM"] = SIGNING_ALGORITHMS[0]
+    app.config["JWT_DECODE_ALGORITHMS"] = list(SIGNING_ALGORITHMS)
+    key_set = JWKSClient(app.config["JWT_JWKS_URL"], max_age=app.config["JWKS_MAX_AGE"])
+    jwt.decode_key_loader(key_set.key_for)
+
+# Maximum number of tokens accepted by one /auth/batch request
+app.config["AUTH_BATCH_MAX_TOKENS"] = 1000
+
+@app.errorhandler(KeySetUnavailable)
+def handle_key_set_unavailable(error):
+    """
+    Tokens cannot be verified until the user service's public keys are fetched.
+    """
+    response = jsonify({"error": "Token signing keys are unavailable, please retry shortly"})
+    response.headers["Retry-After"] = "5"
+    return response, 503
 
 @app.route("/auth", methods=["GET"])
 @jwt_required()
@@ -54,24 +120,92 @@ def get_destinations():
       401:
         description: Missing or invalid JWT token
     """
-    claims = get_jwt()
+    payload, status_code = role_access(get_jwt())
+    return jsonify(payload), status_code
+
+def role_access(claims):
+    """
+    Map the role claim of a verified token to the response body and status code.
+    """
     role = claims.get("role")
 
     # Validate role
     if not role:
-        return jsonify({"error": "Role not found in token."}), 400
+        return {"error": "Role not found in token."}, 400
 
     if role == "Admin":
-        return jsonify(
-            {
-                "message": "Authorized Admin. User can manage destinations like create, update, and delete."
-            }
-        ), 200
+        return {
+            "message": "Authorized Admin. User can manage destinations like create, update, and delete."
+        }, 200
     elif role == "User":
-        return jsonify({"message": "Unauthorized Admin. Administrator privileges are required to access this feature."}), 200
+        return {"message": "Unauthorized Admin. Administrator privileges are required to access this feature."}, 200
     else:
         # If the role is not recognized, return a 403 Forbidden status
-        return jsonify({"error": "Role not recognized"}), 403
+        return {"error": "Role not recognized"}, 403
+
+def introspect_token(encoded_token):
+    """
+    Verify one token and return the result /auth would give for it, using the
+    same error handlers for invalid, malformed and expired tokens.
+    """
+    try:
+        claims = decode_token(encoded_token)
+        if claims.get("type") != "access":
+            raise WrongTokenError("Only non-refresh tokens are allowed")
+    except (JWTExtendedException, PyJWTError) as error:
+        response = app.make_response(app.handle_user_exception(error))
+        return {"status": response.status_code, **response.get_json()}
+    payload, status_code = role_access(claims)
+    return {"status": status_code, "identity": claims.get("sub"), "role": claims.get("role"), **payload}
+
+@app.route("/auth/batch", methods=["POST"])
+def authorize_batch():
+    """
+    Check Role-based Access for Many Tokens
+    ---
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            tokens:
+              type: array
+              items:
+                type: string
+              description: Encoded JWTs, without the "Bearer " prefix
+    responses:
+      200:
+        description: One result per token, in request order, with the status code and body /auth would return for it
+      400:
+        description: Missing tokens list or too many tokens
+    """
+    data = request.get_json(silent=True)
+    tokens = data.get("tokens") if isinstance(data, dict) else None
+    if not isinstance(tokens, list) or not all(isinstance(token, str) for token in tokens):
+        return jsonify({"error": "Body must be an object with a list of token strings under 'tokens'"}), 400
+    max_tokens = app.config["AUTH_BATCH_MAX_TOKENS"]
+    if len(tokens) > max_tokens:
+        return jsonify({"error": f"At most {max_tokens} tokens per batch"}), 400
+
+    # Repeated tokens are only verified once per batch
+    results = {}
+    for token in tokens:
+        if token not in results:
+            results[token] = introspect_token(token)
+    return jsonify({"results": [results[token] for token in tokens]}), 200
+
+@app.route("/auth/cache-stats", methods=["GET"])
+def token_cache_stats():
+    """
+    Get Token Verification Cache Statistics
+    ---
+    responses:
+      200:
+        description: Hit and miss counters and the current size of the verified-token cache
+    """
+    return jsonify(jwt.token_cache.stats()), 200
 
 @app.errorhandler(Unauthorized)
 def handle_unauthorized(error):
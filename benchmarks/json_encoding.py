@@ -0,0 +1,55 @@
+# benchmarks/json_encoding.py
+"""
+Measure the cost of encoding a GET /destinations page with Flask's standard
+library provider, with orjson, and by joining cached per-destination
+encodings, as the destination service does.
+
+    python -m benchmarks.json_encoding --page-sizes 20 100 1000 --iterations 2000
+"""
+import argparse
+import json
+import timeit
+
+from flask import Flask
+
+from benchmarks.snapshot_load import make_destinations
+from common.json_provider import FastJSONProvider, orjson
+from destination_service.store import DestinationStore
+
+
+def per_call_us(func, iterations):
+    return round(timeit.timeit(func, number=iterations) / iterations * 1e6, 2)
+
+
+def run(page_sizes, iterations):
+    app = Flask(__name__)
+    stdlib = FastJSONProvider(app, use_orjson=False)
+    fast = FastJSONProvider(app, use_orjson=True) if orjson is not None else stdlib
+    results = []
+    for size in page_sizes:
+        store = DestinationStore(make_destinations(size))
+        page = {"destinations": store.list(), "next_cursor": str(size)}
+
+        def joined():
+            items = b",".join(store.encode_all(page["destinations"], fast.dumps_bytes))
+            return b'{"destinations":[' + items + b'],"next_cursor":' + fast.dumps_bytes(page["next_cursor"]) + b"}"
+
+        assert json.loads(joined()) == json.loads(stdlib.dumps_bytes(page))
+        results.append(
+            {
+                "page_size": size,
+                "orjson_installed": orjson is not None,
+                "stdlib_us": per_call_us(lambda: stdlib.dumps_bytes(page), iterations),
+                "orjson_us": per_call_us(lambda: fast.dumps_bytes(page), iterations),
+                "cached_records_us": per_call_us(joined, iterations),
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[20, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.page_sizes, args.iterations), indent=2))
@@ -0,0 +1,66 @@
+# benchmarks/jwt_validation.py
+"""
+Measure token validations per second with full signature verification and
+with the verified-token cache, over a pool of distinct tokens.
+
+    python -m benchmarks.jwt_validation --tokens 1000 --validations 100000
+"""
+import argparse
+import json
+import random
+import time
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token, decode_token
+
+from common.jwt_cache import CachingJWTManager
+
+
+def make_app(manager, cache_size):
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "benchmark-secret-key-of-at-least-32-bytes"
+    if manager is CachingJWTManager:
+        return app, manager(app, maxsize=cache_size)
+    return app, manager(app)
+
+
+def validations_per_second(app, tokens, validations):
+    with app.app_context():
+        order = [random.choice(tokens) for _ in range(validations)]
+        start = time.perf_counter()
+        for token in order:
+            decode_token(token)
+        elapsed = time.perf_counter() - start
+    return validations / elapsed
+
+
+def run(token_count, validations, cache_size):
+    uncached, _ = make_app(JWTManager, cache_size)
+    cached, cached_manager = make_app(CachingJWTManager, cache_size)
+    with uncached.app_context():
+        tokens = [
+            create_access_token(identity=f"user{i}@example.com", additional_claims={"role": "User"})
+            for i in range(token_count)
+        ]
+
+    full = validations_per_second(uncached, tokens, validations)
+    fast = validations_per_second(cached, tokens, validations)
+    stats = cached_manager.token_cache.stats()
+    return {
+        "tokens": token_count,
+        "validations": validations,
+        "cache_size": cache_size,
+        "verify_per_sec": round(full),
+        "cached_per_sec": round(fast),
+        "speedup": round(fast / full, 2),
+        "cache": stats,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=1_000)
+    parser.add_argument("--validations", type=int, default=100_000)
+    parser.add_argument("--cache-size", type=int, default=10_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.tokens, args.validations, args.cache_size), indent=2))
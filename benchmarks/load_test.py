@@ -0,0 +1,313 @@
+# benchmarks/load_test.py
+"""
+Load-test all three services together: seed the user and destination stores
+at each scale, serve every service under gunicorn, and drive each endpoint
+with concurrent keep-alive clients. Reports latency percentiles and RPS per
+endpoint as JSON.
+
+    python -m benchmarks.load_test --records 1000 100000 1000000 \\
+        --requests 2000 --hash-requests 200 --concurrency 16 --workers 2
+
+The services run from a temporary DATA_DIR and JWT_KEYS_DIR, so the seeded
+records never touch the data files in the repository. Request parameters
+come from a seeded random generator, so two runs with the same arguments
+send the same requests.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from benchmarks.serving_throughput import REPO_ROOT, free_port
+from common.snapshot import write_snapshot
+from user_service.passwords import PasswordHasher
+
+SEED_PASSWORD = "Password123"
+ADMIN_EMAIL = "load-admin@example.com"
+LOCATIONS = ("Indonesia", "France", "Japan", "Peru", "Kenya", "Italy", "Canada", "Chile")
+PAGE_SIZE = 20
+
+
+def seed_email(i):
+    return f"seed{i}@example.com"
+
+
+def destination_id(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def seed_stores(directory, records, rng):
+    """
+    Write user and destination snapshots with records entries each, and
+    return the seeded destination ids. Every seeded user shares one password
+    hash, made with the service's default method.
+    """
+    password_hash = PasswordHasher(workers=0).hash(SEED_PASSWORD)
+    users = (
+        {"email": seed_email(i), "name": f"Seed User {i}", "password": password_hash, "role": "User"}
+        for i in range(records)
+    )
+    admin = {"email": ADMIN_EMAIL, "name": "Load Admin", "password": password_hash, "role": "Admin"}
+    write_snapshot(os.path.join(directory, "user_data.jsonl"), "users", [admin, *users])
+
+    ids = [destination_id(rng) for _ in range(records)]
+    destinations = (
+        {
+            "id": id,
+            "name": f"Destination {i}",
+            "description": "A seeded destination for load testing",
+            "location": LOCATIONS[i % len(LOCATIONS)],
+            "price_per_night": 50.0 + i % 950,
+        }
+        for i, id in enumerate(ids)
+    )
+    write_snapshot(os.path.join(directory, "destination_data.jsonl"), "destinations", destinations)
+    return ids
+
+
+def start_service(service, port, workers, env):
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+         "-b", f"127.0.0.1:{port}", f"{service}.app:app"],
+        cwd=REPO_ROOT,
+        env={**os.environ, **env, "SERVICE_WORKERS": str(workers)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_until_serving(port, path, timeout):
+    """
+    Poll path until it answers, so the worker has loaded its store; return
+    the seconds it took.
+    """
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            if response.status < 500:
+                return time.monotonic() - start
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Service did not start serving {path} on port {port}")
+
+
+def send(connection, method, path, body=None, token=None):
+    headers = {}
+    if body is not None:
+        body = json.dumps(body)
+        headers["Content-Type"] = "application/json"
+    if token is not None:
+        headers["Authorization"] = f"Bearer {token}"
+    connection.request(method, path, body=body, headers=headers)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+def login(port, email):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    status, body = send(connection, "POST", "/login", {"email": email, "password": SEED_PASSWORD})
+    connection.close()
+    if status != 200:
+        raise RuntimeError(f"Login as {email} failed with {status}: {body[:200]!r}")
+    return json.loads(body)["token"]
+
+
+def percentile(ordered, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def drive(port, calls, expected, concurrency):
+    """
+    Send calls, a list of (method, path, body, token), over concurrency
+    keep-alive connections. Returns the endpoint's latency and error summary.
+    """
+    next_call = count()
+    lock = threading.Lock()
+    latencies = []
+    errors = {}
+
+    def client(_):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        timings = []
+        failures = {}
+        while True:
+            index = next(next_call)
+            if index >= len(calls):
+                break
+            method, path, body, token = calls[index]
+            start = time.perf_counter()
+            try:
+                status, _ = send(connection, method, path, body, token)
+            except (OSError, http.client.HTTPException) as error:
+                status = type(error).__name__
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port)
+            timings.append(time.perf_counter() - start)
+            if status != expected:
+                failures[str(status)] = failures.get(str(status), 0) + 1
+        connection.close()
+        with lock:
+            latencies.extend(timings)
+            for status, failed in failures.items():
+                errors[status] = errors.get(status, 0) + failed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    to_ms = lambda seconds: None if seconds is None else round(seconds * 1000, 3)
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors.values()),
+        "error_statuses": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": to_ms(percentile(latencies, 0.50)),
+        "p95_ms": to_ms(percentile(latencies, 0.95)),
+        "p99_ms": to_ms(percentile(latencies, 0.99)),
+        "max_ms": to_ms(latencies[-1] if latencies else None),
+    }
+
+
+def plan_calls(records, ids, requests, hash_requests, rng, user_token, admin_token):
+    """
+    Build the request list of every endpoint, in the order they are driven:
+    (endpoint, port name, calls, expected status).
+    """
+    new_user = lambda i: {
+        "email": f"load{i}@example.com",
+        "password": SEED_PASSWORD,
+        "name": f"Load User {i}",
+        "role": "User",
+    }
+    new_destination = lambda i: {
+        "name": f"Load Destination {i}",
+        "description": "Added during a load test",
+        "location": rng.choice(LOCATIONS),
+        "price_per_night": round(rng.uniform(20, 1000), 2),
+    }
+    page = lambda: f"/destinations?limit={PAGE_SIZE}&cursor={rng.choice(ids[:-PAGE_SIZE] or ids)}"
+    deleted = rng.sample(ids, min(requests, len(ids)))
+    return [
+        ("POST /register", "user", [("POST", "/register", new_user(i), None) for i in range(hash_requests)], 201),
+        ("POST /login", "user", [
+            ("POST", "/login", {"email": seed_email(rng.randrange(records)), "password": SEED_PASSWORD}, None)
+            for _ in range(hash_requests)
+        ], 200),
+        ("GET /profile", "user", [("GET", "/profile", None, user_token)] * requests, 200),
+        ("GET /auth", "auth", [("GET", "/auth", None, user_token)] * requests, 200),
+        ("GET /destinations", "destination", [("GET", page(), None, None) for _ in range(requests)], 200),
+        ("POST /addDestinations", "destination", [
+            ("POST", "/addDestinations", new_destination(i), admin_token) for i in range(requests)
+        ], 201),
+        ("DELETE /destinations/<id>", "destination", [
+            ("DELETE", f"/destinations/{id}", None, admin_token) for id in deleted
+        ], 200),
+    ]
+
+
+def run_scale(records, requests, hash_requests, concurrency, workers, seed, startup_timeout):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        seed_start = time.perf_counter()
+        ids = seed_stores(directory, records, rng)
+        seed_seconds = time.perf_counter() - seed_start
+
+        ports = {"user": free_port(), "destination": free_port(), "auth": free_port()}
+        jwks_url = f"http://127.0.0.1:{ports['user']}/.well-known/jwks.json"
+        env = {"DATA_DIR": directory, "JWT_ALGORITHM": "RS256", "JWT_KEYS_DIR": os.path.join(directory, "jwt_keys")}
+        processes = []
+        try:
+            startup = {}
+            processes.append(start_service("user_service", ports["user"], workers, env))
+            # The JWKS answers only once the user store is loaded
+            startup["user_service"] = wait_until_serving(ports["user"], "/.well-known/jwks.json", startup_timeout)
+            env["JWT_JWKS_URL"] = jwks_url
+            processes.append(start_service("destination_service", ports["destination"], workers, env))
+            processes.append(start_service("auth_service", ports["auth"], workers, env))
+            startup["destination_service"] = wait_until_serving(
+                ports["destination"], f"/destinations?limit={PAGE_SIZE}", startup_timeout
+            )
+            startup["auth_service"] = wait_until_serving(ports["auth"], "/auth/cache-stats", startup_timeout)
+
+            user_token = login(ports["user"], seed_email(0))
+            admin_token = login(ports["user"], ADMIN_EMAIL)
+            plan = plan_calls(records, ids, requests, hash_requests, rng, user_token, admin_token)
+
+            endpoints = []
+            for endpoint, service, calls, expected in plan:
+                if endpoint.startswith("GET"):
+                    # Warm every worker's connections and caches before measuring
+                    drive(ports[service], calls[: concurrency * workers], expected, concurrency)
+                endpoints.append({"endpoint": endpoint, **drive(ports[service], calls, expected, concurrency)})
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+
+    return {
+        "records": records,
+        "seed_seconds": round(seed_seconds, 3),
+        "startup_seconds": {service: round(seconds, 3) for service, seconds in startup.items()},
+        "endpoints": endpoints,
+    }
+
+
+def run(scales, requests, hash_requests, concurrency, workers, seed, startup_timeout):
+    return {
+        "config": {
+            "requests": requests,
+            "hash_requests": hash_requests,
+            "concurrency": concurrency,
+            "workers": workers,
+            "seed": seed,
+        },
+        "results": [
+            run_scale(records, requests, hash_requests, concurrency, workers, seed, startup_timeout)
+            for records in scales
+        ],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, nargs="+", default=[1_000, 100_000],
+                        help="seeded users and destinations per scale (at least 1)")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint")
+    parser.add_argument("--hash-requests", type=int, default=200,
+                        help="requests for /register and /login, which hash a password each")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers per service")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+    report = run(args.records, args.requests, args.hash_requests, args.concurrency, args.workers, args.seed,
+                 args.startup_timeout)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
@@ -0,0 +1,59 @@
+# benchmarks/login_lookup.py
+"""
+Compare the per-login user lookup cost of the old linear scan with the
+UserStore email index as the user base grows.
+
+    python -m benchmarks.login_lookup --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import json
+import random
+import timeit
+
+from user_service.store import UserStore
+
+
+def make_users(count):
+    return [
+        {"email": f"user{i}@example.com", "name": "John Doe", "password": "x", "role": "User"}
+        for i in range(count)
+    ]
+
+
+def run(sizes, lookups):
+    results = []
+    for size in sizes:
+        users = make_users(size)
+        store = UserStore(users)
+        emails = [f"user{random.randrange(size)}@example.com" for _ in range(lookups)]
+
+        def indexed():
+            for email in emails:
+                store.get(email)
+
+        # The linear scan is only measured on a few lookups at large sizes
+        scan_lookups = max(1, min(lookups, 10_000_000 // size))
+        scan_emails = emails[:scan_lookups]
+
+        def linear_scan_sample():
+            for email in scan_emails:
+                next((u for u in users if u["email"] == email), None)
+
+        scan_seconds = timeit.timeit(linear_scan_sample, number=1) / scan_lookups
+        index_seconds = timeit.timeit(indexed, number=1) / lookups
+        results.append(
+            {
+                "users": size,
+                "linear_scan_us": round(scan_seconds * 1e6, 3),
+                "indexed_us": round(index_seconds * 1e6, 3),
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.lookups), indent=2))
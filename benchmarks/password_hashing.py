@@ -0,0 +1,57 @@
+# benchmarks/password_hashing.py
+"""
+Measure login password verification throughput (logins/sec) and bulk
+provisioning hash throughput (hash_many) through the PasswordHasher pool for
+a range of worker counts.
+
+    python -m benchmarks.password_hashing --workers 0 1 2 4 --logins 200 --bulk 200
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from user_service.passwords import PasswordHasher
+
+
+def run(worker_counts, logins, bulk, method):
+    results = []
+    for workers in worker_counts:
+        hasher = PasswordHasher(method=method, workers=workers, max_pending=logins)
+        pwhash = hasher.hash("Password123")
+        # Warm the pool so process start-up is not measured
+        hasher.verify(pwhash, "Password123")
+
+        # Request threads submit concurrently, like a threaded WSGI server
+        with ThreadPoolExecutor(max_workers=max(workers, 1) * 2) as clients:
+            start = time.perf_counter()
+            assert all(clients.map(lambda _: hasher.verify(pwhash, "Password123"), range(logins)))
+            seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        hasher.hash_many(f"Password{i}" for i in range(bulk))
+        bulk_seconds = time.perf_counter() - start
+        hasher.shutdown()
+
+        logins_per_second = logins / seconds
+        results.append(
+            {
+                "workers": workers,
+                "method": method,
+                "logins_per_second": round(logins_per_second, 1),
+                "logins_per_second_per_core": round(logins_per_second / max(workers, 1), 1),
+                "bulk_hashes_per_second": round(bulk / bulk_seconds, 1),
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, os.cpu_count() or 1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--bulk", type=int, default=200)
+    parser.add_argument("--method", default="scrypt:32768:8:1")
+    args = parser.parse_args()
+    print(json.dumps(run(args.workers, args.logins, args.bulk, args.method), indent=2))
@@ -0,0 +1,81 @@
+# benchmarks/record_memory.py
+"""
+Compare the memory held per user and destination as plain dicts, the layout
+the stores used before, and as the slotted records they keep now.
+
+    python -m benchmarks.record_memory --records 100000
+
+Records are decoded from JSON lines as the stores load them, so each dict
+has its own key and value strings, as it does after a real load.
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks.snapshot_load import make_destinations
+from destination_service.store import Destination
+from user_service.store import User
+
+ROLES = ("User", "Admin")
+
+
+def make_users(count):
+    return [
+        {
+            "email": f"user{i}@example.com",
+            "name": f"User {i}",
+            "password": "scrypt:32768:8:1$salt$" + "0" * 64,
+            "role": ROLES[i % 20 == 0],
+        }
+        for i in range(count)
+    ]
+
+
+def measure(lines, build):
+    """
+    Decode lines with build and return (bytes held per record, seconds).
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    held = [build(json.loads(line)) for line in lines]
+    seconds = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The list of references is the same for both layouts
+    per_record = (size - len(held) * 8) / len(held)
+    del held
+    return per_record, seconds
+
+
+def run(count):
+    results = []
+    for kind, records, record_type in (
+        ("user", make_users(count), User),
+        ("destination", make_destinations(count), Destination),
+    ):
+        lines = [json.dumps(record) for record in records]
+        del records
+        dict_bytes, dict_seconds = measure(lines, lambda record: record)
+        slot_bytes, slot_seconds = measure(lines, record_type.from_dict)
+        results.append(
+            {
+                "record": kind,
+                "records": count,
+                "dict_bytes_per_record": round(dict_bytes, 1),
+                "slots_bytes_per_record": round(slot_bytes, 1),
+                "saved_percent": round(100 * (1 - slot_bytes / dict_bytes), 1),
+                "dict_load_seconds": round(dict_seconds, 3),
+                "slots_load_seconds": round(slot_seconds, 3),
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.records), indent=2))
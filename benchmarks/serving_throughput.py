@@ -0,0 +1,93 @@
+# benchmarks/serving_throughput.py
+"""
+Load-test a service under gunicorn with increasing worker counts to check
+that throughput scales with cores.
+
+    python -m benchmarks.serving_throughput --service destination_service \\
+        --path "/destinations?limit=20" --workers 1 2 4 --requests 5000
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Service did not start on port {port}")
+
+
+def drive(port, path, requests, concurrency):
+    """
+    Send requests GETs over concurrency keep-alive connections; return RPS.
+    """
+    per_client = requests // concurrency
+
+    def client(_):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        for _ in range(per_client):
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            assert response.status == 200, response.status
+        connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    return per_client * concurrency / (time.perf_counter() - start)
+
+
+def run(service, path, worker_counts, requests, concurrency):
+    results = []
+    for workers in worker_counts:
+        port = free_port()
+        env = {**os.environ, "SERVICE_WORKERS": str(workers)}
+        process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+             "-b", f"127.0.0.1:{port}", f"{service}.app:app"],
+            cwd=REPO_ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_ready(port)
+            # Warm every worker before measuring
+            drive(port, path, concurrency * workers, concurrency)
+            rps = drive(port, path, requests, concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+        results.append({"service": service, "path": path, "workers": workers, "rps": round(rps, 1)})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--service", default="destination_service")
+    parser.add_argument("--path", default="/destinations?limit=20")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    print(json.dumps(run(args.service, args.path, args.workers, args.requests, args.concurrency), indent=2))
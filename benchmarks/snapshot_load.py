@@ -0,0 +1,75 @@
+# benchmarks/snapshot_load.py
+"""
+Compare store load time for the legacy Python data files and the
+JSON-lines snapshot format.
+
+    python -m benchmarks.snapshot_load --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import uuid
+
+from common.snapshot import read_legacy_snapshot, read_snapshot, write_snapshot
+
+
+def make_destinations(count):
+    """
+    Build count destination records shaped like the ones the service stores.
+    """
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Destination {i}",
+            "description": "A tropical paradise",
+            "location": "Indonesia",
+            "price_per_night": 100.0 + i % 500,
+        }
+        for i in range(count)
+    ]
+
+
+def time_call(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(sizes):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_path = os.path.join(directory, "destination_data.py")
+        snapshot_path = os.path.join(directory, "destination_data.jsonl")
+        for size in sizes:
+            records = make_destinations(size)
+            with open(legacy_path, "w") as file:
+                file.write(f"destinations = {records}")
+            write_snapshot(snapshot_path, "destinations", records)
+            del records
+
+            legacy_seconds, loaded = time_call(lambda: read_legacy_snapshot(legacy_path))
+            assert len(loaded) == size
+            del loaded
+            snapshot_seconds, loaded = time_call(lambda: list(read_snapshot(snapshot_path)))
+            assert len(loaded) == size
+            del loaded
+
+            results.append(
+                {
+                    "records": size,
+                    "legacy_seconds": round(legacy_seconds, 4),
+                    "snapshot_seconds": round(snapshot_seconds, 4),
+                    "legacy_bytes": os.path.getsize(legacy_path),
+                    "snapshot_bytes": os.path.getsize(snapshot_path),
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes), indent=2))
@@ -0,0 +1,89 @@
+# benchmarks/startup.py
+"""
+Report the import time of each service, -X importtime style, so startup
+regressions show up before they slow down autoscaling.
+
+    python -m benchmarks.startup --services user_service auth_service --modes lazy eager --runs 5
+
+Every run imports the service app in a fresh interpreter. The report gives
+the median total import time and the modules with the largest cumulative
+import time in the median run, grouped by top-level package.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.serving_throughput import REPO_ROOT
+
+SERVICES = ("user_service", "destination_service", "auth_service")
+
+
+def import_times(service, mode):
+    """
+    Import service.app once with -X importtime and return {module: (self_us, cumulative_us)}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {service}.app"],
+        cwd=REPO_ROOT,
+        env={**os.environ, "APIDOCS": mode},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def package_totals(times):
+    """
+    Sum the self time of every imported module per top-level package.
+    """
+    totals = {}
+    for name, (self_us, _) in times.items():
+        package = name.split(".", 1)[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return totals
+
+
+def run(services, modes, runs, top):
+    results = []
+    for service in services:
+        for mode in modes:
+            samples = sorted(
+                (import_times(service, mode) for _ in range(runs)),
+                key=lambda times: times[f"{service}.app"][1],
+            )
+            median = samples[len(samples) // 2]
+            totals = package_totals(median)
+            results.append(
+                {
+                    "service": service,
+                    "apidocs": mode,
+                    "import_ms": round(statistics.median(t[f"{service}.app"][1] for t in samples) / 1000, 1),
+                    "modules": len(median),
+                    "flasgger_imported": "flasgger" in median,
+                    "top_packages_ms": {
+                        package: round(us / 1000, 1)
+                        for package, us in sorted(totals.items(), key=lambda item: -item[1])[:top]
+                    },
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--services", nargs="+", choices=SERVICES, default=list(SERVICES))
+    parser.add_argument("--modes", nargs="+", choices=["lazy", "eager", "off"], default=["lazy", "eager"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="number of top-level packages listed")
+    args = parser.parse_args()
+    print(json.dumps(run(args.services, args.modes, args.runs, args.top), indent=2))
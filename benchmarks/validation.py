@@ -0,0 +1,89 @@
+# benchmarks/validation.py
+"""
+Measure the per-request cost of validating registration and destination
+bodies. Compares the old inline checks, which rebuilt their regexes on every
+call, a generic jsonschema validator run on the same schemas, and the shared
+compiled validators.
+
+    python -m benchmarks.validation --iterations 20000
+"""
+import argparse
+import json
+import re
+import timeit
+
+from jsonschema import Draft202012Validator
+
+from common.validation import DESTINATION_SCHEMA, USER_SCHEMA, destination_validator, user_validator
+
+USER_BODIES = {
+    "valid": {"email": "user@example.com", "password": "Password123", "name": "John Doe", "role": "User"},
+    "invalid": {"email": "not-an-email", "password": "short", "name": "John Doe", "role": "Root"},
+}
+DESTINATION_BODIES = {
+    "valid": {"name": "Bali", "description": "A tropical paradise", "location": "Indonesia", "price_per_night": 200.5},
+    "invalid": {"name": "Ba", "description": "Too short", "location": "Nowhere", "price_per_night": "abc"},
+}
+
+
+def inline_user_check(data):
+    """The checks register_user ran before the shared validators."""
+    required_fields = ["email", "password", "name", "role"]
+    missing_fields = [field for field in required_fields if not data.get(field)]
+    if missing_fields:
+        return {"error": f"Missing fields: {', '.join(missing_fields)}"}
+    email_regex = r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)"
+    if not re.match(email_regex, data.get("email", "")):
+        return {"error": "Invalid email format"}
+    if len(data["password"]) < 8 or not re.search(r"[A-Z]", data["password"]) or not re.search(r"[0-9]", data["password"]):
+        return {"error": "Password must be at least 8 characters long, include 1 uppercase letter and 1 number"}
+    if data["role"] not in ["User", "Admin"]:
+        return {"error": "Invalid role. Allowed roles: User, Admin"}
+    return None
+
+
+def inline_destination_check(data):
+    """The checks validate_destination_data ran before the shared validators."""
+    required_fields = ["name", "description", "location", "price_per_night"]
+    missing_fields = [field for field in required_fields if not data.get(field)]
+    if missing_fields:
+        return {"error": f"Missing fields: {', '.join(missing_fields)}"}
+    if len(data["name"]) < 3:
+        return {"error": "Destination name must be at least 3 characters long."}
+    try:
+        if float(data["price_per_night"]) <= 0:
+            return {"error": "Price per night must be a positive number."}
+    except ValueError:
+        return {"error": "Invalid price format."}
+    return None
+
+
+def per_call_us(func, body, iterations):
+    return round(timeit.timeit(lambda: func(body), number=iterations) / iterations * 1e6, 3)
+
+
+def run(iterations):
+    results = []
+    for kind, inline, validator, schema, bodies in (
+        ("user", inline_user_check, user_validator, USER_SCHEMA, USER_BODIES),
+        ("destination", inline_destination_check, destination_validator, DESTINATION_SCHEMA, DESTINATION_BODIES),
+    ):
+        generic = Draft202012Validator(schema)
+        for case, body in bodies.items():
+            results.append(
+                {
+                    "body": f"{kind}/{case}",
+                    "inline_us": per_call_us(inline, body, iterations),
+                    "jsonschema_us": per_call_us(lambda data: list(generic.iter_errors(data)), body, iterations),
+                    "compiled_us": per_call_us(validator.validate, body, iterations),
+                    "errors_reported": len(validator.errors(body)),
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
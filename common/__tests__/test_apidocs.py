@@ -0,0 +1,67 @@
+import pytest
+from flask import Flask
+
+from common.apidocs import install_apidocs
+
+TEMPLATE = {"swagger": "2.0", "info": {"title": "Test API", "version": "1.0.0"}}
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    install_apidocs(app, template=TEMPLATE)
+
+    @app.route("/items", methods=["GET"])
+    def items():
+        """
+        List Items
+        ---
+        responses:
+          200:
+            description: Every item
+        """
+        return {"items": []}
+
+    return app
+
+
+def test_lazy_spec_matches_eager():
+    """Test that the lazily built spec is the one flasgger builds at import."""
+    lazy = make_app(APIDOCS="lazy").test_client().get("/apispec_1.json")
+    eager = make_app(APIDOCS="eager").test_client().get("/apispec_1.json")
+
+    assert lazy.status_code == 200
+    assert lazy.get_json() == eager.get_json()
+    assert lazy.get_json()["paths"]["/items"]["get"]["summary"] == "List Items"
+
+
+def test_lazy_serves_swagger_ui():
+    """Test that the Swagger UI page and its assets are served by the docs app."""
+    client = make_app(APIDOCS="lazy").test_client()
+
+    page = client.get("/apidocs/")
+    assert page.status_code == 200
+    assert b"/apispec_1.json" in page.data
+    assert client.get("/flasgger_static/swagger-ui.css").status_code == 200
+    assert client.get("/items").get_json() == {"items": []}
+
+
+def test_static_serves_precomputed_spec(tmp_path):
+    """Test that static mode serves the spec file, and builds the spec when it is missing."""
+    spec_file = tmp_path / "apispec.json"
+    spec_file.write_text('{"swagger": "2.0", "paths": {}}')
+
+    response = make_app(APIDOCS="static", APIDOCS_SPEC_FILE=str(spec_file)).test_client().get("/apispec_1.json")
+    assert response.get_json() == {"swagger": "2.0", "paths": {}}
+
+    missing = make_app(APIDOCS="static", APIDOCS_SPEC_FILE=str(tmp_path / "missing.json"))
+    assert "/items" in missing.test_client().get("/apispec_1.json").get_json()["paths"]
+
+
+def test_off_and_unknown_modes():
+    """Test that docs can be turned off and that unknown modes are rejected."""
+    client = make_app(APIDOCS="off").test_client()
+    assert client.get("/apispec_1.json").status_code == 404
+    assert client.get("/apidocs/").status_code == 404
+    with pytest.raises(ValueError):
+        make_app(APIDOCS="fast")
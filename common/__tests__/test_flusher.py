@@ -0,0 +1,60 @@
+import threading
+from common.flusher import BackgroundFlusher
+
+
+class CountingFlush:
+    """Flush callback that records how often it ran."""
+
+    def __init__(self):
+        self.calls = 0
+        self.called = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.called.set()
+
+
+def test_synchronous_flush_with_zero_interval():
+    """Test that an interval of 0 flushes on every mutation."""
+    flush = CountingFlush()
+    flusher = BackgroundFlusher(flush, interval=0)
+
+    flusher.mark_dirty()
+    flusher.mark_dirty()
+    assert flush.calls == 2
+    assert not flusher.dirty
+
+
+def test_flush_skipped_when_clean():
+    """Test that flushing a clean store does no work."""
+    flush = CountingFlush()
+    flusher = BackgroundFlusher(flush, interval=60)
+
+    flusher.flush()
+    assert flush.calls == 0
+
+
+def test_mutations_are_coalesced():
+    """Test that many mutations below the threshold produce one flush."""
+    flush = CountingFlush()
+    flusher = BackgroundFlusher(flush, interval=60, max_pending=1000)
+
+    for _ in range(50):
+        flusher.mark_dirty()
+    assert flush.calls == 0
+    assert flusher.dirty
+
+    flusher.stop()
+    assert flush.calls == 1
+    assert not flusher.dirty
+
+
+def test_count_threshold_wakes_flusher():
+    """Test that reaching max_pending flushes before the interval elapses."""
+    flush = CountingFlush()
+    flusher = BackgroundFlusher(flush, interval=60, max_pending=3)
+
+    for _ in range(3):
+        flusher.mark_dirty()
+    assert flush.called.wait(timeout=5)
+    flusher.stop()
@@ -0,0 +1,69 @@
+import datetime
+import decimal
+import json
+import uuid
+
+import pytest
+from flask import Flask, jsonify
+
+from common.json_provider import FastJSONProvider, install_json_provider
+
+SAMPLE = {
+    "name": "Bali",
+    "price_per_night": 200.5,
+    "tags": ["beach", None, True],
+    "created": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+    "deposit": decimal.Decimal("10.50"),
+    "id": uuid.UUID("3f6b13f5-84d8-4e5d-b178-e2e4c9c69b33"),
+    "counts": {2: "two", 1: "one"},
+    "huge": 2**70,
+}
+
+
+def providers():
+    app = Flask(__name__)
+    return FastJSONProvider(app, use_orjson=True), FastJSONProvider(app, use_orjson=False)
+
+
+def test_orjson_matches_stdlib_output():
+    """Test that both encoders produce the same compact, sorted JSON."""
+    fast, stdlib = providers()
+
+    assert fast.dumps_bytes(SAMPLE) == stdlib.dumps_bytes(SAMPLE)
+    assert json.loads(fast.dumps(SAMPLE)) == json.loads(stdlib.dumps(SAMPLE))
+    assert json.loads(fast.dumps(SAMPLE))["created"] == "Wed, 01 May 2024 12:30:00 GMT"
+    assert fast.loads(b'{"a": [1, 2.5, "x"]}') == {"a": [1, 2.5, "x"]}
+    with pytest.raises(ValueError):
+        fast.loads("{not json")
+
+
+def test_non_ascii_is_equivalent():
+    """Test that orjson's raw UTF-8 decodes to the same value as stdlib's escapes."""
+    fast, stdlib = providers()
+    value = {"location": "Côte d’Azur"}
+
+    assert fast.loads(fast.dumps_bytes(value)) == stdlib.loads(stdlib.dumps_bytes(value)) == value
+
+
+def test_installed_provider_serves_responses():
+    """Test that jsonify and request bodies go through the installed provider."""
+    app = Flask(__name__)
+    app.config["JSON_ENCODER"] = "orjson"
+    provider = install_json_provider(app)
+
+    @app.route("/echo", methods=["POST"])
+    def echo():
+        return jsonify(received=app.json.loads(app.json.dumps(dict(app.json.loads(b'{"b":1,"a":2}')))))
+
+    response = app.test_client().post("/echo", json={})
+    assert provider.use_orjson
+    assert response.data == b'{"received":{"a":2,"b":1}}\n'
+    assert response.mimetype == "application/json"
+
+
+def test_unknown_encoder_rejected():
+    """Test that a misspelt JSON_ENCODER fails at startup."""
+    app = Flask(__name__)
+    app.config["JSON_ENCODER"] = "ujson"
+    with pytest.raises(ValueError):
+        install_json_provider(app)
@@ -0,0 +1,126 @@
+import jwt as pyjwt
+import pytest
+from jwt.exceptions import InvalidTokenError
+from common.jwks import JWKSClient, KeyRing, KeySetUnavailable
+
+
+def sign(key, claims):
+    """Sign claims the way the user service does, with the kid in the header."""
+    return pyjwt.encode(claims, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid})
+
+
+def verify(key_loader, token):
+    header = pyjwt.get_unverified_header(token)
+    return pyjwt.decode(token, key_loader(header, {}), algorithms=["RS256", "EdDSA"])
+
+
+def test_key_generated_on_first_use(tmp_path):
+    """Test that an empty key directory gets a signing key that verifies its tokens."""
+    ring = KeyRing(str(tmp_path), algorithm="EdDSA")
+
+    key = ring.current()
+    assert key.algorithm == "EdDSA"
+    assert [jwk["kid"] for jwk in ring.jwks()["keys"]] == [key.kid]
+    assert verify(ring.key_for, sign(key, {"sub": "a"})) == {"sub": "a"}
+
+
+def test_rotation_keeps_newest_keys(tmp_path):
+    """Test that rotation signs with the new key and prunes all but the newest keys."""
+    ring = KeyRing(str(tmp_path), algorithm="EdDSA", keep=2)
+    first = ring.current()
+    first_token = sign(first, {"sub": "a"})
+
+    second = ring.rotate()
+    assert ring.current().kid == second.kid
+    # Tokens signed before the rotation still verify
+    assert verify(ring.key_for, first_token) == {"sub": "a"}
+
+    third = ring.rotate()
+    assert [jwk["kid"] for jwk in ring.jwks()["keys"]] == [third.kid, second.kid]
+    with pytest.raises(InvalidTokenError):
+        verify(ring.key_for, first_token)
+
+
+def test_workers_pick_up_rotated_keys(tmp_path):
+    """Test that a key ring sees keys rotated by another process."""
+    ring = KeyRing(str(tmp_path), algorithm="EdDSA", check_interval=0)
+    other = KeyRing(str(tmp_path), algorithm="EdDSA")
+    ring.current()
+
+    rotated = other.rotate()
+    assert ring.current().kid == rotated.kid
+
+
+def test_algorithm_change_generates_new_key(tmp_path):
+    """Test that switching algorithms rotates to a key of the new type."""
+    eddsa_key = KeyRing(str(tmp_path), algorithm="EdDSA").current()
+    rsa_ring = KeyRing(str(tmp_path), algorithm="RS256")
+
+    rsa_key = rsa_ring.current()
+    assert rsa_key.algorithm == "RS256"
+    assert [jwk["kid"] for jwk in rsa_ring.jwks()["keys"]] == [rsa_key.kid, eddsa_key.kid]
+    assert verify(rsa_ring.key_for, sign(eddsa_key, {"sub": "a"})) == {"sub": "a"}
+
+
+def test_client_caches_and_refetches_on_unknown_kid(tmp_path):
+    """Test that the JWKS is fetched once and refetched when a new kid appears."""
+    ring = KeyRing(str(tmp_path), algorithm="EdDSA", check_interval=0)
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return ring.jwks()
+
+    client = JWKSClient("http://users/.well-known/jwks.json", min_refresh_interval=0, fetch=fetch)
+    token = sign(ring.current(), {"sub": "a"})
+    for _ in range(3):
+        assert verify(client.key_for, token) == {"sub": "a"}
+    assert len(fetches) == 1
+
+    rotated_token = sign(ring.rotate(), {"sub": "b"})
+    assert verify(client.key_for, rotated_token) == {"sub": "b"}
+    assert len(fetches) == 2
+
+
+def test_client_refetch_is_throttled(tmp_path):
+    """Test that unknown kids do not trigger a fetch more often than allowed."""
+    ring = KeyRing(str(tmp_path), algorithm="EdDSA")
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return ring.jwks()
+
+    client = JWKSClient("http://users/.well-known/jwks.json", min_refresh_interval=60, fetch=fetch)
+    client.key_for({"kid": ring.current().kid}, {})
+    for _ in range(3):
+        with pytest.raises(InvalidTokenError):
+            client.key_for({"kid": "unknown"}, {})
+    assert len(fetches) == 1
+
+
+def test_client_without_keys_is_unavailable():
+    """Test that verification fails with KeySetUnavailable when no keys were ever fetched."""
+
+    def fetch():
+        raise OSError("connection refused")
+
+    client = JWKSClient("http://users/.well-known/jwks.json", fetch=fetch)
+    with pytest.raises(KeySetUnavailable):
+        client.key_for({"kid": "any"}, {})
+
+
+def test_client_keeps_keys_when_refetch_fails(tmp_path):
+    """Test that cached keys stay in use when the JWKS cannot be refetched."""
+    ring = KeyRing(str(tmp_path), algorithm="EdDSA")
+    responses = [ring.jwks()]
+
+    def fetch():
+        if not responses:
+            raise OSError("connection refused")
+        return responses.pop()
+
+    client = JWKSClient("http://users/.well-known/jwks.json", max_age=0, min_refresh_interval=0, fetch=fetch)
+    token = sign(ring.current(), {"sub": "a"})
+    assert verify(client.key_for, token) == {"sub": "a"}
+    assert verify(client.key_for, token) == {"sub": "a"}
@@ -0,0 +1,38 @@
+import threading
+from common.locks import ReadWriteLock
+
+
+def test_readers_share_the_lock():
+    """Test that several readers can hold the lock at once."""
+    lock = ReadWriteLock()
+    inside = threading.Barrier(3, timeout=5)
+
+    def reader():
+        with lock.read():
+            inside.wait()
+
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not inside.broken
+
+
+def test_writers_are_exclusive():
+    """Test that concurrent read-modify-write under the write lock loses no updates."""
+    lock = ReadWriteLock()
+    counter = {"value": 0}
+
+    def writer():
+        for _ in range(1000):
+            with lock.write():
+                value = counter["value"]
+                counter["value"] = value + 1
+
+    threads = [threading.Thread(target=writer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter["value"] == 8000
@@ -0,0 +1,61 @@
+from flask import Flask
+from common.metrics import MetricsRegistry, install_metrics
+
+
+def test_counter_and_gauge_render():
+    """Test the text format of counters and callback gauges."""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    registry.gauge("store_records", "Records.", lambda: 3, {"store": "users"})
+
+    requests.inc(route="/a")
+    requests.inc(2, route='/b"quoted"')
+
+    assert registry.render() == (
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{route="/a"} 1\n'
+        'requests_total{route="/b\\"quoted\\""} 2\n'
+        "# HELP store_records Records.\n"
+        "# TYPE store_records gauge\n"
+        'store_records{store="users"} 3\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that histogram buckets, sum and count add up."""
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_sum 3.65" in lines
+    assert "latency_seconds_count 4" in lines
+
+
+def test_requests_counted_per_route():
+    """Test that the request hooks label by URL rule and status, and /metrics serves them."""
+    app = Flask(__name__)
+    registry = MetricsRegistry()
+    requests_total, request_seconds = install_metrics(app, registry)
+
+    @app.route("/items/<id>")
+    def item(id):
+        return {"id": id}
+
+    client = app.test_client()
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    assert requests_total.value(route="/items/<id>", method="GET", status=200) == 2
+    assert requests_total.value(route="<unmatched>", method="GET", status=404) == 1
+    assert request_seconds.count(route="/items/<id>", method="GET") == 2
+
+    response = client.get("/metrics")
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{route="/items/<id>",method="GET",status="200"} 2' in response.get_data(as_text=True)
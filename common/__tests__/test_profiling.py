@@ -0,0 +1,85 @@
+import os
+import pstats
+
+import pytest
+from flask import Flask
+
+from common.profiling import install_profiling, route_slug
+
+
+def slow_lookup(id):
+    return sum(range(1000)) + int(id)
+
+
+def make_app(directory, **config):
+    app = Flask(__name__)
+    app.config["PROFILE_DIR"] = str(directory)
+    app.config.update(config)
+
+    @app.route("/items/<int:id>")
+    def item(id):
+        return {"total": slow_lookup(id)}
+
+    return app
+
+
+def test_disabled_installs_nothing(tmp_path):
+    """Test that profiling leaves the WSGI app untouched when it is off."""
+    app = make_app(tmp_path)
+    wsgi_app = app.wsgi_app
+
+    assert install_profiling(app) is None
+    assert app.wsgi_app == wsgi_app
+    app.test_client().get("/items/1", headers={"X-Profile": "anything"})
+    assert os.listdir(tmp_path) == []
+
+
+def test_header_token_writes_collapsed_stacks(tmp_path):
+    """Test that a request carrying the token is profiled into its route's collapsed file."""
+    app = make_app(tmp_path, PROFILE_TOKEN="secret")
+    install_profiling(app)
+    client = app.test_client()
+
+    client.get("/items/1", headers={"X-Profile": "wrong"})
+    client.get("/items/2")
+    # Non-ASCII header values are refused rather than failing the request
+    assert client.get("/items/2", headers={"X-Profile": "sécret"}).status_code == 200
+    assert os.listdir(tmp_path) == []
+
+    response = client.get("/items/3", headers={"X-Profile": "secret"})
+    assert response.get_json() == {"total": 499503}
+    path = tmp_path / "GET_items_int_id.collapsed"
+    lines = path.read_text().splitlines()
+    assert lines
+    assert all(line.startswith("GET_items_int_id") and line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("test_profiling.slow_lookup" in line for line in lines)
+
+
+def test_sample_rate_writes_cprofile_stats(tmp_path):
+    """Test that sampled requests each leave a pstats file under their route."""
+    app = make_app(tmp_path, PROFILE_SAMPLE_RATE=1.0, PROFILE_FORMAT="cprofile")
+    install_profiling(app)
+    client = app.test_client()
+
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    files = sorted(os.listdir(tmp_path / "GET_items_int_id"))
+    assert len(files) == 2
+    stats = pstats.Stats(*(str(tmp_path / "GET_items_int_id" / name) for name in files))
+    assert any(function == "slow_lookup" for _, _, function in stats.stats)
+    assert len(os.listdir(tmp_path / "GET_unmatched")) == 1
+
+
+def test_route_slug():
+    """Test that route names are safe file names."""
+    assert route_slug("POST", "/login") == "POST_login"
+    assert route_slug("DELETE", "/destinations/<string:id>") == "DELETE_destinations_string_id"
+
+
+def test_unknown_format_rejected(tmp_path):
+    """Test that a misspelt format fails at install time, not on the first sampled request."""
+    app = make_app(tmp_path, PROFILE_SAMPLE_RATE=0.5, PROFILE_FORMAT="flamegraph")
+    with pytest.raises(ValueError):
+        install_profiling(app)
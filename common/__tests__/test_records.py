@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from common.records import Record, json_default
+from common.snapshot import read_snapshot, write_snapshot
+
+
+class Place(Record):
+    __slots__ = ("id", "name", "location")
+    INTERNED = frozenset({"location"})
+
+
+def test_record_reads_like_a_dict():
+    """Test that a record supports the mapping operations the services use on dicts."""
+    data = {"id": "1", "name": "Bali", "location": "Indonesia"}
+    place = Place.from_dict(data)
+
+    assert place["name"] == "Bali"
+    assert place.get("missing") is None
+    assert "location" in place and "to_dict" not in place
+    assert place == data
+    assert {**place, "name": "Java"} == {**data, "name": "Java"}
+    assert dict(place) == place.to_dict() == data
+    with pytest.raises(KeyError):
+        place["to_dict"]
+    assert not hasattr(place, "__dict__")
+
+
+def test_interned_fields_share_one_string():
+    """Test that repeated interned values are one object, and other fields are untouched."""
+    first = Place.from_dict(json.loads('{"id": "1", "name": "Bali", "location": "Indonesia"}'))
+    second = Place.from_dict(json.loads('{"id": "2", "name": "Bali", "location": "Indonesia"}'))
+
+    assert first.location is second.location
+    assert Place.coerce(first) is first
+
+
+def test_records_encode_like_dicts(tmp_path):
+    """Test that records serialize to the same JSON as the dicts they came from."""
+    data = {"id": "1", "name": "Bali", "location": "Indonesia"}
+    place = Place.from_dict(data)
+
+    assert json.dumps(place, default=json_default) == json.dumps(data)
+    path = tmp_path / "places.jsonl"
+    write_snapshot(str(path), "places", [place])
+    assert list(read_snapshot(str(path))) == [data]
+    with pytest.raises(TypeError):
+        json.dumps(object(), default=json_default)
@@ -0,0 +1,66 @@
+import pytest
+from common.snapshot import (
+    SnapshotError,
+    migrate_legacy_snapshot,
+    read_snapshot,
+    write_snapshot,
+)
+
+RECORDS = [
+    {"id": "1", "name": "Bali", "price_per_night": 200.5},
+    {"id": "2", "name": "Paris", "price_per_night": 150.0},
+]
+
+
+def test_round_trip(tmp_path):
+    """Test that written records are read back unchanged and in order."""
+    path = tmp_path / "data.jsonl"
+    assert write_snapshot(path, "destinations", RECORDS) == 2
+    assert list(read_snapshot(path)) == RECORDS
+
+
+def test_empty_file_is_empty_snapshot(tmp_path):
+    """Test that a zero-length file loads as an empty store."""
+    path = tmp_path / "data.jsonl"
+    path.write_text("")
+    assert list(read_snapshot(path)) == []
+
+
+def test_flipped_byte_is_detected(tmp_path):
+    """Test that a modified record fails the checksum."""
+    path = tmp_path / "data.jsonl"
+    write_snapshot(path, "destinations", RECORDS)
+    path.write_text(path.read_text().replace("Bali", "Balu"))
+
+    with pytest.raises(SnapshotError, match="checksum"):
+        list(read_snapshot(path))
+
+
+def test_truncated_file_is_detected(tmp_path):
+    """Test that a snapshot without its trailer is rejected."""
+    path = tmp_path / "data.jsonl"
+    write_snapshot(path, "destinations", RECORDS)
+    lines = path.read_text().splitlines(keepends=True)
+    path.write_text("".join(lines[:-1]))
+
+    with pytest.raises(SnapshotError):
+        list(read_snapshot(path))
+
+
+def test_unsupported_version(tmp_path):
+    """Test that snapshots from a future format version are rejected."""
+    path = tmp_path / "data.jsonl"
+    path.write_text('{"format": "hotel-snapshot", "version": 99, "name": "x"}\n')
+
+    with pytest.raises(SnapshotError, match="version"):
+        list(read_snapshot(path))
+
+
+def test_migrate_legacy_file(tmp_path):
+    """Test converting a legacy Python data file into a snapshot."""
+    legacy_path = tmp_path / "destination_data.py"
+    legacy_path.write_text(f"destinations = {RECORDS}")
+    snapshot_path = tmp_path / "destination_data.jsonl"
+
+    assert migrate_legacy_snapshot(legacy_path, snapshot_path) == 2
+    assert list(read_snapshot(snapshot_path)) == RECORDS
@@ -0,0 +1,89 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from common.storage import create_storage
+
+
+def sql_storage(tmp_path, **options):
+    """SQLite-backed engine over a database file in a temporary directory."""
+    return create_storage(
+        "sql", url=f"sqlite:///{tmp_path / 'data.db'}", table="destinations", key="id", **options
+    )
+
+
+def test_round_trip_keeps_insertion_order(tmp_path):
+    """Test that puts, overwrites and deletes survive a reload in order."""
+    storage = sql_storage(tmp_path)
+    assert storage.load() == []
+
+    storage.append("put", "1", {"id": "1", "name": "Bali"})
+    storage.append("put", "2", {"id": "2", "name": "Paris"})
+    storage.append("put", "3", {"id": "3", "name": "Rome"})
+    storage.flush()
+    storage.append("put", "1", {"id": "1", "name": "Bali Updated"})
+    storage.append("delete", "2")
+    storage.flush()
+
+    assert sql_storage(tmp_path).load() == [
+        {"id": "1", "name": "Bali Updated"},
+        {"id": "3", "name": "Rome"},
+    ]
+
+
+def test_batch_keeps_last_entry_per_key(tmp_path):
+    """Test that a put followed by a delete in one batch leaves nothing behind."""
+    storage = sql_storage(tmp_path)
+    storage.load()
+    storage.append("put", "1", {"id": "1", "name": "Bali"})
+    storage.append("delete", "1")
+    storage.append("put", "2", {"id": "2", "name": "Paris"})
+    storage.flush()
+
+    assert sql_storage(tmp_path).load() == [{"id": "2", "name": "Paris"}]
+
+
+def test_shared_refresh_sees_other_writers(tmp_path):
+    """Test that one worker picks up rows another worker committed."""
+    first, second = sql_storage(tmp_path, shared=True), sql_storage(tmp_path, shared=True)
+    first.load()
+    second.load()
+
+    with first.transaction():
+        first.append("put", "1", {"id": "1", "name": "Bali"})
+    assert second.refresh() == [{"op": "put", "key": "1", "record": {"id": "1", "name": "Bali"}}]
+    assert first.refresh() == []
+
+    with second.transaction():
+        second.append("delete", "1")
+    assert first.refresh() == [{"op": "delete", "key": "1"}]
+    assert second.refresh() == []
+
+
+def test_load_writes_pending_entries_first(tmp_path):
+    """Test that reloading keeps entries that were appended but not flushed."""
+    storage = sql_storage(tmp_path)
+    storage.load()
+    storage.append("put", "1", {"id": "1", "name": "Bali"})
+    storage.flush()
+    storage.append("delete", "1")
+
+    assert storage.load() == []
+    assert sql_storage(tmp_path).load() == []
+
+
+def test_position_names_the_shared_state(tmp_path):
+    """Test that workers that read the same rows report the same position."""
+    first, second = sql_storage(tmp_path, shared=True), sql_storage(tmp_path, shared=True)
+    first.load()
+    second.load()
+    first.refresh()
+    second.refresh()
+    assert first.position() == second.position()
+
+    with first.transaction():
+        first.append("put", "1", {"id": "1", "name": "Bali"})
+        assert first.position() is None
+    assert first.position() != second.position()
+    second.refresh()
+    assert first.position() == second.position()
@@ -0,0 +1,288 @@
+import threading
+
+import pytest
+from common.storage import LogStorage, create_storage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Log storage writing into a temporary directory."""
+    return LogStorage(
+        snapshot_path=str(tmp_path / "data.jsonl"),
+        log_path=str(tmp_path / "data.log"),
+        key="id",
+        name="records",
+        batch_size=10,
+        compact_threshold=5,
+    )
+
+
+def reopen(storage):
+    """Build a fresh engine over the same files, as a restarted service would."""
+    return LogStorage(
+        storage.snapshot_path, storage.log_path, storage.key, storage.name,
+        legacy_path=storage.legacy_path,
+    )
+
+
+def test_load_missing_files(storage):
+    """Test loading when neither snapshot nor log exist."""
+    assert storage.load() == []
+
+
+def test_append_is_buffered_until_flush(storage):
+    """Test that appended entries only reach disk on flush."""
+    storage.append("put", "1", {"id": "1", "name": "Bali"})
+    assert reopen(storage).load() == []
+
+    storage.flush()
+    assert reopen(storage).load() == [{"id": "1", "name": "Bali"}]
+
+
+def test_append_many_is_durable_at_once(storage):
+    """Test that a batch larger than batch_size is written in one flush."""
+    records = [{"id": str(i), "name": f"Place {i}"} for i in range(25)]
+    storage.append_many("put", ((record["id"], record) for record in records))
+
+    assert storage.pending == []
+    assert storage.log_entries == 25
+    assert reopen(storage).load() == records
+
+
+def test_replay_put_and_delete(storage):
+    """Test that the log replays puts, overwrites and deletes in order."""
+    storage.append("put", "1", {"id": "1", "name": "Bali"})
+    storage.append("put", "2", {"id": "2", "name": "Paris"})
+    storage.append("put", "1", {"id": "1", "name": "Bali Updated"})
+    storage.append("delete", "2")
+    storage.flush()
+
+    assert reopen(storage).load() == [{"id": "1", "name": "Bali Updated"}]
+
+
+def test_compaction_writes_snapshot_and_truncates_log(storage):
+    """Test that compaction folds the log into the snapshot."""
+    records = []
+    for i in range(5):
+        record = {"id": str(i), "name": f"Destination {i}"}
+        records.append(record)
+        storage.append("put", record["id"], record)
+    storage.flush()
+    assert storage.needs_compaction()
+
+    storage.compact(records)
+    assert not storage.needs_compaction()
+    with open(storage.log_path) as file:
+        assert file.read() == ""
+    assert reopen(storage).load() == records
+
+
+def test_torn_log_tail_is_ignored(storage):
+    """Test that a partially written last line does not break loading."""
+    storage.append("put", "1", {"id": "1", "name": "Bali"})
+    storage.flush()
+    with open(storage.log_path, "a") as file:
+        file.write('{"op": "put", "key": "2", "rec')
+
+    assert reopen(storage).load() == [{"id": "1", "name": "Bali"}]
+
+
+def test_legacy_file_used_until_first_compaction(tmp_path):
+    """Test that a legacy Python data file seeds the store when no snapshot exists."""
+    legacy_path = tmp_path / "data.py"
+    legacy_path.write_text("records = [{'id': '1', 'name': 'Bali'}]")
+    storage = LogStorage(
+        snapshot_path=str(tmp_path / "data.jsonl"),
+        log_path=str(tmp_path / "data.log"),
+        key="id",
+        name="records",
+        legacy_path=str(legacy_path),
+    )
+    records = storage.load()
+    assert records == [{"id": "1", "name": "Bali"}]
+
+    storage.compact(records)
+    legacy_path.unlink()
+    assert reopen(storage).load() == records
+
+
+def test_create_storage_unknown_engine():
+    """Test that an unknown engine name is rejected."""
+    with pytest.raises(ValueError):
+        create_storage("missing")
+
+
+def test_torn_tail_is_truncated_before_appending(storage):
+    """Test that entries appended after a crash are not hidden by a torn line."""
+    storage.append("put", "1", {"id": "1", "name": "Bali"})
+    storage.flush()
+    with open(storage.log_path, "a") as file:
+        file.write('{"op": "put", "key": "2", "rec')
+
+    restarted = reopen(storage)
+    restarted.load()
+    restarted.append("put", "3", {"id": "3", "name": "Rome"})
+    restarted.flush()
+
+    assert reopen(storage).load() == [{"id": "1", "name": "Bali"}, {"id": "3", "name": "Rome"}]
+
+
+def shared_storage(tmp_path):
+    """Shared-mode engine over the same files, as one worker process would open it."""
+    return LogStorage(
+        snapshot_path=str(tmp_path / "data.jsonl"),
+        log_path=str(tmp_path / "data.log"),
+        key="id",
+        name="records",
+        shared=True,
+    )
+
+
+def test_shared_refresh_sees_other_writers(tmp_path):
+    """Test that a worker picks up entries another worker committed."""
+    first, second = shared_storage(tmp_path), shared_storage(tmp_path)
+    first.load()
+    second.load()
+
+    with first.transaction():
+        first.append("put", "1", {"id": "1", "name": "Bali"})
+    assert second.refresh() == [{"op": "put", "key": "1", "record": {"id": "1", "name": "Bali"}}]
+    assert second.refresh() == []
+
+    # A worker does not read its own writes back
+    with second.transaction():
+        assert second.refresh() == []
+        second.append("delete", "1")
+    assert second.refresh() == []
+    assert first.refresh() == [{"op": "delete", "key": "1"}]
+
+
+def test_shared_compaction_forces_reload(tmp_path):
+    """Test that compaction by one worker makes the others reload."""
+    first, second = shared_storage(tmp_path), shared_storage(tmp_path)
+    first.load()
+    second.load()
+
+    with first.transaction():
+        first.append("put", "1", {"id": "1", "name": "Bali"})
+        first.compact([{"id": "1", "name": "Bali"}])
+
+    assert second.refresh() is None
+    assert second.load() == [{"id": "1", "name": "Bali"}]
+    assert second.refresh() == []
+
+
+def test_load_writes_pending_entries_first(storage):
+    """Test that reloading keeps entries that were appended but not flushed."""
+    storage.append("put", "1", {"id": "1", "name": "Bali"})
+    storage.flush()
+    storage.append("delete", "1")
+
+    assert storage.load() == []
+    assert storage.pending == []
+    assert reopen(storage).load() == []
+
+
+def test_shared_write_does_not_skip_unread_entries(tmp_path):
+    """Test that a worker writing without refreshing first still sees earlier writes of others."""
+    first, second = shared_storage(tmp_path), shared_storage(tmp_path)
+    first.load()
+    second.load()
+
+    with second.transaction():
+        second.append("put", "x", {"id": "x", "name": "Bali"})
+    with first.transaction():
+        first.append("put", "y", {"id": "y", "name": "Paris"})
+
+    # x comes back from refresh(); y is first's own write and is skipped
+    assert first.refresh() == [{"op": "put", "key": "x", "record": {"id": "x", "name": "Bali"}}]
+    assert first.refresh() == []
+    assert second.refresh() == [{"op": "put", "key": "y", "record": {"id": "y", "name": "Paris"}}]
+
+
+def test_reload_inside_transaction_after_compaction(tmp_path):
+    """Test that a worker reloading inside its own transaction does not wait on its own lock."""
+    first, second = shared_storage(tmp_path), shared_storage(tmp_path)
+    first.compact_threshold = second.compact_threshold = 3
+    first.load()
+    second.load()
+
+    with first.transaction():
+        for i in range(3):
+            first.append("put", str(i), {"id": str(i), "name": f"Place {i}"})
+    with first.transaction():
+        first.compact([{"id": str(i), "name": f"Place {i}"} for i in range(3)])
+
+    def save():
+        # The save sequence of the services, as the other worker runs it
+        with second.transaction():
+            second.append("put", "3", {"id": "3", "name": "Place 3"})
+            second.flush()
+            # Another worker compacted, so the log has to be loaded again
+            if second.refresh() is None:
+                loaded.extend(second.load())
+
+    loaded = []
+    thread = threading.Thread(target=save, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert [record["id"] for record in loaded] == ["0", "1", "2", "3"]
+
+
+def test_compaction_threshold_grows_with_snapshot(storage):
+    """Test that a large snapshot is only rewritten once the log is comparably large."""
+    records = [{"id": str(i), "name": f"Place {i}"} for i in range(20)]
+    storage.compact(records)
+    storage.load()
+
+    for i in range(19):
+        storage.append("put", str(i), {"id": str(i), "name": f"Renamed {i}"})
+    assert not storage.needs_compaction()
+    storage.append("delete", "19")
+    assert storage.needs_compaction()
+
+
+def test_entries_appended_during_compaction_are_kept(storage, monkeypatch):
+    """Test that writes made while the snapshot is written move to the new log."""
+    import common.storage
+
+    records = [{"id": "1", "name": "Bali"}]
+    storage.append("put", "1", records[0])
+    write_snapshot = common.storage.write_snapshot
+
+    def write_while_appending(path, name, snapshot_records):
+        count = write_snapshot(path, name, snapshot_records)
+
+        # Another thread writes while the snapshot is on its way to disk,
+        # which only finishes if compact() does not hold the lock meanwhile
+        def write():
+            storage.append("put", "2", {"id": "2", "name": "Paris"})
+            storage.flush()
+
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+        return count
+
+    monkeypatch.setattr(common.storage, "write_snapshot", write_while_appending)
+    storage.compact(records)
+
+    assert storage.log_entries == 1
+    assert reopen(storage).load() == [{"id": "1", "name": "Bali"}, {"id": "2", "name": "Paris"}]
+
+
+def test_position_names_the_shared_state(tmp_path):
+    """Test that workers that read the same entries report the same position."""
+    first, second = shared_storage(tmp_path), shared_storage(tmp_path)
+    first.load()
+    second.load()
+    assert first.position() == second.position()
+
+    with first.transaction():
+        first.append("put", "1", {"id": "1", "name": "Bali"})
+        assert first.position() is None
+    assert first.position() != second.position()
+    second.refresh()
+    assert first.position() == second.position()
@@ -0,0 +1,96 @@
+import pytest
+from jsonschema import Draft202012Validator
+
+from common.validation import (
+    DESTINATION_SCHEMA,
+    USER_SCHEMA,
+    Validator,
+    destination_validator,
+    is_valid_email,
+    user_validator,
+)
+
+VALID_USER = {"email": "user@example.com", "password": "Password123", "name": "John Doe", "role": "User"}
+VALID_DESTINATION = {"name": "Bali", "description": "Island", "location": "Indonesia", "price_per_night": 200.5}
+
+
+def test_valid_bodies_pass():
+    """Test that valid users and destinations have no errors."""
+    assert user_validator.validate(VALID_USER) == (None, None)
+    assert destination_validator.validate(VALID_DESTINATION) == (None, None)
+    assert destination_validator.errors({**VALID_DESTINATION, "price_per_night": "99.5"}) == []
+
+
+def test_every_field_error_is_reported():
+    """Test that all bad fields are reported together, in schema order."""
+    body, status = user_validator.validate(
+        {"email": "not-an-email", "password": "short", "name": "", "role": "Root"}
+    )
+    assert status == 400
+    assert body["error"] == "Missing fields: name"
+    assert body["errors"] == [
+        {"field": "email", "error": "Invalid email format"},
+        {"field": "password", "error": "Password must be at least 8 characters long, include 1 uppercase letter and 1 number"},
+        {"field": "name", "error": "Missing field"},
+        {"field": "role", "error": "Invalid role. Allowed roles: User, Admin"},
+    ]
+
+
+def test_summary_is_first_error_when_nothing_missing():
+    """Test that the summary error keeps the single-error messages clients rely on."""
+    body, _ = destination_validator.validate({**VALID_DESTINATION, "name": "Ba", "price_per_night": -1})
+    assert body["error"] == "Destination name must be at least 3 characters long."
+    assert [error["field"] for error in body["errors"]] == ["name", "price_per_night"]
+
+
+def test_password_rules():
+    """Test the length, uppercase and digit password rules."""
+    for password in ("Passw0rd", "ABCDEFG1", "lowercase1X"):
+        assert user_validator.errors({**VALID_USER, "password": password}) == []
+    for password in ("Pass1", "password1", "PASSWORDX", 12345678):
+        assert [e["field"] for e in user_validator.errors({**VALID_USER, "password": password})] == ["password"]
+
+
+def test_price_checks():
+    """Test that prices must be positive numbers or numeric strings."""
+    assert destination_validator.errors({**VALID_DESTINATION, "price_per_night": "abc"}) == [
+        {"field": "price_per_night", "error": "Invalid price format."}
+    ]
+    assert destination_validator.errors({**VALID_DESTINATION, "price_per_night": [1]}) == [
+        {"field": "price_per_night", "error": "Invalid price format."}
+    ]
+    assert destination_validator.errors({**VALID_DESTINATION, "price_per_night": 0}) == [
+        {"field": "price_per_night", "error": "Price per night must be a positive number."}
+    ]
+    for price in ["nan", "inf", float("nan"), float("inf")]:
+        assert destination_validator.errors({**VALID_DESTINATION, "price_per_night": price}) == [
+            {"field": "price_per_night", "error": "Invalid price format."}
+        ]
+
+
+def test_non_object_body():
+    """Test that a body that is not an object is rejected instead of raising."""
+    body, status = destination_validator.validate(["Bali"])
+    assert status == 400
+    assert body["error"] == "Body must be a JSON object."
+    assert not is_valid_email(None)
+
+
+@pytest.mark.parametrize("schema", [USER_SCHEMA, DESTINATION_SCHEMA])
+def test_shared_schemas_are_valid(schema):
+    """Test the shared schemas against the metaschema, since Validator does not check them."""
+    Draft202012Validator.check_schema(schema)
+
+
+def test_uncompiled_keyword_falls_back_to_jsonschema():
+    """Test that a keyword without a compiled predicate is still enforced, with its x-message."""
+    validator = Validator(
+        {
+            "type": "object",
+            "properties": {
+                "nights": {"type": "integer", "maximum": 30, "x-messages": {"maximum": "At most 30 nights."}},
+            },
+        }
+    )
+    assert validator.errors({"nights": 7}) == []
+    assert validator.errors({"nights": 31}) == [{"field": "nights", "error": "At most 30 nights."}]
@@ -0,0 +1,132 @@
+# common/apidocs.py
+"""
+Swagger UI and API spec for the services, without paying for flasgger at
+startup.
+
+Importing flasgger pulls in YAML and Markdown parsers, and building the spec
+parses every route docstring, so by default neither happens until someone
+asks for the docs. install_apidocs() supports four modes, chosen by the
+APIDOCS config value:
+
+- "lazy": /apispec_1.json is a plain route. The spec is built from the route
+  docstrings on its first request and then cached. /apidocs/ and its static
+  files are served by a docs-only flasgger app, built on first use.
+- "static": /apispec_1.json serves the spec file precomputed at build time,
+  falling back to "lazy" when that file does not exist. Build the file with:
+
+      python -m common.apidocs build user_service.app user_service/apispec.json
+
+- "eager": flasgger is set up on the service app at import, as before.
+- "off": no API docs are served.
+"""
+import argparse
+import importlib
+import os
+import threading
+
+from flask import Flask, Response
+
+APIDOCS_MODES = ("lazy", "static", "eager", "off")
+SPEC_ENDPOINT = "apispec_1"
+SPEC_ROUTE = "/apispec_1.json"
+# Paths of the Swagger UI page and its assets, served by the docs app
+UI_PREFIXES = ("/apidocs", "/flasgger_static")
+
+
+class LazyApiDocs:
+    """
+    Serves the API spec and Swagger UI of app, importing flasgger only when
+    the docs are first requested.
+    """
+
+    def __init__(self, app, template, spec_file=None):
+        self.app = app
+        self.template = template
+        self.spec_file = spec_file
+        self._swagger = None
+        self._spec = None
+        self._lock = threading.Lock()
+        self._wsgi_app = app.wsgi_app
+        app.add_url_rule(SPEC_ROUTE, SPEC_ENDPOINT, self.serve_spec, methods=["GET"])
+        app.wsgi_app = self
+        app.extensions["apidocs"] = self
+
+    def swagger(self):
+        """
+        The flasgger extension, set up on a docs-only app the first time it is needed.
+        """
+        with self._lock:
+            if self._swagger is None:
+                from flasgger import Swagger
+
+                self._swagger = Swagger(Flask(self.app.import_name), template=self.template)
+            return self._swagger
+
+    def spec(self):
+        """
+        The encoded API spec: the precomputed spec file if there is one,
+        otherwise built from the service app's route docstrings.
+        """
+        if self._spec is None:
+            if self.spec_file and os.path.exists(self.spec_file):
+                with open(self.spec_file, "rb") as file:
+                    self._spec = file.read()
+            else:
+                swagger = self.swagger()
+                # flasgger collects the routes of current_app
+                with self.app.app_context():
+                    spec = swagger.get_apispecs(SPEC_ENDPOINT)
+                    self._spec = self.app.json.dumps(spec, separators=(",", ":")).encode()
+        return self._spec
+
+    def serve_spec(self):
+        return Response(self.spec(), mimetype="application/json")
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO", "").startswith(UI_PREFIXES):
+            return self.swagger().app.wsgi_app(environ, start_response)
+        return self._wsgi_app(environ, start_response)
+
+
+def install_apidocs(app, template):
+    """
+    Serve the API docs of app in the mode set by APIDOCS, with the spec file
+    given by APIDOCS_SPEC_FILE in "static" mode. Returns the LazyApiDocs, the
+    flasgger Swagger extension in "eager" mode, or None when docs are off.
+    """
+    mode = app.config.get("APIDOCS", "lazy")
+    if mode not in APIDOCS_MODES:
+        raise ValueError(f"Unsupported APIDOCS mode {mode!r}, expected one of {APIDOCS_MODES}")
+    if mode == "off":
+        return None
+    if mode == "eager":
+        from flasgger import Swagger
+
+        return Swagger(app, template=template)
+    spec_file = app.config.get("APIDOCS_SPEC_FILE") if mode == "static" else None
+    return LazyApiDocs(app, template, spec_file)
+
+
+def build_spec_file(module_name, path):
+    """
+    Import the service app in module_name and write its API spec to path.
+    """
+    # Always build from the docstrings, never from an older spec file
+    os.environ["APIDOCS"] = "lazy"
+    app = importlib.import_module(module_name).app
+    spec = app.extensions["apidocs"].spec()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(spec)
+    os.replace(tmp_path, path)
+    return len(spec)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the API spec of a service for APIDOCS=static.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("module", help="module of the service app, e.g. user_service.app")
+    parser.add_argument("path", help="spec file to write, e.g. user_service/apispec.json")
+    args = parser.parse_args()
+    size = build_spec_file(args.module, args.path)
+    print(f"Wrote the {args.module} API spec to {args.path} ({size} bytes)")
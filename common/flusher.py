@@ -0,0 +1,108 @@
+# common/flusher.py
+import atexit
+import signal
+import sys
+import threading
+
+
+class BackgroundFlusher:
+    """
+    Coalesce store mutations into periodic flushes on a background thread.
+
+    Every mutation bumps a version counter through mark_dirty(). The thread
+    calls flush() once interval seconds have passed or max_pending mutations
+    have accumulated, whichever comes first, so a burst of writes costs one
+    disk write and read-only traffic costs none. An interval of 0 flushes
+    synchronously on every mutation.
+    """
+
+    def __init__(self, flush, interval=1.0, max_pending=100):
+        self._flush = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        self.version = 0
+        self.flushed_version = 0
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+        atexit.register(self.stop)
+
+    @property
+    def dirty(self):
+        return self.version != self.flushed_version
+
+    def mark_dirty(self):
+        """
+        Record one mutation and wake the flusher if the threshold is reached.
+        """
+        with self._condition:
+            self.version += 1
+            if self.version - self.flushed_version >= self.max_pending:
+                self._condition.notify()
+
+        if self.interval <= 0:
+            self.flush()
+        else:
+            self.start()
+
+    def flush(self):
+        """
+        Flush synchronously if anything changed since the last flush.
+        """
+        with self._flush_lock:
+            version = self.version
+            if version == self.flushed_version:
+                return
+            self._flush()
+            # Mutations that raced with _flush() keep the store dirty
+            self.flushed_version = version
+
+    def start(self):
+        """
+        Start the background thread if it is not already running.
+        """
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="store-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread and flush whatever is still pending.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+
+    def install_signal_handlers(self):
+        """
+        Flush cleanly on SIGTERM before exiting. Must run in the main thread.
+        """
+        previous = signal.getsignal(signal.SIGTERM)
+
+        def handle_sigterm(signum, frame):
+            self.stop()
+            if callable(previous):
+                previous(signum, frame)
+            sys.exit(0)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stopped or self.version - self.flushed_version >= self.max_pending,
+                    timeout=self.interval,
+                )
+                stopped = self._stopped
+            self.flush()
+            if stopped:
+                return
@@ -0,0 +1,101 @@
+# common/json_provider.py
+"""
+Flask JSON provider that encodes with orjson when it is installed.
+
+FastJSONProvider keeps the output of Flask's default provider: sorted keys,
+compact separators outside debug mode, and the same handling of dates,
+decimals, UUIDs and dataclasses through DefaultJSONProvider.default. The
+only visible difference is that orjson writes non-ASCII characters as UTF-8
+rather than \\u escapes. Values orjson rejects, such as integers wider than
+64 bits, are encoded by the standard library instead.
+
+dumps_bytes() returns the compact encoding as bytes, so that callers can
+cache the encodings of immutable records and join them into list responses
+without encoding every field again.
+"""
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+from common.records import Record
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+JSON_ENCODERS = ("auto", "orjson", "stdlib")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    DefaultJSONProvider with an orjson fast path for dumps, loads and
+    responses. use_orjson=False keeps the standard library throughout.
+    """
+
+    def __init__(self, app, use_orjson=None):
+        super().__init__(app)
+        self.use_orjson = orjson is not None if use_orjson is None else use_orjson
+        if self.use_orjson and orjson is None:
+            raise RuntimeError("orjson is not installed")
+        if orjson is not None:
+            # Dates and dataclasses go through default() to match Flask's output
+            self._orjson_options = (
+                orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            )
+            if self.sort_keys:
+                self._orjson_options |= orjson.OPT_SORT_KEYS
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Record):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+    def dumps_bytes(self, obj):
+        """
+        Encode obj compactly as UTF-8 JSON bytes.
+        """
+        if self.use_orjson:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options)
+            except TypeError:
+                pass
+        return json.dumps(
+            obj,
+            default=self.default,
+            ensure_ascii=self.ensure_ascii,
+            sort_keys=self.sort_keys,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and not kwargs:
+            return self.dumps_bytes(obj).decode("utf-8")
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            # orjson.JSONDecodeError is a ValueError, as Flask expects
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            # Pretty-printed output is left to the standard library
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+def install_json_provider(app):
+    """
+    Replace the JSON provider of app according to JSON_ENCODER: "auto" uses
+    orjson when it is installed, "orjson" requires it and "stdlib" never
+    uses it. Returns the provider.
+    """
+    encoder = app.config.get("JSON_ENCODER", "auto")
+    if encoder not in JSON_ENCODERS:
+        raise ValueError(f"Unsupported JSON_ENCODER {encoder!r}, expected one of {JSON_ENCODERS}")
+    app.json = FastJSONProvider(app, use_orjson=None if encoder == "auto" else encoder == "orjson")
+    return app.json
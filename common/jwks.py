@@ -0,0 +1,279 @@
+# common/jwks.py
+"""
+Asymmetric JWT signing keys and JSON Web Key Sets.
+
+The issuing service keeps its signing keys in a ``KeyRing``: a directory of
+PEM files named by key id. The newest key signs tokens. The older keys still
+verify them until rotation prunes them. The public halves are published as a
+JWKS. The other services verify tokens locally with a ``JWKSClient``, which
+fetches that JWKS once and refetches it when it goes stale or a token names
+an unknown key id.
+
+Run as a script to rotate keys, e.g. from cron:
+
+    python -m common.jwks rotate user_service/jwt_keys --algorithm RS256 --keep 2
+"""
+import argparse
+import json
+import os
+import secrets
+import threading
+import time
+import urllib.request
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt import PyJWK
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+from jwt.exceptions import InvalidTokenError
+
+from common.storage import file_lock
+
+SIGNING_ALGORITHMS = ("RS256", "EdDSA")
+
+
+class KeySetUnavailable(Exception):
+    """Raised when no public keys have been fetched and the JWKS URL cannot be reached."""
+
+
+def generate_private_key(algorithm):
+    """
+    Generate a new private key for one of SIGNING_ALGORITHMS.
+    """
+    if algorithm == "RS256":
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"Unsupported signing algorithm {algorithm!r}, expected one of {SIGNING_ALGORITHMS}")
+
+
+def public_jwk(kid, private_key):
+    """
+    Return the public JWK (as a dict) of private_key, tagged with kid and its algorithm.
+    """
+    public_key = private_key.public_key()
+    if isinstance(private_key, rsa.RSAPrivateKey):
+        jwk = RSAAlgorithm.to_jwk(public_key, as_dict=True)
+        algorithm = "RS256"
+    else:
+        jwk = OKPAlgorithm.to_jwk(public_key, as_dict=True)
+        algorithm = "EdDSA"
+    return {**jwk, "kid": kid, "alg": algorithm, "use": "sig"}
+
+
+class SigningKey:
+    """
+    A private key with its key id and public JWK.
+    """
+
+    def __init__(self, kid, private_key):
+        self.kid = kid
+        self.private_key = private_key
+        self.jwk = public_jwk(kid, private_key)
+        self.algorithm = self.jwk["alg"]
+        self.public_key = PyJWK(self.jwk)
+
+
+class KeyRing:
+    """
+    Directory of PEM signing keys shared by every worker of the issuing service.
+
+    Key ids start with the creation time, so the newest key is the current
+    signing key. The directory is re-listed at most every check_interval
+    seconds so that workers pick up keys rotated by another process. A key
+    is generated on first use, and again whenever the newest key does not
+    match the configured algorithm.
+    """
+
+    def __init__(self, directory, algorithm="RS256", keep=2, check_interval=1.0):
+        if algorithm not in SIGNING_ALGORITHMS:
+            raise ValueError(f"Unsupported signing algorithm {algorithm!r}, expected one of {SIGNING_ALGORITHMS}")
+        self.directory = directory
+        self.algorithm = algorithm
+        self.keep = keep
+        self.check_interval = check_interval
+        self._keys = {}
+        self._listing = None
+        self._checked_at = None
+        self._jwks = None
+        self._lock = threading.Lock()
+
+    def _list(self):
+        return sorted(
+            (name[: -len(".pem")] for name in os.listdir(self.directory) if name.endswith(".pem")),
+            key=lambda kid: (int(kid.split("-", 1)[0]), kid),
+        )
+
+    def _load(self, kids):
+        keys = {}
+        for kid in kids:
+            key = self._keys.get(kid)
+            if key is None:
+                with open(os.path.join(self.directory, f"{kid}.pem"), "rb") as file:
+                    key = SigningKey(kid, serialization.load_pem_private_key(file.read(), password=None))
+            keys[kid] = key
+        self._keys = keys
+        self._listing = kids
+        self._jwks = None
+
+    def _write_key(self):
+        # Creation stamps strictly increase, even across clock steps
+        stamp = time.time_ns()
+        kids = self._list()
+        if kids:
+            stamp = max(stamp, int(kids[-1].split("-", 1)[0]) + 1)
+        kid = f"{stamp}-{secrets.token_hex(4)}"
+        pem = generate_private_key(self.algorithm).private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        path = os.path.join(self.directory, f"{kid}.pem")
+        tmp_path = f"{path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as file:
+            file.write(pem)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    def _prune(self):
+        for kid in self._list()[: -self.keep]:
+            os.remove(os.path.join(self.directory, f"{kid}.pem"))
+
+    def rotate(self):
+        """
+        Generate a new signing key and drop all but the newest ``keep`` keys.
+        Returns the new current key.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, file_lock(os.path.join(self.directory, ".lock"), "exclusive"):
+            self._write_key()
+            self._prune()
+            self._load(self._list())
+            self._checked_at = time.monotonic()
+            return self._keys[self._listing[-1]]
+
+    def refresh(self, force=False):
+        """
+        Re-list the key directory if it has not been checked recently,
+        generating a key when there is none for the configured algorithm.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            os.makedirs(self.directory, exist_ok=True)
+            kids = self._list()
+            if kids != self._listing:
+                self._load(kids)
+            if self._needs_key():
+                with file_lock(os.path.join(self.directory, ".lock"), "exclusive"):
+                    # Another worker may have generated one while we waited
+                    self._load(self._list())
+                    if self._needs_key():
+                        self._write_key()
+                        self._prune()
+                        self._load(self._list())
+
+    def _needs_key(self):
+        return not self._listing or self._keys[self._listing[-1]].algorithm != self.algorithm
+
+    def current(self):
+        """
+        Return the SigningKey new tokens are signed with.
+        """
+        self.refresh()
+        with self._lock:
+            return self._keys[self._listing[-1]]
+
+    def key_for(self, jwt_header, jwt_data):
+        """
+        flask_jwt_extended decode key loader: the public key named by the token's kid.
+        """
+        self.refresh()
+        key = self._keys.get(jwt_header.get("kid"))
+        if key is None:
+            self.refresh(force=True)
+            key = self._keys.get(jwt_header.get("kid"))
+        if key is None:
+            raise InvalidTokenError("Unknown signing key")
+        return key.public_key
+
+    def jwks(self):
+        """
+        Return the JSON Web Key Set of every key in the ring, newest first.
+        """
+        self.refresh()
+        with self._lock:
+            if self._jwks is None:
+                self._jwks = {"keys": [self._keys[kid].jwk for kid in reversed(self._listing)]}
+            return self._jwks
+
+
+class JWKSClient:
+    """
+    Fetches and caches the public keys published at a JWKS URL.
+
+    The key set is refetched after max_age seconds, or when a token names a
+    key id that is not cached, but never more often than min_refresh_interval.
+    If a refetch fails the cached keys stay in use.
+    """
+
+    def __init__(self, url, max_age=300, min_refresh_interval=30, timeout=5, fetch=None):
+        self.url = url
+        self.max_age = max_age
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._fetch = fetch or self._fetch_url
+        self._keys = {}
+        self._fetched_at = None
+        self._attempted_at = None
+        self._lock = threading.Lock()
+
+    def _fetch_url(self):
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            return json.load(response)
+
+    def _refresh(self, now):
+        self._attempted_at = now
+        try:
+            key_set = self._fetch()
+        except (OSError, ValueError):
+            return
+        self._keys = {
+            jwk["kid"]: PyJWK(jwk)
+            for jwk in key_set.get("keys", [])
+            if jwk.get("kid") and jwk.get("alg") in SIGNING_ALGORITHMS
+        }
+        self._fetched_at = now
+
+    def key_for(self, jwt_header, jwt_data):
+        """
+        flask_jwt_extended decode key loader: the public key named by the token's kid.
+        """
+        kid = jwt_header.get("kid")
+        with self._lock:
+            now = time.monotonic()
+            stale = self._fetched_at is None or now - self._fetched_at >= self.max_age
+            throttled = self._attempted_at is not None and now - self._attempted_at < self.min_refresh_interval
+            if (stale or kid not in self._keys) and not throttled:
+                self._refresh(now)
+            if not self._keys:
+                raise KeySetUnavailable(f"No signing keys could be fetched from {self.url}")
+            key = self._keys.get(kid)
+        if key is None:
+            raise InvalidTokenError("Unknown signing key")
+        return key
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rotate the JWT signing keys in a key directory.")
+    parser.add_argument("command", choices=["rotate"])
+    parser.add_argument("directory")
+    parser.add_argument("--algorithm", choices=SIGNING_ALGORITHMS, default="RS256")
+    parser.add_argument("--keep", type=int, default=2, help="number of newest keys left in the JWKS")
+    args = parser.parse_args()
+    key = KeyRing(args.directory, algorithm=args.algorithm, keep=args.keep).rotate()
+    print(f"New {key.algorithm} signing key {key.kid} in {args.directory}")
@@ -0,0 +1,54 @@
+# common/jwt_cache.py
+import hashlib
+import time
+
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.config import config
+
+from common.cache import LRUCache
+
+
+class CachingJWTManager(JWTManager):
+    """
+    JWTManager that remembers the claims of tokens it has already verified.
+
+    Tokens are looked up by a SHA-256 digest of the encoded token and, for
+    HMAC tokens, the secret, so a repeated token skips signature verification
+    and JSON decoding.
+    Entries expire at the token's ``exp`` claim, or after ``max_age`` seconds
+    if that comes first, after which the token is fully verified again.
+    Cookie tokens carrying a CSRF value and ``allow_expired`` decodes bypass
+    the cache. Type, freshness and blocklist checks still run on every request.
+    """
+
+    def __init__(self, app=None, maxsize=10000, max_age=300, add_context_processor=False):
+        self.token_cache = LRUCache(maxsize)
+        self.max_age = max_age
+        super().__init__(app, add_context_processor)
+
+    def _cache_key(self, encoded_token):
+        # Asymmetric tokens name their key by kid in the (hashed) header
+        key = "" if config.is_asymmetric else config.decode_key
+        if isinstance(key, str):
+            key = key.encode()
+        return hashlib.sha256(key + b"." + encoded_token.encode()).digest()
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        cache_key = self._cache_key(encoded_token)
+        cached = self.token_cache.get(cache_key)
+        now = time.time()
+        if cached is not None:
+            claims, expires_at = cached
+            if now < expires_at:
+                return dict(claims)
+            self.token_cache.pop(cache_key)
+
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        expires_at = now + self.max_age
+        if "exp" in claims:
+            expires_at = min(expires_at, claims["exp"])
+        self.token_cache.put(cache_key, (claims, expires_at))
+        return dict(claims)
@@ -0,0 +1,48 @@
+# common/locks.py
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """
+    Lock allowing many concurrent readers or a single writer.
+
+    Writer-preferring: once a writer is waiting, new readers queue behind it,
+    so a steady stream of GETs cannot starve writes. Not reentrant; do not
+    nest read() or write() on the same thread.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writer or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
@@ -0,0 +1,225 @@
+# common/metrics.py
+"""
+Minimal Prometheus-style metrics for the services.
+
+Each service keeps a MetricsRegistry of counters, histograms and gauges and
+serves it at /metrics in the Prometheus text exposition format.
+install_metrics() adds a before/after request hook pair that counts requests
+and times them per route. Recording a sample is a dict update under a lock.
+Gauges are callbacks, evaluated only when /metrics is scraped.
+
+Under gunicorn every worker process keeps its own registry, so a scrape
+reports the worker that served it.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import Response, g, request
+
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    A monotonically increasing count per label combination.
+    """
+
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[name] for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name + _format_labels(self.labelnames, key), value
+
+
+class Histogram:
+    """
+    Observations counted into cumulative buckets, plus their sum and count,
+    per label combination.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        # One slot per bucket plus +Inf; made cumulative when rendered
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the wall-clock seconds spent in the with block.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        state = self._values.get(tuple(labels[name] for name in self.labelnames))
+        return sum(state[0]) if state else 0
+
+    def samples(self):
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = (("le", _format_value(bound)),)
+                yield self.name + "_bucket" + _format_labels(self.labelnames, key, le), cumulative
+            yield self.name + "_sum" + _format_labels(self.labelnames, key), total
+            yield self.name + "_count" + _format_labels(self.labelnames, key), cumulative
+
+
+class Gauge:
+    """
+    A value read from a callback whenever the registry is rendered. With
+    type="counter" it exposes a count kept elsewhere, e.g. cache hits.
+    """
+
+    def __init__(self, name, help, func, labels=None, type="gauge"):
+        self.type = type
+        self.name = name
+        self.help = help
+        self.func = func
+        self.labels = dict(labels or {})
+
+    def samples(self):
+        yield self.name + _format_labels(tuple(self.labels), tuple(self.labels.values())), self.func()
+
+
+class MetricsRegistry:
+    """
+    The metrics of one service, rendered in registration order.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name, help, func, labels=None):
+        return self.register(Gauge(name, help, func, labels))
+
+    def counter_callback(self, name, help, func, labels=None):
+        return self.register(Gauge(name, help, func, labels, type="counter"))
+
+    def render(self):
+        """
+        Return every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        seen = set()
+        for metric in self._metrics:
+            # Gauges may share a name with different labels
+            if metric.name not in seen:
+                seen.add(metric.name)
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.type}")
+            for sample, value in metric.samples():
+                lines.append(f"{sample} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def install_metrics(app, registry):
+    """
+    Count and time every request of app per route, method and status code,
+    and serve registry at /metrics.
+    """
+    requests_total = registry.counter(
+        "http_requests_total", "Requests handled, by route, method and status code.",
+        ("route", "method", "status"),
+    )
+    request_seconds = registry.histogram(
+        "http_request_duration_seconds", "Request latency in seconds, by route and method.",
+        ("route", "method"),
+    )
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop("metrics_start", None)
+        if start is not None:
+            # The URL rule, not the path, so ids do not explode the label set
+            route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+            request_seconds.observe(time.perf_counter() - start, route=route, method=request.method)
+            requests_total.inc(route=route, method=request.method, status=response.status_code)
+        return response
+
+    def metrics():
+        """
+        Get Service Metrics
+        ---
+        responses:
+          200:
+            description: Request counts, latency histograms and service metrics in the Prometheus text format
+        """
+        return Response(registry.render(), content_type=CONTENT_TYPE)
+
+    app.add_url_rule("/metrics", "metrics", metrics, methods=["GET"])
+    return requests_total, request_seconds
@@ -0,0 +1,175 @@
+# common/profiling.py
+"""
+Opt-in per-request profiling for the services.
+
+install_profiling() wraps the app's WSGI callable so that a sampled fraction
+of requests, and requests whose X-Profile header carries the configured
+token, run under a profiler. Each profile is written to a directory per
+route:
+
+- "collapsed" appends folded stacks ("root;caller;callee <microseconds>")
+  to <dir>/<route>.collapsed. The lines from many requests add up into one
+  flamegraph, e.g. ``flamegraph.pl profiles/POST_login.collapsed > login.svg``.
+- "cprofile" writes one pstats file per request to <dir>/<route>/, to be read
+  with ``python -m pstats`` or snakeviz.
+
+Nothing is installed while sampling and the header are both disabled, so the
+hook costs nothing until it is turned on. When enabled, an unsampled request
+costs one random() call and a header lookup. At most one request per process
+is profiled at a time; others that would be sampled meanwhile run unprofiled.
+The profile covers the whole Flask request, hooks included, but not the
+iteration of streamed response bodies.
+"""
+import cProfile
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from werkzeug.exceptions import HTTPException
+
+PROFILE_FORMATS = ("collapsed", "cprofile")
+PROFILE_HEADER = "X-Profile"
+
+
+def route_slug(method, rule):
+    """
+    File-name-safe name of a route, e.g. "POST_login" or "GET_destinations_string_id".
+    """
+    return re.sub(r"[^A-Za-z0-9]+", "_", f"{method} {rule}").strip("_")
+
+
+def _frame_name(frame):
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_qualname}"
+
+
+def _builtin_name(func):
+    return f"{getattr(func, '__module__', None) or 'builtins'}.{getattr(func, '__qualname__', repr(func))}"
+
+
+class StackProfiler:
+    """
+    Deterministic profiler that records the self time of every distinct call
+    stack of the current thread, for collapsed-stack flamegraphs.
+    """
+
+    def __init__(self, root):
+        self.totals = defaultdict(int)
+        self._paths = [root]
+        self._last = None
+
+    def _event(self, frame, event, arg):
+        now = time.perf_counter_ns()
+        self.totals[self._paths[-1]] += now - self._last
+        if event == "call":
+            self._paths.append(self._paths[-1] + ";" + _frame_name(frame))
+        elif event == "c_call":
+            self._paths.append(self._paths[-1] + ";" + _builtin_name(arg))
+        elif len(self._paths) > 1:
+            # return, c_return and c_exception leave the current function
+            self._paths.pop()
+        self._last = time.perf_counter_ns()
+
+    def enable(self):
+        self._last = time.perf_counter_ns()
+        sys.setprofile(self._event)
+
+    def disable(self):
+        sys.setprofile(None)
+
+    def lines(self):
+        """
+        Yield one "stack microseconds" line per stack that took at least 1µs.
+        """
+        for path, nanoseconds in self.totals.items():
+            if nanoseconds >= 1000:
+                yield f"{path} {nanoseconds // 1000}\n"
+
+
+class ProfilingMiddleware:
+    """
+    WSGI middleware that profiles sampled requests and writes the results
+    per route under directory.
+    """
+
+    def __init__(self, wsgi_app, url_map, directory, sample_rate=0.0, token=None, format="collapsed"):
+        if format not in PROFILE_FORMATS:
+            raise ValueError(f"Unsupported profile format {format!r}, expected one of {PROFILE_FORMATS}")
+        self.wsgi_app = wsgi_app
+        self.url_map = url_map
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.token = token
+        # WSGI header values are latin-1 strings; compare bytes so that
+        # non-ASCII values are rejected instead of raising
+        self._token_bytes = None if token is None else token.encode("utf-8")
+        self.format = format
+        self._header_key = "HTTP_" + PROFILE_HEADER.upper().replace("-", "_")
+        self._lock = threading.Lock()
+
+    def _requested(self, environ):
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        value = environ.get(self._header_key)
+        if value is None or self._token_bytes is None:
+            return False
+        return hmac.compare_digest(value.encode("latin-1", "replace"), self._token_bytes)
+
+    def _route(self, environ):
+        try:
+            rule, _ = self.url_map.bind_to_environ(environ).match(return_rule=True)
+            return route_slug(environ["REQUEST_METHOD"], rule.rule)
+        except HTTPException:
+            return route_slug(environ["REQUEST_METHOD"], "unmatched")
+
+    def __call__(self, environ, start_response):
+        if not self._requested(environ) or not self._lock.acquire(blocking=False):
+            return self.wsgi_app(environ, start_response)
+        try:
+            route = self._route(environ)
+            profiler = StackProfiler(route) if self.format == "collapsed" else cProfile.Profile()
+            profiler.enable()
+            try:
+                return self.wsgi_app(environ, start_response)
+            finally:
+                profiler.disable()
+                self._write(route, profiler)
+        finally:
+            self._lock.release()
+
+    def _write(self, route, profiler):
+        os.makedirs(self.directory, exist_ok=True)
+        if self.format == "collapsed":
+            # One write per request, so O_APPEND keeps other workers' lines whole
+            with open(os.path.join(self.directory, f"{route}.collapsed"), "a") as file:
+                file.write("".join(profiler.lines()))
+        else:
+            route_directory = os.path.join(self.directory, route)
+            os.makedirs(route_directory, exist_ok=True)
+            profiler.dump_stats(os.path.join(route_directory, f"{time.time_ns()}-{os.getpid()}.prof"))
+
+
+def install_profiling(app):
+    """
+    Profile requests of app as configured by PROFILE_SAMPLE_RATE,
+    PROFILE_TOKEN, PROFILE_FORMAT and PROFILE_DIR. Returns the middleware,
+    or None when profiling is disabled.
+    """
+    sample_rate = app.config.get("PROFILE_SAMPLE_RATE") or 0.0
+    token = app.config.get("PROFILE_TOKEN") or None
+    if sample_rate <= 0 and token is None:
+        return None
+    middleware = ProfilingMiddleware(
+        app.wsgi_app,
+        app.url_map,
+        app.config["PROFILE_DIR"],
+        sample_rate=sample_rate,
+        token=token,
+        format=app.config.get("PROFILE_FORMAT", "collapsed"),
+    )
+    app.wsgi_app = middleware
+    return middleware
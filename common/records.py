@@ -0,0 +1,75 @@
+# common/records.py
+"""
+Compact record types for the in-memory stores.
+
+A plain dict per record costs a hash table plus a pointer to every key,
+which adds up across millions of records in every worker. A Record keeps
+its values in __slots__ instead and reads like a read-only mapping, so
+record["id"], record.get("location"), {**record} and dict(record) behave as
+they did for the dicts. Values of fields listed in INTERNED, such as roles
+and locations, are interned so that repeated values share one string.
+
+Records are never modified in place; a change builds a new record. They
+encode to the same JSON object as the dict they came from, with fields in
+FIELDS order, through json_default() or dict(record).
+"""
+import sys
+from collections.abc import Mapping
+
+
+class Record(Mapping):
+    """
+    Base class for slotted read-only records. Subclasses set __slots__ to
+    their field names, in the order they are serialized.
+    """
+
+    __slots__ = ()
+    # Fields whose string values are interned
+    INTERNED = frozenset()
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a record from a mapping holding every field.
+        """
+        record = cls.__new__(cls)
+        interned = cls.INTERNED
+        for field in cls.__slots__:
+            value = data[field]
+            if field in interned and type(value) is str:
+                value = sys.intern(value)
+            setattr(record, field, value)
+        return record
+
+    @classmethod
+    def coerce(cls, data):
+        """
+        Return data as a record of this type, converting a dict if needed.
+        """
+        return data if type(data) is cls else cls.from_dict(data)
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def json_default(obj):
+    """
+    json.dumps default hook that encodes records as JSON objects.
+    """
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
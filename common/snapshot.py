@@ -0,0 +1,131 @@
+# common/snapshot.py
+"""
+Versioned JSON-lines snapshot format for the in-memory stores.
+
+A snapshot file looks like:
+
+    {"format": "hotel-snapshot", "version": 1, "name": "users"}
+    {"email": "user@example.com", ...}
+    ...
+    {"count": 2, "sha256": "..."}
+
+The trailer carries the record count and a SHA-256 digest of the record
+lines, so truncation or a flipped byte is reported instead of silently
+loading an empty store. Records are streamed one line at a time.
+
+Run as a script to migrate the legacy ``name = [...]`` Python files:
+
+    python -m common.snapshot user_service/user_data.py user_service/user_data.jsonl
+"""
+import ast
+import hashlib
+import json
+import os
+import sys
+
+from common.records import json_default
+
+SNAPSHOT_FORMAT = "hotel-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is corrupt or has an unsupported version."""
+
+
+def write_snapshot(path, name, records):
+    """
+    Stream records into a snapshot file at path and fsync it.
+    """
+    digest = hashlib.sha256()
+    count = 0
+    with open(path, "w", encoding="utf-8") as file:
+        header = {"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION, "name": name}
+        file.write(json.dumps(header) + "\n")
+        for record in records:
+            line = json.dumps(record, separators=(",", ":"), default=json_default)
+            digest.update(line.encode("utf-8"))
+            file.write(line + "\n")
+            count += 1
+        file.write(json.dumps({"count": count, "sha256": digest.hexdigest()}) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+    return count
+
+
+def read_snapshot(path):
+    """
+    Yield the records of the snapshot at path, verifying the trailer once
+    the last record has been read. An empty file is an empty snapshot.
+    """
+    digest = hashlib.sha256()
+    with open(path, "r", encoding="utf-8") as file:
+        header_line = file.readline()
+        if not header_line:
+            return
+        try:
+            header = json.loads(header_line)
+        except ValueError:
+            raise SnapshotError(f"{path}: unreadable snapshot header")
+        if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+            raise SnapshotError(f"{path}: not a snapshot file")
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise SnapshotError(f"{path}: unsupported snapshot version {header.get('version')}")
+
+        count = 0
+        previous = None
+        for line in file:
+            line = line.rstrip("\n")
+            if previous is not None:
+                digest.update(previous.encode("utf-8"))
+                count += 1
+                try:
+                    record = json.loads(previous)
+                except ValueError:
+                    raise SnapshotError(f"{path}: corrupt record on line {count + 1}")
+                yield record
+            previous = line
+
+    # The last line read is the trailer
+    try:
+        trailer = json.loads(previous) if previous is not None else None
+    except ValueError:
+        trailer = None
+    if not isinstance(trailer, dict) or "sha256" not in trailer:
+        raise SnapshotError(f"{path}: missing snapshot trailer (truncated file?)")
+    if trailer.get("count") != count or trailer["sha256"] != digest.hexdigest():
+        raise SnapshotError(f"{path}: snapshot checksum mismatch")
+
+
+def read_legacy_snapshot(path):
+    """
+    Return the records stored in a legacy ``name = [...]`` Python file.
+    """
+    with open(path, "r") as file:
+        content = file.read()
+    try:
+        return ast.literal_eval(content.split("=", 1)[1].strip())
+    except (SyntaxError, ValueError, IndexError):
+        raise SnapshotError(f"{path}: unreadable legacy data file")
+
+
+def migrate_legacy_snapshot(legacy_path, snapshot_path, name=None):
+    """
+    Convert a legacy Python data file into a snapshot. Returns the number
+    of records written.
+    """
+    if name is None:
+        with open(legacy_path, "r") as file:
+            name = file.read().split("=", 1)[0].strip() or "records"
+    records = read_legacy_snapshot(legacy_path)
+    tmp_path = f"{snapshot_path}.tmp"
+    count = write_snapshot(tmp_path, name, records)
+    os.replace(tmp_path, snapshot_path)
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m common.snapshot LEGACY_FILE.py SNAPSHOT_FILE.jsonl")
+    written = migrate_legacy_snapshot(sys.argv[1], sys.argv[2])
+    print(f"Migrated {written} records from {sys.argv[1]} to {sys.argv[2]}")
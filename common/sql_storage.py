@@ -0,0 +1,259 @@
+# common/sql_storage.py
+import json
+import sys
+import threading
+from contextlib import contextmanager, nullcontext
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    bindparam,
+    create_engine,
+    event,
+    select,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+
+from common.records import json_default
+from common.snapshot import read_snapshot
+from common.storage import StorageEngine, file_lock
+
+# Keys per IN (...) clause, below SQLite's bound parameter limit
+IN_CLAUSE_CHUNK = 500
+
+
+class SQLStorage(StorageEngine):
+    """
+    Persist records as rows of a SQL table through SQLAlchemy.
+
+    Each record is one JSON row under an indexed primary key column named
+    after the record key (email for users, id for destinations), so a write
+    costs a few indexed statements however large the table grows. Entries
+    are buffered and written by flush() in one transaction, with inserts
+    and updates each sent as a single executemany batch.
+
+    Deletes leave a tombstone row and every write stamps its rows with the
+    next value of a per-table sequence. In shared mode refresh() returns the
+    rows changed since the last sequence this process saw, so several worker
+    processes can serve from the same database. SQLite databases run in WAL
+    mode so readers do not block the writer.
+
+    Run as a script to copy a snapshot file into a table:
+
+        python -m common.sql_storage user_service/user_data.jsonl sqlite:///user_data.db users email
+    """
+
+    def __init__(self, url, table, key, batch_size=100, shared=False, lock_path=None,
+                 pool_size=5, max_overflow=10, pool_recycle=1800):
+        self.key = key
+        self.table_name = table
+        self.batch_size = batch_size
+        self.shared = shared
+        self.pending = []
+        self._lock = threading.RLock()
+        self._last_seq = 0
+        # True while this process holds rows past _last_seq: its own writes
+        # when another writer got in between, or rows committed during load()
+        self._ahead = False
+
+        self.engine = create_engine(
+            url,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=True,
+        )
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine, "connect", _set_sqlite_pragmas)
+            # SQLite has no row locks, so shared writers serialize on a file
+            if lock_path is None and self.engine.url.database not in (None, "", ":memory:"):
+                lock_path = f"{self.engine.url.database}.lock"
+        self.lock_path = lock_path
+
+        metadata = MetaData()
+        self.table = Table(
+            table,
+            metadata,
+            Column(key, String(255), primary_key=True),
+            Column("position", Integer, nullable=False, index=True),
+            Column("seq", Integer, nullable=False, index=True),
+            Column("deleted", Boolean, nullable=False, default=False),
+            Column("data", Text),
+        )
+        self.sequences = Table(
+            "storage_sequences",
+            metadata,
+            Column("name", String(64), primary_key=True),
+            Column("value", Integer, nullable=False),
+        )
+        metadata.create_all(self.engine)
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(self.sequences.insert().values(name=table, value=0))
+        except IntegrityError:
+            pass  # Created by an earlier run or another worker
+
+    def load(self):
+        with self._lock:
+            # Write out unflushed entries so reloading never drops a mutation
+            self.flush()
+            with self.engine.connect() as connection:
+                # Read the sequence first: rows committed after it are replayed
+                # again by refresh(), which is harmless
+                self._last_seq = self._current_seq(connection)
+                self._ahead = self.shared
+                rows = connection.execution_options(yield_per=1000).execute(
+                    select(self.table.c.data)
+                    .where(self.table.c.deleted == False)  # noqa: E712
+                    .order_by(self.table.c.position)
+                )
+                return [json.loads(data) for (data,) in rows]
+
+    def refresh(self):
+        if not self.shared:
+            return []
+        with self._lock, self.engine.connect() as connection:
+            rows = connection.execute(
+                select(self.table.c[self.key], self.table.c.seq, self.table.c.deleted, self.table.c.data)
+                .where(self.table.c.seq > self._last_seq)
+                .order_by(self.table.c.seq)
+            ).all()
+            entries = []
+            for key, seq, deleted, data in rows:
+                if deleted:
+                    entries.append({"op": "delete", "key": key})
+                else:
+                    entries.append({"op": "put", "key": key, "record": json.loads(data)})
+                self._last_seq = seq
+            self._ahead = False
+            return entries
+
+    @contextmanager
+    def transaction(self):
+        shared_lock = file_lock(self.lock_path, "exclusive") if self.shared and self.lock_path else nullcontext()
+        with self._lock, shared_lock:
+            yield
+            if self.shared:
+                self.flush()
+
+    def append(self, op, key, record=None):
+        entry = {"op": op, "key": key}
+        if record is not None:
+            entry["record"] = record
+        with self._lock:
+            self.pending.append(entry)
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def append_many(self, op, items):
+        # One transaction and one executemany per statement for the whole batch
+        with self._lock:
+            for key, record in items:
+                entry = {"op": op, "key": key}
+                if record is not None:
+                    entry["record"] = record
+                self.pending.append(entry)
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self.pending:
+                return
+
+            # Only the last entry per key matters
+            latest = {}
+            for entry in self.pending:
+                latest.pop(entry["key"], None)
+                latest[entry["key"]] = entry
+            entries = list(latest.values())
+
+            with self.engine.begin() as connection:
+                # Reserve a block of sequence numbers; this also takes the
+                # write lock, so sequence order matches commit order
+                connection.execute(
+                    update(self.sequences)
+                    .where(self.sequences.c.name == self.table_name)
+                    .values(value=self.sequences.c.value + len(entries))
+                )
+                end = self._current_seq(connection)
+                start = end - len(entries) + 1
+
+                existing = set()
+                keys = list(latest)
+                for i in range(0, len(keys), IN_CLAUSE_CHUNK):
+                    existing.update(
+                        connection.execute(
+                            select(self.table.c[self.key]).where(self.table.c[self.key].in_(keys[i:i + IN_CLAUSE_CHUNK]))
+                        ).scalars()
+                    )
+
+                inserts, updates = [], []
+                for seq, entry in enumerate(entries, start):
+                    deleted = entry["op"] == "delete"
+                    data = None if deleted else json.dumps(entry["record"], default=json_default)
+                    if entry["key"] in existing:
+                        updates.append({"b_key": entry["key"], "b_seq": seq, "b_deleted": deleted, "b_data": data})
+                    elif not deleted:
+                        inserts.append({self.key: entry["key"], "position": seq, "seq": seq, "deleted": False, "data": data})
+
+                if inserts:
+                    connection.execute(self.table.insert(), inserts)
+                if updates:
+                    connection.execute(
+                        update(self.table)
+                        .where(self.table.c[self.key] == bindparam("b_key"))
+                        .values(seq=bindparam("b_seq"), deleted=bindparam("b_deleted"), data=bindparam("b_data")),
+                        updates,
+                    )
+
+            # Skip our own rows in refresh() unless another writer got in between
+            if self._last_seq == start - 1:
+                self._last_seq = end
+            else:
+                self._ahead = True
+            self.pending = []
+
+    def position(self):
+        with self._lock:
+            if self.pending or self._ahead:
+                return None
+            return str(self._last_seq)
+
+    def _current_seq(self, connection):
+        return connection.execute(
+            select(self.sequences.c.value).where(self.sequences.c.name == self.table_name)
+        ).scalar_one()
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def import_snapshot(snapshot_path, url, table, key, batch_size=1000):
+    """
+    Copy every record of a snapshot file into a SQL table. Returns the count.
+    """
+    storage = SQLStorage(url, table, key, batch_size=batch_size)
+    storage.load()
+    count = 0
+    for record in read_snapshot(snapshot_path):
+        storage.append("put", record[key], record)
+        count += 1
+    storage.flush()
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 5:
+        sys.exit("usage: python -m common.sql_storage SNAPSHOT_FILE.jsonl URL TABLE KEY")
+    imported = import_snapshot(*sys.argv[1:])
+    print(f"Imported {imported} records into {sys.argv[3]}")
@@ -0,0 +1,437 @@
+# common/storage.py
+import json
+import os
+import threading
+import importlib
+from contextlib import contextmanager, nullcontext
+from common.records import json_default
+from common.snapshot import read_legacy_snapshot, read_snapshot, write_snapshot
+
+
+@contextmanager
+def file_lock(path, mode):
+    """
+    Hold a "shared" or "exclusive" flock on path, across processes.
+    """
+    import fcntl  # POSIX only, and only needed for shared storage
+
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH if mode == "shared" else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class StorageEngine:
+    """
+    Base class for the pluggable persistence backends used by the services.
+
+    Services keep their records in memory and hand every mutation to the
+    engine as a log entry. The engine decides how and when it reaches disk.
+    """
+
+    # True when several processes read and write the same persisted state
+    shared = False
+
+    @property
+    def lock(self):
+        """
+        The engine's reentrant thread lock. Hold it while applying what
+        refresh() returned, so that threads apply batches in log order.
+        """
+        return self._lock
+
+    def load(self):
+        """
+        Return the persisted records as a list, in insertion order.
+        """
+        raise NotImplementedError
+
+    def append(self, op, key, record=None):
+        """
+        Record a "put" or "delete" of the record identified by key.
+        """
+        raise NotImplementedError
+
+    def append_many(self, op, items):
+        """
+        Record the same op for many (key, record) pairs and make them durable
+        together.
+        """
+        for key, record in items:
+            self.append(op, key, record)
+        self.flush()
+
+    def refresh(self):
+        """
+        Return entries persisted by other processes since the last load() or
+        refresh(), or None when the caller must load() again.
+        """
+        return []
+
+    @contextmanager
+    def transaction(self):
+        """
+        Serialize a read-check-write sequence against other writers.
+        """
+        yield
+
+    def flush(self):
+        """
+        Make every appended entry durable.
+        """
+
+    def position(self):
+        """
+        Return an opaque name for the persisted state made of every entry
+        this process has read or written, the same in every process that
+        has read the same entries; None when this process holds changes
+        that are not part of it yet.
+        """
+        return None
+
+    def needs_compaction(self):
+        """
+        Return True when the engine would benefit from a compact() call.
+        """
+        return False
+
+    def compact(self, records):
+        """
+        Replace the persisted state with the given list of records.
+        """
+
+
+class LogStorage(StorageEngine):
+    """
+    Append-only log of put/delete entries on top of a snapshot file.
+
+    The snapshot uses the checksummed format from common.snapshot. When it
+    does not exist yet, records are read from legacy_path (a legacy
+    ``name = [...]`` Python file) if one is given.
+
+    Entries are buffered and written to the log in batches with a single
+    fsync. Once the log holds compact_ratio times as many entries as the
+    snapshot has records (and at least compact_threshold), the caller should
+    compact(), which rewrites the snapshot and starts a new log file. Tying
+    compaction to the snapshot size keeps its amortized cost per write
+    constant however large the store grows. Replaying the log is idempotent,
+    so a crash between those two steps is harmless, and a torn last line
+    left by a crash is cut off on load.
+
+    With shared=True several processes (e.g. gunicorn workers) use the same
+    files. Writes happen inside transaction(), which holds an exclusive
+    flock and flushes on exit, and refresh() tails the log for entries other
+    processes wrote. A compaction replaces the log file, which tells the
+    other processes to load() again.
+
+    All methods are safe to call from a background flusher thread while
+    request threads keep appending.
+    """
+
+    def __init__(self, snapshot_path, log_path, key, name,
+                 batch_size=100, compact_threshold=1000, compact_ratio=1.0, legacy_path=None, shared=False):
+        self.snapshot_path = snapshot_path
+        self.legacy_path = legacy_path
+        self.log_path = log_path
+        self.lock_path = f"{log_path}.lock"
+        self.key = key
+        self.name = name
+        self.batch_size = batch_size
+        self.compact_threshold = compact_threshold
+        self.compact_ratio = compact_ratio
+        self.shared = shared
+        self.pending = []
+        self.log_entries = 0
+        self.snapshot_records = 0
+        self._snapshot_mtime = 0
+        self._lock = threading.RLock()
+        # Kept open so a log replaced by another process's compaction is
+        # detected by inode, with _offset marking how far it has been read
+        self._log_file = None
+        self._offset = 0
+        # Entries of other processes read by flush() before appending,
+        # returned by the next refresh()
+        self._unread = []
+        # The cross-process lock is taken through one file descriptor and
+        # counted, so load() inside transaction() does not flock a second
+        # descriptor and wait on this process's own lock
+        self._lock_file = None
+        self._lock_mode = None
+        self._lock_depth = 0
+
+    def load(self):
+        # Entries not yet flushed are written out first, so reloading never
+        # drops a mutation; that takes the exclusive lock in shared mode
+        with self._lock, self._file_lock("exclusive" if self.pending else "shared"):
+            self.flush()
+            records = {}
+            for record in self._read_snapshot():
+                records[record[self.key]] = record
+            self.snapshot_records = len(records)
+            self._snapshot_mtime = self._stat_snapshot()
+
+            self.log_entries = 0
+            self._unread = []
+            if self.shared:
+                # Make sure every process holds the same log file open
+                open(self.log_path, "ab").close()
+            self._open_log()
+            for entry in self._read_new_entries():
+                self._apply(records, entry)
+                self.log_entries += 1
+
+            # No writer can be active here, so leftover bytes are a torn
+            # write from a crash; drop them before anything is appended
+            if self._log_file is not None and os.fstat(self._log_file.fileno()).st_size > self._offset:
+                os.truncate(self.log_path, self._offset)
+            return list(records.values())
+
+    def refresh(self):
+        """
+        Return the entries other processes appended since the last load() or
+        refresh(), or None when the log was compacted and the caller must
+        load() again.
+        """
+        if not self.shared:
+            return []
+        with self._lock:
+            if self._log_replaced():
+                return None
+            entries = list(self._read_new_entries())
+            self.log_entries += len(entries)
+            entries, self._unread = self._unread + entries, []
+            return entries
+
+    @contextmanager
+    def transaction(self):
+        """
+        Serialize a read-check-write sequence. In shared mode this holds the
+        cross-process lock and flushes on exit; callers refresh() first so
+        their checks see writes from other processes. Entries other processes
+        wrote in the meantime are never skipped: flush() reads them before
+        appending and the next refresh() returns them.
+        """
+        with self._lock, self._file_lock("exclusive"):
+            yield
+            if self.shared:
+                self.flush()
+
+    def append(self, op, key, record=None):
+        entry = {"op": op, "key": key}
+        if record is not None:
+            entry["record"] = record
+        with self._lock:
+            self.pending.append(entry)
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def append_many(self, op, items):
+        # One log write and fsync for the whole batch
+        with self._lock:
+            for key, record in items:
+                entry = {"op": op, "key": key}
+                if record is not None:
+                    entry["record"] = record
+                self.pending.append(entry)
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self.pending:
+                return
+            data = "".join(json.dumps(entry, default=json_default) + "\n" for entry in self.pending).encode("utf-8")
+            replaced = self.shared and self._log_replaced()
+            if self.shared and not replaced:
+                # Entries other processes appended since the last refresh()
+                # precede ours; read them now so skipping our own bytes below
+                # does not skip them too
+                unread = list(self._read_new_entries())
+                self.log_entries += len(unread)
+                self._unread.extend(unread)
+            with open(self.log_path, "ab") as file:
+                end = file.tell()
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            self.log_entries += len(self.pending)
+            self.pending = []
+
+            # Our own entries are already applied in memory; skip past them.
+            # A replaced log makes refresh() ask for a load() instead.
+            if replaced:
+                return
+            if self._log_file is None:
+                self._open_log()
+                self._offset = end + len(data)
+            elif self._offset == end:
+                self._offset += len(data)
+
+    def position(self):
+        with self._lock:
+            if self.pending or self._unread:
+                return None
+            # The snapshot's mtime and the log's inode change with every
+            # compaction; the offset counts the entries read since
+            inode = 0 if self._log_file is None else os.fstat(self._log_file.fileno()).st_ino
+            return f"{self._snapshot_mtime:x}-{inode:x}-{self._offset:x}"
+
+    def needs_compaction(self):
+        threshold = max(self.compact_threshold, self.compact_ratio * self.snapshot_records)
+        return self.log_entries + len(self.pending) >= threshold
+
+    def compact(self, records):
+        """
+        Fold the log into a new snapshot. records must be the in-memory state
+        of every entry this process has read. The snapshot is written without
+        holding the lock, so appends carry on meanwhile; entries appended
+        in the meantime are then moved into the new log file.
+        """
+        with self._lock, self._file_lock("exclusive"):
+            self.flush()
+            if self.shared and self._log_replaced():
+                # Another process compacted; the next refresh() reloads
+                return
+            if self._log_file is None:
+                open(self.log_path, "ab").close()
+                self._open_log()
+            if self._unread:
+                # Entries flush() read ahead of our own are not in memory yet
+                state = {record[self.key]: record for record in records}
+                for entry in self._unread:
+                    self._apply(state, entry)
+                records = list(state.values())
+            else:
+                records = list(records)
+            log_file, mark = self._log_file, self._offset
+
+        # Unique per writer: workers may write their snapshots concurrently
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        count = write_snapshot(tmp_path, self.name, records)
+
+        with self._lock, self._file_lock("exclusive"):
+            if self._log_file is not log_file or self._log_replaced():
+                # Someone else compacted first; their snapshot is as good
+                os.remove(tmp_path)
+                return
+            log_file.seek(mark)
+            tail = log_file.read()
+            # Start a new log file rather than truncating, so processes still
+            # reading the old one see the inode change. A crash between the
+            # two renames replays the whole old log, which is idempotent.
+            tmp_log_path = f"{self.log_path}.tmp"
+            with open(tmp_log_path, "wb") as file:
+                file.write(tail)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            os.replace(tmp_log_path, self.log_path)
+            read = self._offset - mark
+            self._open_log()
+            self._offset = read
+            self.log_entries = tail.count(b"\n")
+            self.snapshot_records = count
+            self._snapshot_mtime = self._stat_snapshot()
+
+    def _file_lock(self, mode):
+        if not self.shared:
+            return nullcontext()
+        return self._held_file_lock(mode)
+
+    @contextmanager
+    def _held_file_lock(self, mode):
+        # Callers hold self._lock, so only one thread gets here at a time
+        import fcntl  # POSIX only, and only needed for shared storage
+
+        if self._lock_file is None:
+            self._lock_file = open(self.lock_path, "a")
+        previous = self._lock_mode
+        if previous is None or (mode == "exclusive" and previous == "shared"):
+            fcntl.flock(self._lock_file, fcntl.LOCK_SH if mode == "shared" else fcntl.LOCK_EX)
+            self._lock_mode = mode
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                self._lock_mode = None
+            elif self._lock_mode != previous:
+                fcntl.flock(self._lock_file, fcntl.LOCK_SH)
+                self._lock_mode = previous
+
+    def _read_snapshot(self):
+        # Corrupt snapshots raise SnapshotError rather than loading as empty
+        if os.path.exists(self.snapshot_path):
+            return read_snapshot(self.snapshot_path)
+        if self.legacy_path and os.path.exists(self.legacy_path):
+            return read_legacy_snapshot(self.legacy_path)
+        return []
+
+    def _stat_snapshot(self):
+        try:
+            return os.stat(self.snapshot_path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _open_log(self):
+        if self._log_file is not None:
+            self._log_file.close()
+        try:
+            self._log_file = open(self.log_path, "rb")
+        except FileNotFoundError:
+            self._log_file = None
+        self._offset = 0
+
+    def _log_replaced(self):
+        try:
+            inode = os.stat(self.log_path).st_ino
+        except FileNotFoundError:
+            return self._log_file is not None
+        return self._log_file is None or inode != os.fstat(self._log_file.fileno()).st_ino
+
+    def _read_new_entries(self):
+        if self._log_file is None:
+            return
+        self._log_file.seek(self._offset)
+        for line in self._log_file:
+            # A line without its newline is still being written (or was torn)
+            if not line.endswith(b"\n"):
+                return
+            self._offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Complete lines are always written whole; skip disk corruption
+                continue
+            yield entry
+
+    def _apply(self, records, entry):
+        if entry["op"] == "put":
+            records[entry["key"]] = entry["record"]
+        elif entry["op"] == "delete":
+            records.pop(entry["key"], None)
+
+
+# Engines are imported on first use so optional dependencies (SQLAlchemy)
+# are only needed by the services that select them
+STORAGE_ENGINES = {
+    "log": "common.storage:LogStorage",
+    "sql": "common.sql_storage:SQLStorage",
+}
+
+
+def create_storage(engine, **options):
+    """
+    Build a storage engine by name, e.g. create_storage("log", ...).
+    """
+    try:
+        module_name, class_name = STORAGE_ENGINES[engine].split(":")
+    except KeyError:
+        raise ValueError(f"Unknown storage engine: {engine}")
+    engine_class = getattr(importlib.import_module(module_name), class_name)
+    return engine_class(**options)
@@ -0,0 +1,216 @@
+# common/validation.py
+"""
+Request validation shared by the services.
+
+Patterns are compiled once at import. Each request body is described by a
+JSON schema, which is compiled once into plain predicates, because running
+a generic jsonschema validator per request costs tens of microseconds. A
+Validator reports every problem in the body at once, as {"field", "error"}
+dicts, so a client can fix all its fields in one round trip. Error messages
+come from ``x-messages`` entries in the schema, keyed by the failing keyword.
+
+jsonschema is only imported when a schema uses a keyword that is not
+compiled here, which keeps it off the services' startup path; the tests
+check the shared schemas against the JSON Schema metaschema instead.
+"""
+import math
+import re
+
+EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+# At least one uppercase letter and one digit, checked in a single match
+PASSWORD_PATTERN = re.compile(r"^(?=[^A-Z]*[A-Z])(?=[^0-9]*[0-9])")
+PASSWORD_MIN_LENGTH = 8
+USER_ROLES = ("User", "Admin")
+
+MISSING_MESSAGE = "Missing field"
+EMAIL_MESSAGE = "Invalid email format"
+PASSWORD_MESSAGE = "Password must be at least 8 characters long, include 1 uppercase letter and 1 number"
+
+
+def is_valid_email(value):
+    return isinstance(value, str) and EMAIL_PATTERN.match(value) is not None
+
+
+def check_price(value):
+    """
+    Prices may be numbers or numeric strings, and must be positive and finite.
+    """
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return "Invalid price format."
+    # NaN compares false with everything and would corrupt the price index
+    if not math.isfinite(price):
+        return "Invalid price format."
+    if price <= 0:
+        return "Price per night must be a positive number."
+    return None
+
+
+# Python types for each JSON schema type; bool is excluded from numbers below
+PYTHON_TYPES = {
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list,),
+    "null": (type(None),),
+}
+
+
+def _compile_rule(keyword, argument):
+    """
+    Turn one schema keyword into a predicate, or None when it is not one of
+    the keywords compiled here.
+    """
+    if keyword == "type":
+        types = [argument] if isinstance(argument, str) else argument
+        python_types = tuple(t for name in types for t in PYTHON_TYPES[name])
+        if "boolean" in types or not {"number", "integer"} & set(types):
+            return lambda value: isinstance(value, python_types)
+        return lambda value: isinstance(value, python_types) and value is not True and value is not False
+    if keyword == "minLength":
+        return lambda value: not isinstance(value, str) or len(value) >= argument
+    if keyword == "pattern":
+        search = re.compile(argument).search
+        return lambda value: not isinstance(value, str) or search(value) is not None
+    if keyword == "enum":
+        return lambda value: value in argument
+    return None
+
+
+class Validator:
+    """
+    A JSON schema for a request body compiled to plain Python checks, plus
+    per-field checks that a schema cannot express.
+
+    Each property's type, minLength, pattern and enum keywords become
+    predicates run in schema order; a property using any other keyword is
+    validated by jsonschema instead. Required fields that are absent, None or empty
+    strings are reported together as missing. checks maps a field name to a
+    function that returns an error message for a bad value, or None.
+    """
+
+    def __init__(self, schema, checks=None):
+        self._required = schema.get("required", [])
+        self._fields = []
+        for field, field_schema in schema.get("properties", {}).items():
+            messages = field_schema.get("x-messages", {})
+            rules = []
+            for keyword, argument in field_schema.items():
+                if keyword in ("x-messages", "description"):
+                    continue
+                predicate = _compile_rule(keyword, argument)
+                if predicate is None:
+                    from jsonschema import Draft202012Validator
+
+                    rules = Draft202012Validator(field_schema)
+                    break
+                rules.append((predicate, messages.get(keyword, f"Failed {keyword} check.")))
+            self._fields.append((field, rules, (checks or {}).get(field)))
+
+    def _field_error(self, rules, value):
+        if not isinstance(rules, list):
+            error = next(rules.iter_errors(value), None)
+            if error is None:
+                return None
+            return error.schema.get("x-messages", {}).get(error.validator, error.message)
+        for predicate, message in rules:
+            if not predicate(value):
+                return message
+        return None
+
+    def errors(self, data):
+        """
+        Return every problem with data as a list of {"field", "error"} dicts,
+        in schema field order; an empty list means data is valid.
+        """
+        if not isinstance(data, dict):
+            return [{"field": None, "error": "Body must be a JSON object."}]
+
+        errors = []
+        for field, rules, check in self._fields:
+            value = data.get(field)
+            if value is None or value == "":
+                if field in self._required:
+                    errors.append({"field": field, "error": MISSING_MESSAGE})
+                continue
+            message = self._field_error(rules, value)
+            if message is None and check is not None:
+                message = check(value)
+            if message:
+                errors.append({"field": field, "error": message})
+        return errors
+
+    def validate(self, data):
+        """
+        Return (error response body, 400) for invalid data, or (None, None).
+
+        The body carries every field error under "errors" and a summary under
+        "error": the missing fields if any, otherwise the first field error.
+        """
+        errors = self.errors(data)
+        if not errors:
+            return None, None
+        missing = [error["field"] for error in errors if error["error"] == MISSING_MESSAGE]
+        summary = f"Missing fields: {', '.join(missing)}" if missing else errors[0]["error"]
+        return {"error": summary, "errors": errors}, 400
+
+
+USER_SCHEMA = {
+    "type": "object",
+    "required": ["email", "password", "name", "role"],
+    "properties": {
+        "email": {
+            "type": "string",
+            "pattern": EMAIL_PATTERN.pattern,
+            "x-messages": {"type": EMAIL_MESSAGE, "pattern": EMAIL_MESSAGE},
+        },
+        "password": {
+            "type": "string",
+            "minLength": PASSWORD_MIN_LENGTH,
+            "pattern": PASSWORD_PATTERN.pattern,
+            "x-messages": {"type": PASSWORD_MESSAGE, "minLength": PASSWORD_MESSAGE, "pattern": PASSWORD_MESSAGE},
+        },
+        "name": {
+            "type": "string",
+            "x-messages": {"type": "Name must be a string."},
+        },
+        "role": {
+            "enum": list(USER_ROLES),
+            "x-messages": {"enum": f"Invalid role. Allowed roles: {', '.join(USER_ROLES)}"},
+        },
+    },
+}
+
+DESTINATION_SCHEMA = {
+    "type": "object",
+    "required": ["name", "description", "location", "price_per_night"],
+    "properties": {
+        "name": {
+            "type": "string",
+            "minLength": 3,
+            "x-messages": {
+                "type": "Destination name must be a string.",
+                "minLength": "Destination name must be at least 3 characters long.",
+            },
+        },
+        "description": {
+            "type": "string",
+            "x-messages": {"type": "Description must be a string."},
+        },
+        "location": {
+            "type": "string",
+            "x-messages": {"type": "Location must be a string."},
+        },
+        # Numbers and numeric strings; the value itself is checked by check_price
+        "price_per_night": {
+            "type": ["number", "string"],
+            "x-messages": {"type": "Invalid price format."},
+        },
+    },
+}
+
+user_validator = Validator(USER_SCHEMA)
+destination_validator = Validator(DESTINATION_SCHEMA, checks={"price_per_night": check_price})
@@ -2,11 +2,17 @@ import pytest
 import os
 import shutil
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from flask_jwt_extended import create_access_token
-from destination_service.app import app
+from common.snapshot import write_snapshot
+import destination_service.app as destination_app
+from destination_service.app import app, flusher, load_destinations, DESTINATION_DATA_FILE, DESTINATION_LOG_FILE
+from destination_service.store import DestinationStore
 
-DESTINATION_DATA_FILE = os.path.join(os.path.dirname(__file__), "../destination_data.py")
-TEMP_DESTINATION_DATA_FILE = os.path.join(os.path.dirname(__file__), "../destination_data_backup.py")
+TEMP_DESTINATION_DATA_FILE = os.path.join(os.path.dirname(__file__), "../destination_data_backup.jsonl")
+TEMP_DESTINATION_LOG_FILE = os.path.join(os.path.dirname(__file__), "../destination_data_backup.log")
 
 @pytest.fixture
 def client():
@@ -20,7 +26,7 @@ def client():
 def setup_and_teardown():
     """
     Backup and restore the destination data file.
-    - Backup the original `destination_data.py`.
+    - Backup the original `destination_data.jsonl`.
     - Create a temporary empty data file for testing.
     """
     # Backup the original data file
@@ -28,15 +34,24 @@ def setup_and_teardown():
         shutil.copy(DESTINATION_DATA_FILE, TEMP_DESTINATION_DATA_FILE)
     else:
         open(DESTINATION_DATA_FILE, "w").close()  # Ensure the file exists
+    if os.path.exists(DESTINATION_LOG_FILE):
+        shutil.move(DESTINATION_LOG_FILE, TEMP_DESTINATION_LOG_FILE)
 
     # Clear the destinations
-    with open(DESTINATION_DATA_FILE, "w") as file:
-        file.write("destinations = []")
+    write_snapshot(DESTINATION_DATA_FILE, "destinations", [])
     yield
 
+    # Write out pending mutations now so the background flusher cannot
+    # touch the data files after they are restored
+    flusher.flush()
+
     # Restore the original data file
     if os.path.exists(TEMP_DESTINATION_DATA_FILE):
         shutil.move(TEMP_DESTINATION_DATA_FILE, DESTINATION_DATA_FILE)
+    if os.path.exists(TEMP_DESTINATION_LOG_FILE):
+        shutil.move(TEMP_DESTINATION_LOG_FILE, DESTINATION_LOG_FILE)
+    elif os.path.exists(DESTINATION_LOG_FILE):
+        os.remove(DESTINATION_LOG_FILE)
 
 def test_add_destination_admin(client):
     """Test adding a new destination with Admin role."""
@@ -105,6 +120,17 @@ def test_delete_destination_admin(client):
     response_data = delete_response.get_json()
     assert response_data["message"] == "Destination deleted successfully"
 
+def test_add_destination_rejects_nan_price(client):
+    """Test that a non-finite price never reaches the price index."""
+    with app.app_context():
+        token = create_access_token(identity="admin_user", additional_claims={"role": "Admin"})
+
+    headers = {"Authorization": f"Bearer {token}"}
+    data = {"name": "Nowhere", "description": "Not a number", "location": "Nanland", "price_per_night": "nan"}
+    response = client.post("/addDestinations", json=data, headers=headers)
+    assert response.status_code == 400
+    assert client.get("/destinations?location=Nanland").get_json()["destinations"] == []
+
 def test_delete_destination_non_admin(client):
     """Test deleting a destination with non-Admin role."""
     # First, add a destination
@@ -128,3 +154,431 @@ def test_delete_destination_non_admin(client):
     assert delete_response.status_code == 401
     response_data = delete_response.get_json()
     assert response_data["error"] == "Admin access required"
+
+def test_get_destination_by_id(client):
+    """Test retrieving a single destination by its ID."""
+    with app.app_context():
+        token = create_access_token(identity="admin_user", additional_claims={"role": "Admin"})
+
+    headers = {"Authorization": f"Bearer {token}"}
+    data = {
+        "name": "Rome",
+        "description": "The Eternal City",
+        "location": "Italy",
+        "price_per_night": 120.0,
+    }
+    add_response = client.post("/addDestinations", json=data, headers=headers)
+    destination_id = add_response.get_json()["destination"]["id"]
+
+    response = client.get(f"/destinations/{destination_id}")
+    assert response.status_code == 200
+    assert response.get_json()["destination"]["name"] == "Rome"
+
+    # Deleted destinations are no longer found
+    client.delete(f"/destinations/{destination_id}", headers=headers)
+    response = client.get(f"/destinations/{destination_id}")
+    assert response.status_code == 404
+    assert response.get_json()["error"] == "Destination not found"
+
+def test_deleting_last_destination_is_not_undone(client):
+    """Test that emptying the catalog does not reload deleted destinations from disk."""
+    load_destinations()  # Start from the empty data files
+    with app.app_context():
+        token = create_access_token(identity="admin_user", additional_claims={"role": "Admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    [id] = add_destinations(client, [
+        {"name": "Last Stop", "description": "Deleted", "location": "Lastland", "price_per_night": 80.0},
+    ])
+    flusher.flush()
+    assert client.delete(f"/destinations/{id}", headers=headers).status_code == 200
+
+    response = client.get("/destinations")
+    assert response.status_code == 200
+    assert response.get_json()["destinations"] == []
+    assert client.get(f"/destinations/{id}").status_code == 404
+
+    flusher.flush()
+    load_destinations()
+    assert client.get(f"/destinations/{id}").status_code == 404
+
+def test_delete_destination_not_found(client):
+    """Test deleting a destination that does not exist."""
+    with app.app_context():
+        token = create_access_token(identity="admin_user", additional_claims={"role": "Admin"})
+
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.delete("/destinations/does-not-exist", headers=headers)
+    assert response.status_code == 404
+    assert response.get_json()["error"] == "Destination not found"
+
+def add_destinations(client, destinations):
+    """Add destinations as an Admin and return their IDs."""
+    with app.app_context():
+        token = create_access_token(identity="admin_user", additional_claims={"role": "Admin"})
+
+    headers = {"Authorization": f"Bearer {token}"}
+    ids = []
+    for data in destinations:
+        response = client.post("/addDestinations", json=data, headers=headers)
+        ids.append(response.get_json()["destination"]["id"])
+    return ids
+
+def test_get_destinations_pagination(client):
+    """Test walking the catalog page by page with the cursor."""
+    ids = add_destinations(client, [
+        {"name": f"Page Stop {i}", "description": "Paged", "location": "Pagination", "price_per_night": 50.0 + i}
+        for i in range(5)
+    ])
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/destinations?location=pagination&limit=2"
+        if cursor:
+            url += f"&cursor={cursor}"
+        response_data = client.get(url).get_json()
+        assert len(response_data["destinations"]) <= 2
+        seen.extend(d["id"] for d in response_data["destinations"])
+        cursor = response_data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == ids
+
+def test_deleting_before_the_cursor_does_not_skip_a_destination(client):
+    """Test that a delete between two pages neither skips nor repeats a destination."""
+    ids = add_destinations(client, [
+        {"name": f"Stable Stop {i}", "description": "Paged", "location": "Stableton", "price_per_night": 50.0 + i}
+        for i in range(4)
+    ])
+
+    first = client.get("/destinations?location=stableton&limit=2").get_json()
+    assert [d["id"] for d in first["destinations"]] == ids[:2]
+    with app.app_context():
+        token = create_access_token(identity="admin_user", additional_claims={"role": "Admin"})
+    # The destination the cursor names goes too; the next page still resumes after it
+    for id in ids[:2]:
+        response = client.delete(f"/destinations/{id}", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+
+    second = client.get(f"/destinations?location=stableton&limit=2&cursor={first['next_cursor']}").get_json()
+    assert [d["id"] for d in second["destinations"]] == ids[2:]
+    assert second["next_cursor"] is None
+
+def test_unknown_cursor_is_rejected(client):
+    """Test that a cursor naming no destination is rejected instead of restarting."""
+    response = client.get("/destinations?cursor=not-a-destination")
+    assert response.status_code == 400
+    assert "cursor" in response.get_json()["error"]
+
+def test_get_destinations_filters(client):
+    """Test filtering destinations by location and price range."""
+    add_destinations(client, [
+        {"name": "Cheap Stay", "description": "Budget", "location": "Filterland", "price_per_night": 40.0},
+        {"name": "Mid Stay", "description": "Standard", "location": "Filterland", "price_per_night": 90.0},
+        {"name": "Luxury Stay", "description": "Premium", "location": "Filterland", "price_per_night": 400.0},
+        {"name": "Elsewhere", "description": "Other", "location": "Otherland", "price_per_night": 90.0},
+    ])
+
+    response = client.get("/destinations?location=Filterland&min_price=50&max_price=100")
+    assert response.status_code == 200
+    names = [d["name"] for d in response.get_json()["destinations"]]
+    assert names == ["Mid Stay"]
+
+    response = client.get("/destinations?location=Filterland&offset=1&limit=1")
+    names = [d["name"] for d in response.get_json()["destinations"]]
+    assert names == ["Mid Stay"]
+
+def test_price_range_last_page_has_no_cursor(client):
+    """Test that a page ending the price range does not point at an empty next page."""
+    add_destinations(client, [
+        {"name": "Penny Stay", "description": "Cheap", "location": "Pennyland", "price_per_night": 0.011},
+        {"name": "Penny Suite", "description": "Cheap", "location": "Pennyland", "price_per_night": 0.012},
+        {"name": "Pound Palace", "description": "Outside the range", "location": "Pennyland", "price_per_night": 900.0},
+    ])
+
+    for sort in ["price_asc", "price_desc"]:
+        response_data = client.get(f"/destinations?min_price=0.01&max_price=0.013&limit=2&sort={sort}").get_json()
+        assert len(response_data["destinations"]) == 2
+        assert response_data["next_cursor"] is None
+
+    response_data = client.get("/destinations?min_price=0.01&max_price=0.013&limit=1").get_json()
+    assert response_data["next_cursor"] == "1"
+    response_data = client.get("/destinations?min_price=0.01&max_price=0.013&limit=1&cursor=1").get_json()
+    assert [d["name"] for d in response_data["destinations"]] == ["Penny Suite"]
+    assert response_data["next_cursor"] is None
+
+def test_get_destinations_invalid_query(client):
+    """Test that malformed pagination and filter parameters are rejected."""
+    assert client.get("/destinations?limit=0").status_code == 400
+    assert client.get("/destinations?limit=abc").status_code == 400
+    assert client.get("/destinations?min_price=cheap").status_code == 400
+    assert client.get("/destinations?cursor=-1").status_code == 400
+    assert client.get("/destinations?sort=price&cursor=-1").status_code == 400
+    assert client.get("/destinations?sort=price&cursor=abc").status_code == 400
+
+def test_get_destinations_ndjson_stream(client):
+    """Test exporting destinations as a streamed NDJSON body."""
+    add_destinations(client, [
+        {"name": "Stream One", "description": "Streamed", "location": "Streamland", "price_per_night": 10.0},
+        {"name": "Stream Two", "description": "Streamed", "location": "Streamland", "price_per_night": 20.0},
+    ])
+
+    response = client.get("/destinations?format=ndjson&location=Streamland")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["Stream One", "Stream Two"]
+
+def test_get_destinations_sorted_by_price(client):
+    """Test price range queries ordered by price."""
+    add_destinations(client, [
+        {"name": "Sorted Mid", "description": "Sorted", "location": "Sortland", "price_per_night": 75.0},
+        {"name": "Sorted Low", "description": "Sorted", "location": "Sortland", "price_per_night": 25.0},
+        {"name": "Sorted High", "description": "Sorted", "location": "Sortland", "price_per_night": 300.0},
+        {"name": "Sorted Top", "description": "Sorted", "location": "Sortland", "price_per_night": "500"},
+    ])
+
+    response = client.get("/destinations?location=Sortland&sort=price_asc&max_price=300")
+    names = [d["name"] for d in response.get_json()["destinations"]]
+    assert names == ["Sorted Low", "Sorted Mid", "Sorted High"]
+
+    response = client.get("/destinations?location=Sortland&sort=price_desc&min_price=50&limit=2")
+    response_data = response.get_json()
+    assert [d["name"] for d in response_data["destinations"]] == ["Sorted Top", "Sorted High"]
+
+    response = client.get(f"/destinations?location=Sortland&sort=price_desc&min_price=50&limit=2&cursor={response_data['next_cursor']}")
+    assert [d["name"] for d in response.get_json()["destinations"]] == ["Sorted Mid"]
+
+    assert client.get("/destinations?sort=name").status_code == 400
+
+def test_search_destinations(client):
+    """Test full-text search with ranking and prefix matching."""
+    ids = add_destinations(client, [
+        {"name": "Zanzibar Beach", "description": "Spice island retreat", "location": "Tanzania", "price_per_night": 150.0},
+        {"name": "Serengeti Lodge", "description": "Safari near Zanzibar flights", "location": "Tanzania", "price_per_night": 250.0},
+    ])
+
+    # The name match ranks above the description match
+    response = client.get("/destinations/search?q=zanzibar")
+    assert response.status_code == 200
+    assert [d["id"] for d in response.get_json()["destinations"]] == ids
+
+    # The last term completes as a prefix and every term must match
+    response = client.get("/destinations/search?q=tanzania saf")
+    assert [d["id"] for d in response.get_json()["destinations"]] == [ids[1]]
+
+    # Deleted destinations drop out of the index
+    with app.app_context():
+        token = create_access_token(identity="admin_user", additional_claims={"role": "Admin"})
+    client.delete(f"/destinations/{ids[0]}", headers={"Authorization": f"Bearer {token}"})
+    response = client.get("/destinations/search?q=zanzibar")
+    assert [d["id"] for d in response.get_json()["destinations"]] == [ids[1]]
+
+def test_search_destinations_missing_query(client):
+    """Test that a search without a query is rejected."""
+    response = client.get("/destinations/search")
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Missing query parameter: q"
+
+def test_get_destinations_etag(client):
+    """Test conditional GETs against the catalog version."""
+    response = client.get("/destinations?location=Etagland")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    # Unchanged catalog: 304 with no body
+    response = client.get("/destinations?location=Etagland", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    # Adding a destination changes the ETag
+    add_destinations(client, [
+        {"name": "Etag Inn", "description": "Cached", "location": "Etagland", "price_per_night": 99.0},
+    ])
+    response = client.get("/destinations?location=Etagland", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [d["name"] for d in response.get_json()["destinations"]] == ["Etag Inn"]
+
+def test_etag_is_shared_by_stores_with_the_same_state(client):
+    """Test that the ETag names the persisted catalog, not one store instance."""
+    add_destinations(client, [
+        {"name": "Shared Inn", "description": "Cached", "location": "Sharedland", "price_per_night": 42.0},
+    ])
+    flusher.flush()
+    load_destinations()
+    etag = client.get("/destinations?location=Sharedland").headers["ETag"]
+
+    # A second store over the same files, as another worker or a reload has
+    load_destinations()
+    response = client.get("/destinations?location=Sharedland", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+def test_concurrent_writes_and_reads(client):
+    """Stress test: concurrent adds, deletes and paginated reads stay consistent."""
+    with app.app_context():
+        token = create_access_token(identity="admin_user", additional_claims={"role": "Admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def add(i):
+        data = {"name": f"Stress {i}", "description": "Stress", "location": "Stressland", "price_per_night": 10.0 + i}
+        response = app.test_client().post("/addDestinations", json=data, headers=headers)
+        assert response.status_code == 201
+        destination_id = response.get_json()["destination"]["id"]
+        if i % 2:
+            response = app.test_client().delete(f"/destinations/{destination_id}", headers=headers)
+            assert response.status_code == 200
+        return destination_id
+
+    def read(i):
+        reader = app.test_client()
+        for query in ["location=Stressland", "sort=price_asc&min_price=10", "format=ndjson"]:
+            assert reader.get(f"/destinations?{query}").status_code == 200
+        assert reader.get("/destinations/search?q=stre").status_code == 200
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        added = pool.map(add, range(100))
+        reads = pool.map(read, range(100))
+        added, _ = list(added), list(reads)
+
+    response = client.get("/destinations?location=Stressland&limit=1000")
+    kept = {d["id"] for d in response.get_json()["destinations"]}
+    assert kept == {destination_id for i, destination_id in enumerate(added) if i % 2 == 0}
+
+
+def test_bulk_add_json_array(client):
+    """Test that a JSON array is added in one batch with per-row errors."""
+    with app.app_context():
+        token = create_access_token(identity="admin_user", additional_claims={"role": "Admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    rows = [
+        {"name": "Bali", "description": "Island", "location": "Indonesia", "price_per_night": 200},
+        {"name": "Ba", "description": "Too short", "location": "Nowhere", "price_per_night": 10},
+        "not an object",
+        {"name": "Kyoto", "description": "Temples", "location": "Japan", "price_per_night": "abc"},
+        {"name": "Paris", "description": "City", "location": "France", "price_per_night": 150},
+    ]
+    response = client.post("/destinations/bulk", json=rows, headers=headers)
+
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data["added"] == 2
+    assert data["failed"] == 3
+    assert [error["row"] for error in data["errors"]] == [1, 2, 3]
+    assert data["errors"][0]["error"] == "Destination name must be at least 3 characters long."
+    assert data["rows_per_sec"] > 0
+
+    added = [client.get(f"/destinations/{id}").get_json()["destination"] for id in data["ids"]]
+    assert [d["name"] for d in added] == ["Bali", "Paris"]
+
+
+def test_bulk_add_streamed_ndjson(client):
+    """Test that an NDJSON body is parsed line by line and merged into the price index."""
+    with app.app_context():
+        token = create_access_token(identity="admin_user", additional_claims={"role": "Admin"})
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"}
+
+    lines = [
+        json.dumps({"name": f"Place {i}", "description": "Feed", "location": "Feedland", "price_per_night": 90500 - i})
+        for i in range(100)
+    ]
+    lines.insert(10, "{not json")
+    response = client.post("/destinations/bulk", data="\n".join(lines) + "\n", headers=headers)
+
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data["added"] == 100
+    assert data["errors"] == [{"row": 10, "error": "Row must be a JSON object."}]
+
+    cheapest = client.get("/destinations?sort=price_asc&min_price=90000&limit=3").get_json()["destinations"]
+    assert [d["price_per_night"] for d in cheapest] == [90401, 90402, 90403]
+
+
+def test_bulk_add_atomic_and_admin_only(client):
+    """Test that atomic batches with errors add nothing, and that users are rejected."""
+    with app.app_context():
+        admin_token = create_access_token(identity="admin_user", additional_claims={"role": "Admin"})
+        user_token = create_access_token(identity="regular_user", additional_claims={"role": "User"})
+
+    rows = [
+        {"name": "Atoll", "description": "Island", "location": "Atomicland", "price_per_night": 200},
+        {"name": "Bad", "description": "Missing price", "location": "Atomicland"},
+    ]
+    response = client.post(
+        "/destinations/bulk?atomic=true", json=rows, headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 400
+    assert response.get_json()["added"] == 0
+    assert client.get("/destinations?location=Atomicland").get_json()["destinations"] == []
+
+    response = client.post("/destinations/bulk", json=rows, headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == 401
+
+    response = client.post(
+        "/destinations/bulk", json={"name": "Bali"}, headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 400
+
+
+def test_catalog_body_matches_full_encoding(client):
+    """Test that pages joined from cached encodings equal encoding the whole page at once."""
+    add_destinations(client, [
+        {"name": "Encoded One", "description": "Café crème", "location": "Encodeland", "price_per_night": 10.5},
+        {"name": "Encoded Two", "description": "Plain", "location": "Encodeland", "price_per_night": "20"},
+    ])
+
+    for _ in range(2):
+        response = client.get("/destinations?location=Encodeland&limit=1")
+        body = response.get_json()
+        assert response.data == app.json.dumps_bytes(body) + b"\n"
+        assert body["destinations"][0]["name"] == "Encoded One"
+        assert body["next_cursor"] is not None
+
+
+def test_encoded_destination_cache_follows_replacements():
+    """Test that a replaced destination is encoded again instead of served stale."""
+    store = DestinationStore([{"id": "a", "name": "Old", "description": "D", "location": "L", "price_per_night": 1}])
+    encode = app.json.dumps_bytes
+
+    assert store.encode_all([store.get("a")], encode) == [
+        b'{"description":"D","id":"a","location":"L","name":"Old","price_per_night":1}'
+    ]
+    store.update("a", {"name": "New"})
+    assert store.encode_all([store.get("a")], encode) == [
+        b'{"description":"D","id":"a","location":"L","name":"New","price_per_night":1}'
+    ]
+    store.delete("a")
+    assert "a" not in store._encoded
+
+def test_concurrent_syncs_apply_batches_in_log_order(monkeypatch):
+    """Test that a later batch from another worker is never applied before an earlier one."""
+    record = {"id": "sync-1", "name": "Synced", "description": "Synced", "location": "Syncland", "price_per_night": 10.0}
+    batches = [[{"op": "put", "key": "sync-1", "record": record}], [{"op": "delete", "key": "sync-1"}]]
+    monkeypatch.setattr(destination_app.storage, "refresh", lambda: batches.pop(0))
+
+    store = destination_app.destinations
+    apply = store.apply
+    first_applied = threading.Event()
+    resume = threading.Event()
+
+    def slow_apply(entry):
+        if entry["op"] == "put":
+            first_applied.set()
+            resume.wait(5)
+        apply(entry)
+
+    monkeypatch.setattr(store, "apply", slow_apply)
+    first = threading.Thread(target=destination_app.sync_destinations)
+    first.start()
+    first_applied.wait(5)
+    second = threading.Thread(target=destination_app.sync_destinations)
+    second.start()
+    time.sleep(0.1)
+    resume.set()
+    first.join(5)
+    second.join(5)
+
+    assert store.get("sync-1") is None
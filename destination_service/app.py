@@ -1,16 +1,38 @@
 # destination_service/app.py
 import os
-import ast
 import uuid
-from flask import Flask, jsonify, request
-from flask_jwt_extended import JWTManager, jwt_required, get_jwt
-from flasgger import Swagger
-import re
+import hashlib
+import threading
+import time
+from flask import Flask, Response, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt
+from common.apidocs import install_apidocs
+from common.cache import LRUCache
+from common.flusher import BackgroundFlusher
+from common.jwks import SIGNING_ALGORITHMS, JWKSClient, KeySetUnavailable
+from common.jwt_cache import CachingJWTManager
+from common.json_provider import install_json_provider
+from common.metrics import MetricsRegistry, install_metrics
+from common.profiling import install_profiling
+from common.storage import create_storage
+from common.validation import destination_validator
+from destination_service.store import DestinationStore
 
 app = Flask(__name__)
 
-# Swagger configuration
-swagger = Swagger(
+# JSON encoding of responses and request bodies: JSON_ENCODER is "auto" (orjson
+# when it is installed, otherwise the standard library), "orjson" or "stdlib"
+app.config["JSON_ENCODER"] = os.environ.get("JSON_ENCODER", "auto")
+install_json_provider(app)
+
+# API docs: Swagger UI at /apidocs/ and the spec at /apispec_1.json. APIDOCS is
+# "lazy" (flasgger loads on the first docs request), "static" (serve the spec
+# precomputed into APIDOCS_SPEC_FILE by python -m common.apidocs), "eager" or "off"
+app.config["APIDOCS"] = os.environ.get("APIDOCS", "lazy")
+app.config["APIDOCS_SPEC_FILE"] = os.environ.get(
+    "APIDOCS_SPEC_FILE", os.path.join(os.path.dirname(__file__), "apispec.json")
+)
+install_apidocs(
     app,
     template={
         "swagger": "2.0",
@@ -34,37 +56,183 @@ swagger = Swagger(
     },
 )
 
-# JWT configuration
-app.config["JWT_SECRET_KEY"] = "your-secret-key"
-jwt = JWTManager(app)
+# Prometheus-style metrics served at /metrics; the request hooks are
+# installed first so they time the other before_request hooks too
+metrics = MetricsRegistry()
+install_metrics(app, metrics)
+storage_seconds = metrics.histogram(
+    "storage_duration_seconds", "Time spent loading and saving the store, in seconds.", ("store", "operation")
+)
+metrics.gauge("store_records", "Records in the in-memory store.", lambda: len(destinations), {"store": "destinations"})
+metrics.gauge("response_cache_entries", "Serialized catalog responses cached.", lambda: len(response_cache))
+metrics.counter_callback("response_cache_hits_total", "Catalog responses served from the cache.", lambda: response_cache.hits)
+metrics.counter_callback(
+    "response_cache_misses_total", "Catalog responses built because they were not cached.", lambda: response_cache.misses
+)
 
-# Path to the Python file for storing destination data
-DESTINATION_DATA_FILE = os.path.join(os.path.dirname(__file__), "destination_data.py")
+# Opt-in request profiling: profile PROFILE_SAMPLE_RATE of all requests, plus
+# requests whose X-Profile header equals PROFILE_TOKEN, writing "collapsed"
+# stacks or "cprofile" stats per route under PROFILE_DIR. Disabled (and not
+# installed) while both are unset.
+app.config["PROFILE_SAMPLE_RATE"] = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+app.config["PROFILE_TOKEN"] = os.environ.get("PROFILE_TOKEN")
+app.config["PROFILE_FORMAT"] = os.environ.get("PROFILE_FORMAT", "collapsed")
+app.config["PROFILE_DIR"] = os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(__file__), "profiles"))
+install_profiling(app)
+
+# JWT configuration: set JWT_JWKS_URL (e.g. http://user_service:5001/.well-known/jwks.json)
+# to verify RS256/EdDSA tokens locally with the user service's published public
+# keys, refetched every JWKS_MAX_AGE seconds; otherwise tokens are HS256 with JWT_SECRET_KEY
+app.config["JWT_SECRET_KEY"] = "your-secret-key"
+app.config["JWT_JWKS_URL"] = os.environ.get("JWT_JWKS_URL")
+app.config["JWKS_MAX_AGE"] = 300
+# Verified-token cache: maximum number of tokens and seconds before a cached
+# token is verified again (entries never outlive the token's exp claim)
+app.config["JWT_CACHE_SIZE"] = 10000
+app.config["JWT_CACHE_MAX_AGE"] = 300
+jwt = CachingJWTManager(
+    app,
+    maxsize=app.config["JWT_CACHE_SIZE"],
+    max_age=app.config["JWT_CACHE_MAX_AGE"],
+)
+if app.config["JWT_JWKS_URL"]:
+    app.config["JWT_ALGORITHM"] = SIGNING_ALGORITHMS[0]
+    app.config["JWT_DECODE_ALGORITHMS"] = list(SIGNING_ALGORITHMS)
+    key_set = JWKSClient(app.config["JWT_JWKS_URL"], max_age=app.config["JWKS_MAX_AGE"])
+    jwt.decode_key_loader(key_set.key_for)
+
+
+# Background flush configuration: seconds between flushes and the number of
+# mutations that triggers an early flush (0 seconds flushes synchronously)
+app.config["FLUSH_INTERVAL"] = 1.0
+app.config["FLUSH_MAX_PENDING"] = 100
+
+# Set STORAGE_SHARED=1 when several worker processes serve the app (gunicorn.conf.py
+# does this); they then share the data files through a locked append-only log
+app.config["STORAGE_SHARED"] = os.environ.get("STORAGE_SHARED") == "1"
+
+# Directory of the data files (snapshot, log and default SQLite database);
+# defaults to the service package
+app.config["DATA_DIR"] = os.environ.get("DATA_DIR", os.path.dirname(__file__))
+
+# Storage backend: "log" (append-only log compacted into a snapshot file) or
+# "sql" (SQLAlchemy; STORAGE_URL defaults to a SQLite database next to this file)
+app.config["STORAGE_ENGINE"] = os.environ.get("STORAGE_ENGINE", "log")
+app.config["STORAGE_URL"] = os.environ.get(
+    "STORAGE_URL", "sqlite:///" + os.path.join(app.config["DATA_DIR"], "destination_data.db")
+)
+app.config["STORAGE_POOL_SIZE"] = 5
+app.config["STORAGE_MAX_OVERFLOW"] = 10
+
+# Path to the snapshot file for storing destination data
+DESTINATION_DATA_FILE = os.path.join(app.config["DATA_DIR"], "destination_data.jsonl")
+# Append-only log of destination mutations, compacted into DESTINATION_DATA_FILE
+DESTINATION_LOG_FILE = os.path.join(app.config["DATA_DIR"], "destination_data.log")
+# Pre-snapshot data file, only read when DESTINATION_DATA_FILE does not exist yet
+LEGACY_DESTINATION_DATA_FILE = os.path.join(app.config["DATA_DIR"], "destination_data.py")
+if app.config["STORAGE_ENGINE"] == "sql":
+    storage = create_storage(
+        "sql",
+        url=app.config["STORAGE_URL"],
+        table="destinations",
+        key="id",
+        shared=app.config["STORAGE_SHARED"],
+        pool_size=app.config["STORAGE_POOL_SIZE"],
+        max_overflow=app.config["STORAGE_MAX_OVERFLOW"],
+    )
+else:
+    storage = create_storage(
+        "log",
+        snapshot_path=DESTINATION_DATA_FILE,
+        log_path=DESTINATION_LOG_FILE,
+        key="id",
+        name="destinations",
+        legacy_path=LEGACY_DESTINATION_DATA_FILE,
+        shared=app.config["STORAGE_SHARED"],
+    )
+
+# Page size for GET /destinations when no limit is given, and the largest allowed
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+DEFAULT_SEARCH_LIMIT = 20
+
+# Largest number of rows accepted by one POST /destinations/bulk request
+BULK_MAX_ROWS = 100000
 
 # In-memory data to hold destinations
-destinations = []
+destinations = DestinationStore()
+is_data_initialized = False  # Flag to ensure data is loaded only once
+# Held by the first requests so only one of them loads the store
+initialize_lock = threading.Lock()
+
+# Serialized GET responses for the current catalog version, keyed by ETag
+RESPONSE_CACHE_SIZE = 512
+response_cache = LRUCache(RESPONSE_CACHE_SIZE)
+response_cache_version = None
 
 # Helper functions to load and save destination data
 def load_destinations():
     """
-    Load destinations from the destination_data.py file.
+    Load destinations from storage (by default the destination_data.jsonl snapshot plus the log).
     """
     global destinations
-    try:
-        with open(DESTINATION_DATA_FILE, "r") as file:
-            content = file.read()
-            destinations = ast.literal_eval(content.split("=", 1)[1].strip())
-    except (FileNotFoundError, SyntaxError, ValueError):
-        destinations = []
+    with storage.lock, storage_seconds.time(store="destinations", operation="load"):
+        destinations = DestinationStore(storage.load())
+        destinations.set_storage_position(storage.position())
+
+
+def sync_destinations():
+    """
+    Apply destination changes that other worker processes logged since the last sync.
+    """
+    # Read and apply under one lock, so request threads apply batches in order
+    with storage.lock:
+        entries = storage.refresh()
+        if entries is None:
+            load_destinations()
+            return
+        for entry in entries:
+            destinations.apply(entry)
+        destinations.set_storage_position(storage.position())
 
 
 def save_destinations():
     """
-    Save the destinations list to the destination_data.py file.
+    Flush pending log entries and compact the log into destination_data.jsonl
+    once it has grown past the storage threshold.
     """
-    global destinations
-    with open(DESTINATION_DATA_FILE, "w") as file:
-        file.write(f"destinations = {destinations}")
+    with storage_seconds.time(store="destinations", operation="save"):
+        with storage.transaction():
+            storage.flush()
+        # Outside the transaction, so writers are not held up by the snapshot
+        if storage.needs_compaction():
+            storage.compact(destinations)
+
+
+flusher = BackgroundFlusher(
+    save_destinations,
+    interval=app.config["FLUSH_INTERVAL"],
+    max_pending=app.config["FLUSH_MAX_PENDING"],
+)
+
+
+class InvalidCursor(Exception):
+    """Raised for a cursor that names no destination this worker knows."""
+
+
+@app.errorhandler(InvalidCursor)
+def handle_invalid_cursor(error):
+    return jsonify({"error": "Invalid cursor. Start again from the first page."}), 400
+
+
+@app.errorhandler(KeySetUnavailable)
+def handle_key_set_unavailable(error):
+    """
+    Tokens cannot be verified until the user service's public keys are fetched.
+    """
+    response = jsonify({"error": "Token signing keys are unavailable, please retry shortly"})
+    response.headers["Retry-After"] = "5"
+    return response, 503
 
 
 @app.before_request
@@ -72,41 +240,198 @@ def initialize_data():
     """
     Initialize data before processing any request.
     """
-    global destinations
-    if not destinations:
-        load_destinations()
+    global is_data_initialized
+    if not is_data_initialized:
+        with initialize_lock:
+            if not is_data_initialized:
+                load_destinations()
+                is_data_initialized = True
+    elif storage.shared:
+        sync_destinations()
 
 
-@app.teardown_appcontext
-def persist_data(exception=None):
+def validate_destination_data(data):
     """
-    Save destination data to the destination_data.py file when the app shuts down.
+    Validate the required fields and values for the destination data.
     """
-    save_destinations()
+    return destination_validator.validate(data)
 
 
-def validate_destination_data(data):
+def parse_destination_query(args):
     """
-    Validate the required fields and values for the destination data.
+    Parse the pagination and filter query parameters of GET /destinations.
+    Returns the parsed query, or an error response and status code.
+    """
+    query = {"location": args.get("location", "").strip().lower() or None}
+
+    query["sort"] = args.get("sort") or None
+    if query["sort"] not in (None, "price_asc", "price_desc"):
+        return None, {"error": "Invalid sort. Allowed values: price_asc, price_desc"}, 400
+
+    for field in ["min_price", "max_price"]:
+        value = args.get(field)
+        try:
+            query[field] = float(value) if value is not None else None
+        except ValueError:
+            return None, {"error": f"Invalid {field}. It must be a number."}, 400
+
+    for field, default in [("limit", DEFAULT_PAGE_SIZE), ("offset", 0)]:
+        value = args.get(field)
+        try:
+            query[field] = int(value) if value is not None else default
+        except ValueError:
+            return None, {"error": f"Invalid {field}. It must be an integer."}, 400
+        if query[field] < 0:
+            return None, {"error": f"Invalid {field}. It must not be negative."}, 400
+
+    # Insertion-order pages resume after the id of the last destination
+    # served; price-ordered pages resume at a position in the price range
+    query["cursor"] = args.get("cursor") or None
+    if query["cursor"] is not None:
+        if uses_price_index(query):
+            try:
+                query["cursor"] = int(query["cursor"])
+            except ValueError:
+                return None, {"error": "Invalid cursor. It must be an integer."}, 400
+            if query["cursor"] < 0:
+                return None, {"error": "Invalid cursor. It must not be negative."}, 400
+
+    if not 1 <= query["limit"] <= MAX_PAGE_SIZE:
+        return None, {"error": f"Invalid limit. It must be between 1 and {MAX_PAGE_SIZE}."}, 400
+
+    return query, None, None
+
+
+def matches_destination_query(destination, query):
     """
-    required_fields = ["name", "description", "location", "price_per_night"]
-    missing_fields = [field for field in required_fields if not data.get(field)]
-    if missing_fields:
-        return {"error": f"Missing fields: {', '.join(missing_fields)}"}, 400
+    Check a destination against the location filter of a query. Price
+    filters are applied by the price index in iter_destinations.
+    """
+    return query["location"] is None or destination.location.lower() == query["location"]
+
 
-    # Validate name length
-    if len(data["name"]) < 3:
-        return {"error": "Destination name must be at least 3 characters long."}, 400
+def uses_price_index(query):
+    return bool(query["sort"]) or query["min_price"] is not None or query["max_price"] is not None
 
-    # Validate price per night (must be a positive float)
+
+def scan_size(query):
+    """
+    Number of destinations the price index walks for a query from the start.
+    """
+    return destinations.count_by_price(query["min_price"], query["max_price"])
+
+
+def iter_destinations(query, cursor=None):
+    """
+    Iterate the destinations a query scans, resuming at cursor. Price
+    filters and sorting walk the sorted price index from a position in the
+    range; otherwise destinations come in insertion order after the id
+    given as cursor.
+    """
+    if uses_price_index(query):
+        return destinations.iter_by_price(
+            query["min_price"],
+            query["max_price"],
+            descending=query["sort"] == "price_desc",
+            position=cursor or 0,
+        )
     try:
-        price = float(data["price_per_night"])
-        if price <= 0:
-            return {"error": "Price per night must be a positive number."}, 400
-    except ValueError:
-        return {"error": "Invalid price format."}, 400
+        return destinations.iter_after(cursor)
+    except KeyError:
+        raise InvalidCursor()
+
 
-    return None, None
+def stream_destinations(query):
+    """
+    Yield every destination matching the query as one NDJSON line.
+    """
+    # Collect the matches under the read lock, then serialize without it so
+    # a slow client does not hold off writers
+    with destinations.read_lock():
+        matches = [d for d in iter_destinations(query) if matches_destination_query(d, query)]
+    for line in destinations.encode_all(matches, app.json.dumps_bytes):
+        yield line + b"\n"
+
+
+def paginate_destinations(query):
+    """
+    Build one page of destinations for a parsed query, with its next cursor.
+    """
+    page = []
+    skipped = 0
+    scanned = 0
+    next_cursor = None
+    for destination in iter_destinations(query, query["cursor"]):
+        scanned += 1
+        if not matches_destination_query(destination, query):
+            continue
+        if skipped < query["offset"]:
+            skipped += 1
+            continue
+        page.append(destination)
+        if len(page) == query["limit"]:
+            if uses_price_index(query):
+                # Positions count from the start of the scanned price range
+                position = (query["cursor"] or 0) + scanned
+                if position < scan_size(query):
+                    next_cursor = str(position)
+            elif destinations.has_after(destination.id):
+                next_cursor = destination.id
+            break
+
+    return {"destinations": page, "next_cursor": next_cursor}
+
+
+def encode_catalog_body(result):
+    """
+    Encode a catalog response, joining the cached encoding of each listed
+    destination instead of encoding every field again.
+    """
+    dumps = app.json.dumps_bytes
+    fields = {key: dumps(value) for key, value in result.items() if key != "destinations"}
+    fields["destinations"] = b"[" + b",".join(destinations.encode_all(result["destinations"], dumps)) + b"]"
+    keys = sorted(fields) if app.json.sort_keys else fields
+    return b"{" + b",".join(dumps(key) + b":" + fields[key] for key in keys) + b"}\n"
+
+
+def cached_catalog_response(build):
+    """
+    Serve a GET response for the current catalog version. The strong ETag is
+    derived from the storage position of the catalog and the request URL, so
+    every worker holding the same catalog sends the same ETag and a matching
+    If-None-Match gets a 304 without building anything. Until a local change
+    is persisted and synced, the store's epoch/version stand in for the
+    position. Otherwise the body is served pre-serialized from the cache,
+    calling build() only on a miss.
+    """
+    global response_cache_version
+    url_digest = hashlib.sha1(request.full_path.encode("utf-8")).hexdigest()[:16]
+
+    # The ETag and the body must describe the same catalog version
+    with destinations.read_lock():
+        if destinations.storage_position is not None:
+            etag = f"{destinations.storage_position}.{url_digest}"
+        else:
+            etag = f"{destinations.epoch}.{destinations.version}.{url_digest}"
+
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        # Any mutation since the cache was filled invalidates every entry
+        if response_cache_version != (destinations.epoch, destinations.version):
+            response_cache.clear()
+            response_cache_version = (destinations.epoch, destinations.version)
+
+        body = response_cache.get(etag)
+        if body is None:
+            body = encode_catalog_body(build())
+            response_cache.put(etag, body)
+
+    response = app.response_class(body, status=200, mimetype=app.json.mimetype)
+    response.set_etag(etag)
+    return response
 
 
 @app.route("/addDestinations", methods=["POST"])
@@ -166,22 +491,254 @@ def add_destination():
         "location": data["location"],
         "price_per_night": data["price_per_night"],
     }
-    destinations.append(destination)
-    save_destinations()
+    with storage.transaction():
+        # Apply other workers' writes first so the log and memory agree on order
+        sync_destinations()
+        destinations.add(destination)
+        storage.append("put", destination["id"], destination)
+    flusher.mark_dirty()
 
     return jsonify({"message": "Destination added successfully", "destination": destination}), 201
 
 
+def read_bulk_rows():
+    """
+    Yield the rows of a bulk request body: a JSON array, or one JSON object
+    per line when the body is NDJSON, which is parsed as it streams in.
+    Rows that are not valid JSON are yielded as None.
+    """
+    if request.mimetype in ("application/x-ndjson", "application/ndjson"):
+        for line in request.stream:
+            if not line.strip():
+                continue
+            try:
+                yield app.json.loads(line)
+            except ValueError:
+                yield None
+        return
+    rows = request.get_json(silent=True)
+    if not isinstance(rows, list):
+        raise ValueError("Body must be a JSON array or NDJSON")
+    yield from rows
+
+
+@app.route("/destinations/bulk", methods=["POST"])
+@jwt_required()
+def add_destinations_bulk():
+    """
+    Add Many Destinations at Once (Admin only)
+    ---
+    security:
+      - Bearer: []
+    consumes:
+      - application/json
+      - application/x-ndjson
+    parameters:
+      - name: body
+        in: body
+        required: true
+        description: A JSON array of destinations, or one destination object per line as NDJSON
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              name:
+                type: string
+              description:
+                type: string
+              location:
+                type: string
+              price_per_night:
+                type: float
+      - name: atomic
+        in: query
+        type: boolean
+        description: Add nothing if any row is invalid
+    responses:
+      201:
+        description: Valid rows added in one batch; invalid rows are listed in errors by zero-based row index
+      400:
+        description: Unreadable body, too many rows, or no row could be added
+      401:
+        description: Unauthorized
+    """
+    claims = get_jwt()
+    if claims.get("role") != "Admin":
+        return jsonify({"error": "Admin access required"}), 401
+
+    atomic = request.args.get("atomic", "").lower() in ("1", "true")
+    start = time.perf_counter()
+    batch = []
+    errors = []
+    rows = 0
+    try:
+        for row, data in enumerate(read_bulk_rows()):
+            if row >= BULK_MAX_ROWS:
+                return jsonify({"error": f"At most {BULK_MAX_ROWS} rows per request"}), 400
+            rows += 1
+            if not isinstance(data, dict):
+                errors.append({"row": row, "error": "Row must be a JSON object."})
+                continue
+            error_response, _ = validate_destination_data(data)
+            if error_response:
+                errors.append({"row": row, **error_response})
+                continue
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "name": data["name"],
+                "description": data["description"],
+                "location": data["location"],
+                "price_per_night": data["price_per_night"],
+            })
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    if atomic and errors:
+        batch = []
+    if batch:
+        with storage.transaction():
+            sync_destinations()
+            destinations.add_many(batch)
+            storage.append_many("put", ((destination["id"], destination) for destination in batch))
+        flusher.mark_dirty()
+    seconds = time.perf_counter() - start
+
+    result = {
+        "added": len(batch),
+        "failed": len(errors),
+        "errors": errors,
+        "ids": [destination["id"] for destination in batch],
+        "seconds": round(seconds, 6),
+        "rows_per_sec": round(rows / seconds) if seconds else None,
+    }
+    return jsonify(result), 201 if batch else 400
+
+
 @app.route("/destinations", methods=["GET"])
 def get_destinations():
     """
-    Get All Destinations
+    Get Destinations (paginated and filterable)
+    ---
+    parameters:
+      - name: location
+        in: query
+        type: string
+        description: Only return destinations in this location (case-insensitive)
+        example: Indonesia
+      - name: min_price
+        in: query
+        type: number
+        description: Minimum price per night
+      - name: max_price
+        in: query
+        type: number
+        description: Maximum price per night
+      - name: sort
+        in: query
+        type: string
+        enum: [price_asc, price_desc]
+        description: Order by price per night instead of insertion order
+      - name: limit
+        in: query
+        type: integer
+        description: Page size (default 100, max 1000)
+      - name: offset
+        in: query
+        type: integer
+        description: Number of matching destinations to skip
+      - name: cursor
+        in: query
+        type: string
+        description: The next_cursor value returned by the previous page
+      - name: format
+        in: query
+        type: string
+        description: Set to "ndjson" to stream every matching destination, one per line
+      - name: If-None-Match
+        in: header
+        type: string
+        description: ETag of a previously fetched response
+    responses:
+      200:
+        description: A page of destinations and the cursor of the next page
+      304:
+        description: The catalog has not changed since the given ETag
+      400:
+        description: Invalid query parameters
+    """
+    query, error_response, status_code = parse_destination_query(request.args)
+    if error_response:
+        return jsonify(error_response), status_code
+
+    # Bulk export: stream every match without building the response in memory
+    if request.args.get("format") == "ndjson":
+        return Response(stream_destinations(query), mimetype="application/x-ndjson")
+
+    return cached_catalog_response(lambda: paginate_destinations(query))
+
+
+@app.route("/destinations/search", methods=["GET"])
+def search_destinations():
+    """
+    Search Destinations
     ---
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Words to find in the name, description or location. The last word also matches as a prefix.
+        example: trop para
+      - name: limit
+        in: query
+        type: integer
+        description: Maximum number of results (default 20, max 1000)
     responses:
       200:
-        description: List of all destinations
+        description: Matching destinations, best match first
+      304:
+        description: The catalog has not changed since the given ETag
+      400:
+        description: Missing query or invalid limit
     """
-    return jsonify({"destinations": destinations}), 200
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "Missing query parameter: q"}), 400
+
+    try:
+        limit = int(request.args.get("limit", DEFAULT_SEARCH_LIMIT))
+    except ValueError:
+        return jsonify({"error": "Invalid limit. It must be an integer."}), 400
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({"error": f"Invalid limit. It must be between 1 and {MAX_PAGE_SIZE}."}), 400
+
+    return cached_catalog_response(lambda: {"destinations": destinations.search(q, limit)})
+
+
+@app.route("/destinations/<string:id>", methods=["GET"])
+def get_destination(id):
+    """
+    Get a Destination by ID
+    ---
+    parameters:
+      - name: id
+        in: path
+        required: true
+        type: string
+        description: Destination ID
+        example: 3f6b13f5-84d8-4e5d-b178-e2e4c9c69b33
+    responses:
+      200:
+        description: Destination details
+      404:
+        description: Destination not found
+    """
+    destination = destinations.get(id)
+    if not destination:
+        return jsonify({"error": "Destination not found"}), 404
+
+    return jsonify({"destination": destination}), 200
 
 
 @app.route("/destinations/<string:id>", methods=["DELETE"])
@@ -211,16 +768,17 @@ def delete_destination(id):
     if claims.get("role") != "Admin":
         return jsonify({"error": "Admin access required"}), 401
 
-    global destinations
-    destination = next((d for d in destinations if d["id"] == id), None)
-    if not destination:
-        return jsonify({"error": "Destination not found"}), 404
-
-    destinations = [d for d in destinations if d["id"] != id]
-    save_destinations()
+    with storage.transaction():
+        sync_destinations()
+        destination = destinations.delete(id)
+        if not destination:
+            return jsonify({"error": "Destination not found"}), 404
+        storage.append("delete", id)
+    flusher.mark_dirty()
 
     return jsonify({"message": "Destination deleted successfully"}), 200
 
 
 if __name__ == "__main__":
+    flusher.install_signal_handlers()
     app.run(host="0.0.0.0", port=5002)
@@ -1 +0,0 @@
-destinations = [{'id': '7b3aa64c-a3a2-42f4-a111-b98cf3310095', 'name': 'Balzcxczxci', 'description': 'A tropical paradiszxzxe', 'location': 'Indozczxznesia', 'price_per_night': 222222200.5}, {'id': 'cf4b2647-0e5f-40c7-8b58-8288d99e6190', 'name': 'Bali', 'description': 'A tropical paradise', 'location': 'Indonesia', 'price_per_night': 200.5}]
\ No newline at end of file
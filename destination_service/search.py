@@ -0,0 +1,109 @@
+# destination_service/search.py
+import math
+import re
+from bisect import bisect_left, insort
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Matches in the name count more than matches in the location or description
+FIELD_WEIGHTS = {"name": 3.0, "location": 2.0, "description": 1.0}
+
+# Upper bound on vocabulary terms a prefix expands to, e.g. a single letter
+MAX_PREFIX_EXPANSIONS = 100
+
+
+def tokenize(text):
+    """
+    Split text into lower-cased word tokens.
+    """
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class SearchIndex:
+    """
+    Incremental inverted index over destination name, description and location.
+
+    Each token maps to the ids of the destinations containing it and a
+    field-weighted term frequency. A sorted vocabulary supports prefix
+    lookups, so the last query term can be completed as the user types.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._vocabulary = []
+        self._doc_tokens = {}
+
+    def add(self, destination):
+        """
+        Index a destination, replacing any previous entry for its id.
+        """
+        id = destination["id"]
+        self.remove(id)
+
+        weights = {}
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for token in tokenize(destination.get(field, "")):
+                weights[token] = weights.get(token, 0.0) + field_weight
+
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            postings[id] = weight
+        self._doc_tokens[id] = list(weights)
+
+    def remove(self, id):
+        """
+        Drop a destination from the index. Unknown ids are ignored.
+        """
+        for token in self._doc_tokens.pop(id, ()):
+            postings = self._postings[token]
+            del postings[id]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def search(self, query, limit=20):
+        """
+        Return up to limit destination ids matching every query term, best
+        first. The last term also matches as a prefix.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        scores = None
+        for position, term in enumerate(terms):
+            is_last = position == len(terms) - 1
+            term_scores = self._score_term(term, prefix=is_last)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {id: score + term_scores[id] for id, score in scores.items() if id in term_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [id for id, _ in ranked[:limit]]
+
+    def _score_term(self, term, prefix):
+        document_count = max(len(self._doc_tokens), 1)
+        tokens = [term] if term in self._postings else []
+        if prefix:
+            start = bisect_left(self._vocabulary, term)
+            for token in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+                if not token.startswith(term):
+                    break
+                if token != term:
+                    tokens.append(token)
+
+        scores = {}
+        for token in tokens:
+            postings = self._postings[token]
+            idf = math.log(1 + document_count / len(postings))
+            # Completed prefixes rank below exact matches of the same term
+            boost = 1.0 if token == term else 0.5
+            for id, weight in postings.items():
+                scores[id] = max(scores.get(id, 0.0), weight * idf * boost)
+        return scores
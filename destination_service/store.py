@@ -0,0 +1,296 @@
+# destination_service/store.py
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+from common.locks import ReadWriteLock
+from common.records import Record
+from destination_service.search import SearchIndex
+
+# Batches at least this large are merged into the price index with one sort
+# rather than one list insertion (an O(N) shift) per destination
+BULK_MERGE_THRESHOLD = 64
+
+
+class Destination(Record):
+    """
+    A catalog destination; locations are interned.
+    """
+
+    __slots__ = ("id", "name", "description", "location", "price_per_night")
+    INTERNED = frozenset({"location"})
+
+
+class DestinationStore:
+    """
+    In-memory destinations indexed by id, with a sorted price index.
+
+    Backed by a dict, which preserves insertion order, so listing returns
+    destinations in the order they were added while get, update and delete
+    are constant time. A parallel pair of lists keeps (price, id) ordered by
+    price_per_night for range queries in O(log N + k), and a SearchIndex
+    answers full-text queries. Both are updated incrementally.
+
+    Insertion order has its own index for cursors: every id gets an
+    increasing sequence number when it is first added, and a sorted array of
+    the live sequence numbers seeks to the destination after any id in
+    O(log N). Deleted ids keep their number until the store is reloaded, so
+    a cursor naming a destination deleted between two pages still resumes
+    at the right place.
+
+    version is bumped on every mutation. Together with epoch, which is unique
+    per store instance, it identifies one exact state of the catalog.
+    storage_position is the storage engine's name for the persisted state the
+    store holds, the same in every worker process that holds that state. It is
+    set by set_storage_position() after loading or syncing, and reset to None
+    by any local mutation until the next sync.
+
+    Mutations take the write side of a ReadWriteLock. Readers that walk the
+    indexes (iter_after, iter_by_price, search, version) must hold read_lock() for
+    the duration, so a page is built from one consistent state; get() is a
+    single dict lookup and needs no lock.
+
+    Destinations are kept as compact Destination records, converted from
+    dicts on the way in. They are never modified in place, so encode_all()
+    can cache each one's serialized form until it is replaced or deleted.
+    """
+
+    def __init__(self, destinations=()):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.version = 0
+        self.storage_position = None
+        self._by_id = {}
+        for destination in destinations:
+            self._by_id[destination["id"]] = Destination.coerce(destination)
+
+        # id -> sequence number, and the live ids with their numbers in order
+        self._seq_by_id = {id: seq for seq, id in enumerate(self._by_id)}
+        self._order_seqs = array("q", range(len(self._by_id)))
+        self._order_ids = list(self._by_id)
+        self._next_seq = len(self._by_id)
+
+        entries = sorted((float(d["price_per_night"]), d["id"]) for d in self._by_id.values())
+        self._prices = [price for price, _ in entries]
+        self._price_ids = [id for _, id in entries]
+
+        self._search_index = SearchIndex()
+        for destination in self._by_id.values():
+            self._search_index.add(destination)
+        # id -> (destination, encoding); the identity check drops stale entries
+        self._encoded = {}
+        self._lock = ReadWriteLock()
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self.list())
+
+    def __contains__(self, id):
+        return id in self._by_id
+
+    def get(self, id):
+        """
+        Return the destination with the given id, or None.
+        """
+        return self._by_id.get(id)
+
+    def encode_all(self, destinations, encode):
+        """
+        Return [encode(destination) for destination in destinations], encoding
+        each stored destination only once. destinations must come from the store.
+        """
+        cache = self._encoded
+        encoded = []
+        for destination in destinations:
+            entry = cache.get(destination.id)
+            if entry is None or entry[0] is not destination:
+                entry = cache[destination.id] = (destination, encode(destination))
+            encoded.append(entry[1])
+        return encoded
+
+    def set_storage_position(self, position):
+        """
+        Record that the store holds the persisted state named position.
+        """
+        with self._lock.write():
+            self.storage_position = position
+
+    def read_lock(self):
+        """
+        Context manager holding off writers while the indexes are read.
+        """
+        return self._lock.read()
+
+    def add(self, destination):
+        """
+        Add a destination, replacing any existing one with the same id.
+        """
+        with self._lock.write():
+            self._add(destination)
+
+    def _add(self, destination):
+        destination = Destination.coerce(destination)
+        previous = self._by_id.get(destination["id"])
+        if previous is not None:
+            self._unindex_price(previous)
+        else:
+            self._index_order(destination.id)
+        self._by_id[destination["id"]] = destination
+        self._index_price(destination)
+        self._search_index.add(destination)
+        self.version += 1
+        self.storage_position = None
+
+    def add_many(self, destinations):
+        """
+        Add many destinations under one write lock, bumping version once.
+        Large batches are merged into the price index in one pass instead of
+        one insertion each.
+        """
+        with self._lock.write():
+            if len(destinations) < BULK_MERGE_THRESHOLD:
+                for destination in destinations:
+                    self._add(destination)
+                return
+            added = []
+            # Only the last of several rows with one id is kept
+            for destination in {d["id"]: d for d in destinations}.values():
+                destination = Destination.coerce(destination)
+                previous = self._by_id.get(destination["id"])
+                if previous is not None:
+                    self._unindex_price(previous)
+                else:
+                    self._index_order(destination.id)
+                self._by_id[destination["id"]] = destination
+                self._search_index.add(destination)
+                added.append((float(destination["price_per_night"]), destination["id"]))
+            # Both runs are sorted, so this sort is a linear merge; being stable
+            # it keeps equal prices in insertion order, as _index_price does
+            added.sort(key=itemgetter(0))
+            entries = sorted([*zip(self._prices, self._price_ids), *added], key=itemgetter(0))
+            self._prices = [price for price, _ in entries]
+            self._price_ids = [id for _, id in entries]
+            self.version += 1
+            self.storage_position = None
+
+    def update(self, id, fields):
+        """
+        Merge fields into the destination with the given id. Returns the
+        updated destination, or None if it does not exist.
+        """
+        with self._lock.write():
+            destination = self._by_id.get(id)
+            if destination is None:
+                return None
+            self._add({**destination, **fields, "id": id})
+            return self._by_id[id]
+
+    def delete(self, id):
+        """
+        Remove and return the destination with the given id, or None.
+        """
+        with self._lock.write():
+            destination = self._by_id.get(id)
+            if destination is None:
+                return None
+            # Unindex first, so a failure leaves the destination in place
+            self._unindex_price(destination)
+            self._unindex_order(id)
+            del self._by_id[id]
+            self._encoded.pop(id, None)
+            self._search_index.remove(id)
+            self.version += 1
+            self.storage_position = None
+            return destination
+
+    def apply(self, entry):
+        """
+        Apply a storage log entry written by another process.
+        """
+        if entry["op"] == "put":
+            self.add(entry["record"])
+        elif entry["op"] == "delete":
+            self.delete(entry["key"])
+
+    def iter_after(self, id=None):
+        """
+        Iterate destinations in insertion order, starting after the
+        destination with the given id, or at the first one when id is None.
+        Raises KeyError for an id the store has never held.
+        """
+        start = 0 if id is None else bisect_right(self._order_seqs, self._seq_by_id[id])
+        by_id, order_ids = self._by_id, self._order_ids
+        return (by_id[order_ids[index]] for index in range(start, len(order_ids)))
+
+    def has_after(self, id):
+        """
+        Return True when a destination was added after the one with the given id.
+        """
+        return bisect_right(self._order_seqs, self._seq_by_id[id]) < len(self._order_seqs)
+
+    def iter_by_price(self, min_price=None, max_price=None, descending=False, position=0):
+        """
+        Iterate destinations priced within [min_price, max_price], cheapest
+        first (or most expensive first), skipping the first position matches.
+        """
+        lo, hi = self._price_range(min_price, max_price)
+        if descending:
+            indexes = range(hi - 1 - position, lo - 1, -1)
+        else:
+            indexes = range(lo + position, hi)
+        for index in indexes:
+            destination = self._by_id.get(self._price_ids[index])
+            if destination is not None:
+                yield destination
+
+    def count_by_price(self, min_price=None, max_price=None):
+        """
+        Return the number of destinations priced within [min_price, max_price].
+        """
+        lo, hi = self._price_range(min_price, max_price)
+        return max(hi - lo, 0)
+
+    def search(self, query, limit=20):
+        """
+        Return up to limit destinations matching a full-text query, best first.
+        """
+        return [self._by_id[id] for id in self._search_index.search(query, limit)]
+
+    def list(self):
+        """
+        Return all destinations as a list, in insertion order.
+        """
+        with self._lock.read():
+            return list(self._by_id.values())
+
+    def _price_range(self, min_price, max_price):
+        lo = 0 if min_price is None else bisect_left(self._prices, min_price)
+        hi = len(self._prices) if max_price is None else bisect_right(self._prices, max_price)
+        return lo, hi
+
+    def _index_order(self, id):
+        self._seq_by_id[id] = self._next_seq
+        self._order_seqs.append(self._next_seq)
+        self._order_ids.append(id)
+        self._next_seq += 1
+
+    def _unindex_order(self, id):
+        index = bisect_left(self._order_seqs, self._seq_by_id[id])
+        del self._order_seqs[index]
+        del self._order_ids[index]
+
+    def _index_price(self, destination):
+        price = float(destination["price_per_night"])
+        index = bisect_right(self._prices, price)
+        self._prices.insert(index, price)
+        self._price_ids.insert(index, destination["id"])
+
+    def _unindex_price(self, destination):
+        price = float(destination["price_per_night"])
+        lo = bisect_left(self._prices, price)
+        hi = bisect_right(self._prices, price)
+        # Destinations sharing a price are few, so a scan of the tie range is cheap
+        index = self._price_ids.index(destination["id"], lo, hi)
+        del self._prices[index]
+        del self._price_ids[index]
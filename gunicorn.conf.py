@@ -0,0 +1,22 @@
+# gunicorn.conf.py
+# Production serving for any of the services, e.g.
+#   SERVICE_WORKERS=4 gunicorn -c gunicorn.conf.py -b 0.0.0.0:5002 destination_service.app:app
+import multiprocessing
+import os
+
+# Worker processes per service (default: one per core) and threads per worker
+workers = int(os.environ.get("SERVICE_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.environ.get("SERVICE_THREADS", 4))
+
+# Workers import the app after forking, so each one builds its own
+# in-memory stores from the shared data files
+preload_app = False
+
+if workers > 1:
+    # Keep the workers' stores in sync through the locked append-only log
+    os.environ.setdefault("STORAGE_SHARED", "1")
+    # Split the cores between the workers' password hashing pools, so the
+    # KDF stays off the request threads without oversubscribing the host
+    os.environ.setdefault("PASSWORD_HASH_WORKERS", str(max(1, multiprocessing.cpu_count() // workers)))
+
+graceful_timeout = 30
@@ -2,18 +2,28 @@
 import pytest
 import os
 import shutil
-from user_service.app import app, USER_DATA_FILE, load_users, save_users
+from user_service.app import app, flusher, USER_DATA_FILE, USER_LOG_FILE, load_users, save_users
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from user_service.passwords import HasherBusy, PasswordHasher
+from werkzeug.security import check_password_hash, generate_password_hash
+from flask_jwt_extended import create_access_token
+import user_service.app as user_app
+import jwt as pyjwt
+from common.jwks import JWKSClient
 
 # Backup file for original data
 TEMP_USER_DATA_FILE = f"{USER_DATA_FILE}.backup"
+TEMP_USER_LOG_FILE = f"{USER_LOG_FILE}.backup"
 
 
 @pytest.fixture(autouse=True)
 def setup_and_teardown():
     """
     Setup and teardown for tests.
-    Temporarily empties user_data.py and restores it after the tests.
+    Temporarily empties user_data.jsonl and restores it after the tests.
     """
     # Backup the original user data file
     if os.path.exists(USER_DATA_FILE):
@@ -21,17 +31,27 @@ def setup_and_teardown():
     else:
         # Create an empty file if it doesn't exist
         open(USER_DATA_FILE, 'w').close()
+    if os.path.exists(USER_LOG_FILE):
+        shutil.move(USER_LOG_FILE, TEMP_USER_LOG_FILE)
 
     # Initialize with empty user data
     save_users()
 
     yield  # Run the tests
 
+    # Write out pending mutations now so the background flusher cannot
+    # touch the data files after they are restored
+    flusher.flush()
+
     # Restore the original user data file
     if os.path.exists(TEMP_USER_DATA_FILE):
         shutil.move(TEMP_USER_DATA_FILE, USER_DATA_FILE)
     else:
         os.remove(USER_DATA_FILE)
+    if os.path.exists(TEMP_USER_LOG_FILE):
+        shutil.move(TEMP_USER_LOG_FILE, USER_LOG_FILE)
+    elif os.path.exists(USER_LOG_FILE):
+        os.remove(USER_LOG_FILE)
 
 
 @pytest.fixture
@@ -182,3 +202,269 @@ def test_profile_authorized(client):
     assert response.status_code == 200
     assert response.json["email"] == "profileuser@example.com"
     assert response.json["role"] == "User"
+
+
+def test_register_user_email_case_insensitive(client):
+    """
+    Test that an email differing only in case counts as already registered.
+    """
+    data = {
+        "email": "caseuser@example.com",
+        "password": "Password123",
+        "name": "Case User",
+        "role": "User",
+    }
+    client.post("/register", json=data)
+    response = client.post("/register", json={**data, "email": "CaseUser@Example.com"})
+    assert response.status_code == 400
+    assert response.json["error"] == "Email already registered"
+
+
+def test_login_email_case_insensitive(client):
+    """
+    Test that login finds the user regardless of email casing.
+    """
+    data = {
+        "email": "caselogin@example.com",
+        "password": "Password123",
+        "name": "Case Login",
+        "role": "User",
+    }
+    client.post("/register", json=data)
+    response = client.post(
+        "/login", json={"email": "CaseLogin@Example.com", "password": "Password123"}
+    )
+    assert response.status_code == 200
+    assert "token" in response.json
+
+
+def test_login_rehashes_outdated_password_hash(client):
+    """
+    Test that logging in upgrades a hash made with other parameters.
+    """
+    data = {
+        "email": "rehashuser@example.com",
+        "password": "Password123",
+        "name": "Rehash User",
+        "role": "User",
+    }
+    client.post("/register", json=data)
+    user = user_app.users.get(data["email"])
+    user_app.users.add({**user, "password": generate_password_hash("Password123", "pbkdf2:sha256:1000")})
+
+    response = client.post("/login", json={"email": data["email"], "password": "Password123"})
+    assert response.status_code == 200
+    upgraded = user_app.users.get(data["email"])["password"]
+    assert not user_app.hasher.needs_rehash(upgraded)
+
+    # The upgraded hash still verifies
+    response = client.post("/login", json={"email": data["email"], "password": "Password123"})
+    assert response.status_code == 200
+
+
+def test_login_rejected_when_hasher_saturated(client):
+    """
+    Test that login fails fast with 503 when every hashing slot is taken.
+    """
+    data = {
+        "email": "busyuser@example.com",
+        "password": "Password123",
+        "name": "Busy User",
+        "role": "User",
+    }
+    client.post("/register", json=data)
+
+    slots = user_app.hasher._slots
+    user_app.hasher._slots = threading.BoundedSemaphore(1)
+    user_app.hasher._slots.acquire()
+    try:
+        response = client.post("/login", json={"email": data["email"], "password": "Password123"})
+    finally:
+        user_app.hasher._slots = slots
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_concurrent_registrations(client, monkeypatch):
+    """
+    Stress test: concurrent registrations lose no users and never admit a
+    duplicate email.
+    """
+    # A cheap hash keeps the test about the store, not the KDF
+    monkeypatch.setattr(user_app, "hasher", PasswordHasher(method="pbkdf2:sha256:1", workers=0, max_pending=1000))
+
+    def register(email):
+        data = {"email": email, "password": "Password123", "name": "Stress User", "role": "User"}
+        return app.test_client().post("/register", json=data).status_code
+
+    emails = [f"stress{i}@example.com" for i in range(200)] + ["contended@example.com"] * 50
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        statuses = list(pool.map(register, emails))
+
+    assert statuses[:200] == [201] * 200
+    assert sorted(statuses[200:]) == [201] + [400] * 49
+    for email in emails:
+        assert user_app.users.get(email) is not None
+
+
+@pytest.fixture
+def signing_keys(tmp_path, monkeypatch):
+    """
+    Sign tokens with RS256 keys kept in a temporary directory, as deployed.
+    """
+    monkeypatch.setitem(app.config, "JWT_KEYS_DIR", str(tmp_path / "jwt_keys"))
+    algorithm = app.config["JWT_ALGORITHM"]
+    user_app.use_signing_algorithm("RS256")
+    yield user_app.keyring
+    user_app.use_signing_algorithm(algorithm)
+
+
+def test_jwks_verifies_issued_tokens(client, signing_keys):
+    """
+    Test that tokens from /login verify with the published JWKS alone.
+    """
+    data = {
+        "email": "jwksuser@example.com",
+        "password": "Password123",
+        "name": "JWKS User",
+        "role": "Admin",
+    }
+    client.post("/register", json=data)
+    token = client.post(
+        "/login", json={"email": "jwksuser@example.com", "password": "Password123"}
+    ).json["token"]
+
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert "max-age" in response.headers["Cache-Control"]
+    cached = client.get("/.well-known/jwks.json", headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
+
+    key_set = JWKSClient("http://user_service/.well-known/jwks.json", fetch=lambda: response.json)
+    header = pyjwt.get_unverified_header(token)
+    assert header["kid"] == response.json["keys"][0]["kid"]
+    claims = pyjwt.decode(token, key_set.key_for(header, {}), algorithms=["RS256", "EdDSA"])
+    assert claims["sub"] == "jwksuser@example.com"
+    assert claims["role"] == "Admin"
+
+
+def test_bulk_register_users(client, monkeypatch):
+    """
+    Test that an admin registers many users at once, with per-row errors for
+    invalid rows and for duplicates in the store or the batch.
+    """
+    monkeypatch.setattr(user_app, "hasher", PasswordHasher(method="pbkdf2:sha256:1", workers=0))
+    client.post(
+        "/register",
+        json={"email": "existing@example.com", "password": "Password123", "name": "Existing", "role": "User"},
+    )
+    with app.app_context():
+        token = create_access_token(identity="admin@example.com", additional_claims={"role": "Admin"})
+
+    rows = [
+        {"email": "bulk1@example.com", "password": "Password123", "name": "Bulk One", "role": "User"},
+        {"email": "not-an-email", "password": "Password123", "name": "Bad Email", "role": "User"},
+        {"email": "bulk2@example.com", "password": "weak", "name": "Weak", "role": "User"},
+        {"email": "Existing@Example.com", "password": "Password123", "name": "Existing", "role": "User"},
+        {"email": "bulk3@example.com", "password": "Password123", "name": "Bulk Three", "role": "Admin"},
+        {"email": "BULK1@example.com", "password": "Password123", "name": "Again", "role": "User"},
+    ]
+    response = client.post("/users/bulk", json=rows, headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 201
+    assert response.json["added"] == 2
+    assert [(error["row"], error["error"]) for error in response.json["errors"]] == [
+        (1, "Invalid email format"),
+        (2, "Password must be at least 8 characters long, include 1 uppercase letter and 1 number"),
+        (3, "Email already registered"),
+        (5, "Duplicate email in request"),
+    ]
+    login = client.post("/login", json={"email": "bulk3@example.com", "password": "Password123"})
+    assert login.status_code == 200
+
+
+def test_bulk_register_requires_admin(client):
+    """
+    Test that regular users cannot provision users in bulk.
+    """
+    with app.app_context():
+        token = create_access_token(identity="user@example.com", additional_claims={"role": "User"})
+    response = client.post("/users/bulk", json=[], headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+def test_hash_many_spreads_across_workers():
+    """
+    Test that a batch hashed on the process pool verifies like single hashes.
+    """
+    hasher = PasswordHasher(method="pbkdf2:sha256:1", workers=2)
+    try:
+        passwords = [f"Password{i}" for i in range(10)]
+        hashes = hasher.hash_many(passwords)
+    finally:
+        hasher.shutdown()
+    assert len(hashes) == 10
+    assert all(check_password_hash(h, p) for h, p in zip(hashes, passwords))
+
+
+def test_login_verification_not_stuck_behind_bulk_batch():
+    """
+    Test that a verification submitted during a bulk batch waits for one
+    wave of hashes, not the whole batch, and that timeouts shed load.
+    """
+    method = "pbkdf2:sha256:200000"
+    stored = PasswordHasher(method=method, workers=0).hash("Password123")
+    hasher = PasswordHasher(method=method, workers=1, timeout=1.0)
+    try:
+        hasher.hash("warm up the pool")
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            batch = pool.submit(hasher.hash_many, [f"Password{i}" for i in range(40)])
+            time.sleep(0.2)
+            assert hasher.verify(stored, "Password123")
+            assert len(batch.result()) == 40
+    finally:
+        hasher.shutdown()
+
+    hasher = PasswordHasher(method=method, workers=1, timeout=0.001)
+    try:
+        with pytest.raises(HasherBusy):
+            hasher.hash("Password123")
+    finally:
+        hasher.shutdown()
+
+
+def test_metrics_count_requests_and_hashing(client):
+    """
+    Test that /metrics reports requests per route and password hashing time.
+    """
+    client.post(
+        "/register",
+        json={"email": "metrics@example.com", "password": "Password123", "name": "Metrics", "role": "User"},
+    )
+    client.post("/login", json={"email": "metrics@example.com", "password": "Password123"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert re.search(r'^http_requests_total\{route="/login",method="POST",status="200"\} \d+$', body, re.M)
+    assert re.search(r'^password_hash_duration_seconds_count\{operation="verify"\} \d+$', body, re.M)
+    assert re.search(r'^store_records\{store="users"\} \d+$', body, re.M)
+
+
+def test_concurrent_first_requests_load_once(monkeypatch):
+    """
+    Test that concurrent first requests load the store once, so none of them
+    replaces a store another request has already written to.
+    """
+    loads = []
+
+    def slow_load():
+        loads.append(1)
+        time.sleep(0.05)
+
+    monkeypatch.setattr(user_app, "is_data_initialized", False)
+    monkeypatch.setattr(user_app, "load_users", slow_load)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: user_app.initialize_data(), range(8)))
+
+    assert loads == [1]
@@ -1,22 +1,41 @@
 # user_service/app.py
 import os
-import ast
-import re
-from flask import Flask, jsonify, request
-from werkzeug.security import generate_password_hash, check_password_hash
+import threading
+import time
+from flask import Flask, g, jsonify, request
 from flask_jwt_extended import (
-    JWTManager,
     create_access_token,
     jwt_required,
     get_jwt_identity,
     get_jwt
 )
-from flasgger import Swagger
+from common.apidocs import install_apidocs
+from common.flusher import BackgroundFlusher
+from common.jwks import KeyRing
+from common.jwt_cache import CachingJWTManager
+from common.json_provider import install_json_provider
+from common.metrics import MetricsRegistry, install_metrics
+from common.profiling import install_profiling
+from common.storage import create_storage
+from common.validation import EMAIL_MESSAGE, is_valid_email, user_validator
+from user_service.passwords import HasherBusy, PasswordHasher
+from user_service.store import UserStore, normalize_email
 
 app = Flask(__name__)
 
-# Swagger configuration
-swagger = Swagger(
+# JSON encoding of responses and request bodies: JSON_ENCODER is "auto" (orjson
+# when it is installed, otherwise the standard library), "orjson" or "stdlib"
+app.config["JSON_ENCODER"] = os.environ.get("JSON_ENCODER", "auto")
+install_json_provider(app)
+
+# API docs: Swagger UI at /apidocs/ and the spec at /apispec_1.json. APIDOCS is
+# "lazy" (flasgger loads on the first docs request), "static" (serve the spec
+# precomputed into APIDOCS_SPEC_FILE by python -m common.apidocs), "eager" or "off"
+app.config["APIDOCS"] = os.environ.get("APIDOCS", "lazy")
+app.config["APIDOCS_SPEC_FILE"] = os.environ.get(
+    "APIDOCS_SPEC_FILE", os.path.join(os.path.dirname(__file__), "apispec.json")
+)
+install_apidocs(
     app,
     template={
         "swagger": "2.0",
@@ -40,36 +59,220 @@ swagger = Swagger(
     },
 )
 
-# JWT configuration
+# Prometheus-style metrics served at /metrics; the request hooks are
+# installed first so they time the other before_request hooks too
+metrics = MetricsRegistry()
+install_metrics(app, metrics)
+storage_seconds = metrics.histogram(
+    "storage_duration_seconds", "Time spent loading and saving the store, in seconds.", ("store", "operation")
+)
+password_hash_seconds = metrics.histogram(
+    "password_hash_duration_seconds", "Time spent hashing and verifying passwords, in seconds.", ("operation",)
+)
+metrics.gauge("store_records", "Records in the in-memory store.", lambda: len(users), {"store": "users"})
+
+# Opt-in request profiling: profile PROFILE_SAMPLE_RATE of all requests, plus
+# requests whose X-Profile header equals PROFILE_TOKEN, writing "collapsed"
+# stacks or "cprofile" stats per route under PROFILE_DIR. Disabled (and not
+# installed) while both are unset.
+app.config["PROFILE_SAMPLE_RATE"] = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+app.config["PROFILE_TOKEN"] = os.environ.get("PROFILE_TOKEN")
+app.config["PROFILE_FORMAT"] = os.environ.get("PROFILE_FORMAT", "collapsed")
+app.config["PROFILE_DIR"] = os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(__file__), "profiles"))
+install_profiling(app)
+
+# JWT configuration: tokens are HS256 with JWT_SECRET_KEY, like the other
+# services without JWT_JWKS_URL. JWT_ALGORITHM=RS256 or EdDSA (set by Docker
+# Compose) signs with the newest private key in JWT_KEYS_DIR instead and
+# publishes the public keys at /.well-known/jwks.json.
 app.config["JWT_SECRET_KEY"] = "your-secret-key"
-jwt = JWTManager(app)
+app.config["JWT_ALGORITHM"] = os.environ.get("JWT_ALGORITHM", "HS256")
+app.config["JWT_KEYS_DIR"] = os.environ.get(
+    "JWT_KEYS_DIR", os.path.join(os.path.dirname(__file__), "jwt_keys")
+)
+# Signing keys kept in the JWKS after a rotation (the current one included),
+# and seconds clients may cache the JWKS
+app.config["JWT_KEYS_KEPT"] = 2
+app.config["JWKS_MAX_AGE"] = 300
+# Verified-token cache: maximum number of tokens and seconds before a cached
+# token is verified again (entries never outlive the token's exp claim)
+app.config["JWT_CACHE_SIZE"] = 10000
+app.config["JWT_CACHE_MAX_AGE"] = 300
+jwt = CachingJWTManager(
+    app,
+    maxsize=app.config["JWT_CACHE_SIZE"],
+    max_age=app.config["JWT_CACHE_MAX_AGE"],
+)
+keyring = None
+
+
+def use_signing_algorithm(algorithm):
+    """
+    Sign and verify tokens with algorithm from now on: HS algorithms use
+    JWT_SECRET_KEY, any other the keys in JWT_KEYS_DIR.
+    """
+    global keyring
+    app.config["JWT_ALGORITHM"] = algorithm
+    if algorithm.startswith("HS"):
+        keyring = None
+    else:
+        keyring = KeyRing(
+            app.config["JWT_KEYS_DIR"],
+            algorithm=algorithm,
+            keep=app.config["JWT_KEYS_KEPT"],
+        )
+
+
+def signing_key():
+    """
+    The key tokens are signed with, fixed for the whole request so the
+    kid header always matches the signature across a rotation.
+    """
+    if "jwt_signing_key" not in g:
+        g.jwt_signing_key = keyring.current()
+    return g.jwt_signing_key
+
+
+@jwt.decode_key_loader
+def decode_key(jwt_header, jwt_data):
+    if keyring is None:
+        return app.config["JWT_SECRET_KEY"]
+    return keyring.key_for(jwt_header, jwt_data)
+
+
+@jwt.encode_key_loader
+def encode_key(identity):
+    if keyring is None:
+        return app.config["JWT_SECRET_KEY"]
+    return signing_key().private_key
+
+
+@jwt.additional_headers_loader
+def signing_headers(identity):
+    return {} if keyring is None else {"kid": signing_key().kid}
 
-# Path to the Python file for storing user data
-USER_DATA_FILE = os.path.join(os.path.dirname(__file__), "user_data.py")
-users = []
+
+use_signing_algorithm(app.config["JWT_ALGORITHM"])
+
+# Background flush configuration: seconds between flushes and the number of
+# mutations that triggers an early flush (0 seconds flushes synchronously)
+app.config["FLUSH_INTERVAL"] = 1.0
+app.config["FLUSH_MAX_PENDING"] = 100
+
+# Set STORAGE_SHARED=1 when several worker processes serve the app (gunicorn.conf.py
+# does this); they then share the data files through a locked append-only log
+app.config["STORAGE_SHARED"] = os.environ.get("STORAGE_SHARED") == "1"
+
+# Directory of the data files (snapshot, log and default SQLite database);
+# defaults to the service package
+app.config["DATA_DIR"] = os.environ.get("DATA_DIR", os.path.dirname(__file__))
+
+# Storage backend: "log" (append-only log compacted into a snapshot file) or
+# "sql" (SQLAlchemy; STORAGE_URL defaults to a SQLite database next to this file)
+app.config["STORAGE_ENGINE"] = os.environ.get("STORAGE_ENGINE", "log")
+app.config["STORAGE_URL"] = os.environ.get(
+    "STORAGE_URL", "sqlite:///" + os.path.join(app.config["DATA_DIR"], "user_data.db")
+)
+app.config["STORAGE_POOL_SIZE"] = 5
+app.config["STORAGE_MAX_OVERFLOW"] = 10
+
+# Password hashing configuration: werkzeug hash method, worker processes
+# (0 hashes on the request thread) and the maximum number of hashes in flight
+# before requests are rejected with 503 (None means 4 per worker)
+app.config["PASSWORD_HASH_METHOD"] = "scrypt:32768:8:1"
+app.config["PASSWORD_HASH_WORKERS"] = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count()))
+app.config["PASSWORD_HASH_MAX_PENDING"] = None
+
+# Path to the snapshot file for storing user data
+USER_DATA_FILE = os.path.join(app.config["DATA_DIR"], "user_data.jsonl")
+# Append-only log of user mutations, compacted into USER_DATA_FILE
+USER_LOG_FILE = os.path.join(app.config["DATA_DIR"], "user_data.log")
+# Pre-snapshot data file, only read when USER_DATA_FILE does not exist yet
+LEGACY_USER_DATA_FILE = os.path.join(app.config["DATA_DIR"], "user_data.py")
+if app.config["STORAGE_ENGINE"] == "sql":
+    storage = create_storage(
+        "sql",
+        url=app.config["STORAGE_URL"],
+        table="users",
+        key="email",
+        shared=app.config["STORAGE_SHARED"],
+        pool_size=app.config["STORAGE_POOL_SIZE"],
+        max_overflow=app.config["STORAGE_MAX_OVERFLOW"],
+    )
+else:
+    storage = create_storage(
+        "log",
+        snapshot_path=USER_DATA_FILE,
+        log_path=USER_LOG_FILE,
+        key="email",
+        name="users",
+        legacy_path=LEGACY_USER_DATA_FILE,
+        shared=app.config["STORAGE_SHARED"],
+    )
+users = UserStore()
 is_data_initialized = False  # Flag to ensure data is loaded only once
+# Held by the first requests so only one of them loads the store
+initialize_lock = threading.Lock()
 
 
 def load_users():
     """
-    Load users from the user_data.py file into the global users list.
+    Load users from storage (by default the user_data.jsonl snapshot plus the log).
     """
     global users
-    try:
-        with open(USER_DATA_FILE, "r") as file:
-            content = file.read()
-            users = ast.literal_eval(content.split("=", 1)[1].strip())
-    except (FileNotFoundError, SyntaxError, ValueError):
-        users = []
+    with storage_seconds.time(store="users", operation="load"):
+        users = UserStore(storage.load())
+
+
+def sync_users():
+    """
+    Apply user changes that other worker processes logged since the last sync.
+    """
+    # Read and apply under one lock, so request threads apply batches in order
+    with storage.lock:
+        entries = storage.refresh()
+        if entries is None:
+            load_users()
+            return
+        for entry in entries:
+            users.apply(entry)
 
 
 def save_users():
     """
-    Save the global users list to the user_data.py file.
+    Flush pending log entries and compact the log into user_data.jsonl once it
+    has grown past the storage threshold.
     """
-    global users
-    with open(USER_DATA_FILE, "w") as file:
-        file.write(f"users = {users}")
+    with storage_seconds.time(store="users", operation="save"):
+        with storage.transaction():
+            storage.flush()
+        # Outside the transaction, so writers are not held up by the snapshot
+        if storage.needs_compaction():
+            storage.compact(users)
+
+
+flusher = BackgroundFlusher(
+    save_users,
+    interval=app.config["FLUSH_INTERVAL"],
+    max_pending=app.config["FLUSH_MAX_PENDING"],
+)
+
+
+hasher = PasswordHasher(
+    method=app.config["PASSWORD_HASH_METHOD"],
+    workers=app.config["PASSWORD_HASH_WORKERS"],
+    max_pending=app.config["PASSWORD_HASH_MAX_PENDING"],
+)
+
+
+@app.errorhandler(HasherBusy)
+def handle_hasher_busy(error):
+    """
+    Shed load when every password hashing slot is taken.
+    """
+    response = jsonify({"error": "Server is busy, please retry shortly"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
 
 
 @app.before_request
@@ -79,16 +282,24 @@ def initialize_data():
     """
     global is_data_initialized
     if not is_data_initialized:
-        load_users()
-        is_data_initialized = True
+        with initialize_lock:
+            if not is_data_initialized:
+                load_users()
+                is_data_initialized = True
+    elif storage.shared:
+        sync_users()
+
+
+# Largest number of users accepted by one POST /users/bulk request
+USERS_BULK_MAX_ROWS = 10000
 
 
-@app.teardown_appcontext
-def persist_data(exception=None):
+def validate_user_data(data):
     """
-    Save user data to the user_data.py file when the application shuts down.
+    Validate the required fields, email format, password strength and role
+    of a user registration.
     """
-    save_users()
+    return user_validator.validate(data)
 
 
 @app.route("/register", methods=["POST"])
@@ -124,49 +335,146 @@ def register_user():
         description: User registered successfully
       400:
         description: Invalid input or email already registered
+      503:
+        description: Password hashing capacity exhausted, retry later
     """
     global users
     data = request.get_json()
 
-    # Validate that all required fields are provided
-    required_fields = ["email", "password", "name", "role"]
-    missing_fields = [field for field in required_fields if not data.get(field)]
-    if missing_fields:
-        return jsonify({"error": f"Missing fields: {', '.join(missing_fields)}"}), 400
+    error_response, status_code = validate_user_data(data)
+    if error_response:
+        return jsonify(error_response), status_code
 
-    # Validate Email format
-    email_regex = r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)"
-    if not re.match(email_regex, data.get("email", "")):
-        return jsonify({"error": "Invalid email format"}), 400
-
-    # Validate password strength (e.g., at least 8 characters, 1 uppercase, 1 number)
-    if len(data["password"]) < 8 or not re.search(r'[A-Z]', data["password"]) or not re.search(r'[0-9]', data["password"]):
-        return jsonify({"error": "Password must be at least 8 characters long, include 1 uppercase letter and 1 number"}), 400
-
-    # Validate role
-    valid_roles = ["User", "Admin"]
-    if data["role"] not in valid_roles:
-        return jsonify({"error": f"Invalid role. Allowed roles: {', '.join(valid_roles)}"}), 400
-
-    # Check if email is already registered
-    if any(user["email"] == data["email"] for user in users):
+    # Check if email is already registered (case-insensitive index lookup)
+    if data["email"] in users:
         return jsonify({"error": "Email already registered"}), 400
 
-    # Add the new user to the users list
-    hashed_password = generate_password_hash(data["password"])
-    users.append(
-        {
-            "email": data["email"],
-            "name": data["name"],
-            "password": hashed_password,
-            "role": data["role"],
-        }
-    )
-
-    save_users()  # Save the updated users list
+    # Add the new user to the users store
+    with password_hash_seconds.time(operation="hash"):
+        hashed_password = hasher.hash(data["password"])
+    user = {
+        "email": data["email"],
+        "name": data["name"],
+        "password": hashed_password,
+        "role": data["role"],
+    }
+    with storage.transaction():
+        # Re-check under the lock: another worker may have registered it meanwhile
+        sync_users()
+        if not users.add_if_absent(user):
+            return jsonify({"error": "Email already registered"}), 400
+        storage.append("put", user["email"], user)
+    flusher.mark_dirty()
     return jsonify({"message": "User registered successfully"}), 201
 
 
+@app.route("/users/bulk", methods=["POST"])
+@jwt_required()
+def register_users_bulk():
+    """
+    Register Many Users at Once (Admin only)
+    ---
+    security:
+      - Bearer: []
+    parameters:
+      - name: body
+        in: body
+        required: true
+        description: A JSON array of users, each with the fields /register takes
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              email:
+                type: string
+              password:
+                type: string
+              name:
+                type: string
+              role:
+                type: string
+      - name: atomic
+        in: query
+        type: boolean
+        description: Register nobody if any row is invalid or already registered
+    responses:
+      201:
+        description: Valid users registered in one batch; rejected rows are listed in errors by zero-based row index
+      400:
+        description: Body is not an array, too many rows, or no user could be registered
+      401:
+        description: Unauthorized (Admin access required)
+      503:
+        description: Password hashing capacity exhausted, retry later
+    """
+    claims = get_jwt()
+    if claims.get("role") != "Admin":
+        return jsonify({"error": "Admin access required"}), 401
+
+    rows = request.get_json(silent=True)
+    if not isinstance(rows, list):
+        return jsonify({"error": "Body must be a JSON array of users"}), 400
+    if len(rows) > USERS_BULK_MAX_ROWS:
+        return jsonify({"error": f"At most {USERS_BULK_MAX_ROWS} users per request"}), 400
+    atomic = request.args.get("atomic", "").lower() in ("1", "true")
+    start = time.perf_counter()
+
+    # Validate and dedupe in one pass, against the store and within the batch
+    valid = []
+    errors = []
+    seen = set()
+    for row, data in enumerate(rows):
+        if not isinstance(data, dict):
+            errors.append({"row": row, "error": "Row must be a JSON object."})
+            continue
+        error_response, _ = validate_user_data(data)
+        if error_response:
+            errors.append({"row": row, **error_response})
+            continue
+        email = normalize_email(data["email"])
+        if email in seen:
+            errors.append({"row": row, "error": "Duplicate email in request"})
+            continue
+        seen.add(email)
+        if data["email"] in users:
+            errors.append({"row": row, "error": "Email already registered"})
+            continue
+        valid.append((row, data))
+
+    added = []
+    if valid and not (atomic and errors):
+        with password_hash_seconds.time(operation="hash_many"):
+            hashes = hasher.hash_many(data["password"] for _, data in valid)
+        with storage.transaction():
+            # Re-check under the lock: other workers may have registered some meanwhile
+            sync_users()
+            for (row, data), hashed_password in zip(valid, hashes):
+                user = {
+                    "email": data["email"],
+                    "name": data["name"],
+                    "password": hashed_password,
+                    "role": data["role"],
+                }
+                if users.add_if_absent(user):
+                    added.append(user)
+                else:
+                    errors.append({"row": row, "error": "Email already registered"})
+            storage.append_many("put", ((user["email"], user) for user in added))
+        flusher.mark_dirty()
+        errors.sort(key=lambda error: error["row"])
+    seconds = time.perf_counter() - start
+
+    result = {
+        "added": len(added),
+        "failed": len(errors),
+        "errors": errors,
+        "seconds": round(seconds, 6),
+        "rows_per_sec": round(len(rows) / seconds) if seconds else None,
+    }
+    return jsonify(result), 201 if added else 400
+
+
 @app.route("/login", methods=["POST"])
 def login():
     """
@@ -194,6 +502,8 @@ def login():
         description: Missing email or password
       401:
         description: Invalid credentials
+      503:
+        description: Password hashing capacity exhausted, retry later
     """
     global users
     data = request.get_json()
@@ -203,14 +513,30 @@ def login():
         return jsonify({"error": "Email and password are required"}), 400
 
     # Validate email format
-    email_regex = r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)"
-    if not re.match(email_regex, data.get("email", "")):
-        return jsonify({"error": "Invalid email format"}), 400
+    if not is_valid_email(data["email"]):
+        return jsonify({"error": EMAIL_MESSAGE}), 400
 
     # Find user by email
-    user = next((u for u in users if u["email"] == data["email"]), None)
-    if not user or not check_password_hash(user["password"], data["password"]):
+    user = users.get(data["email"])
+    if not user:
         return jsonify({"error": "Invalid credentials"}), 401
+    with password_hash_seconds.time(operation="verify"):
+        verified = hasher.verify(user["password"], data["password"])
+    if not verified:
+        return jsonify({"error": "Invalid credentials"}), 401
+
+    # Transparently upgrade hashes made with older parameters
+    if hasher.needs_rehash(user["password"]):
+        with password_hash_seconds.time(operation="hash"):
+            rehashed = {**user, "password": hasher.hash(data["password"])}
+        with storage.transaction():
+            # Keep any change another worker made to the user meanwhile
+            sync_users()
+            if users.get(user["email"]) == user:
+                users.add(rehashed)
+                storage.append("put", user["email"], rehashed)
+        flusher.mark_dirty()
+        user = rehashed
 
     # Create JWT token with additional claims
     token = create_access_token(
@@ -220,6 +546,24 @@ def login():
     return jsonify({"token": token}), 200
 
 
+@app.route("/.well-known/jwks.json", methods=["GET"])
+def jwks():
+    """
+    Get the Token Signing Public Keys
+    ---
+    responses:
+      200:
+        description: JSON Web Key Set with the public keys that verify issued tokens, newest first
+      304:
+        description: Key set unchanged since the ETag in If-None-Match
+    """
+    key_set = keyring.jwks() if keyring else {"keys": []}
+    response = jsonify(key_set)
+    response.headers["Cache-Control"] = f"public, max-age={app.config['JWKS_MAX_AGE']}"
+    response.add_etag()
+    return response.make_conditional(request)
+
+
 @app.route('/profile', methods=['GET'])
 @jwt_required()
 def profile():
@@ -253,4 +597,5 @@ def profile():
 
 
 if __name__ == "__main__":
+    flusher.install_signal_handlers()
     app.run(host="0.0.0.0", port=5001)
\ No newline at end of file
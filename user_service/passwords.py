@@ -0,0 +1,113 @@
+# user_service/passwords.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HasherBusy(Exception):
+    """Raised when every password hashing slot is taken."""
+
+
+class PasswordHasher:
+    """
+    Run password hashing and verification on a bounded process pool.
+
+    The KDF is CPU-bound, so it runs in worker processes instead of holding
+    the GIL on the request thread. At most max_pending operations may be in
+    flight; beyond that calls fail fast with HasherBusy so the endpoint can
+    answer 503 instead of queueing without bound, as do operations that
+    time out waiting for the pool. workers=0 hashes inline.
+    """
+
+    def __init__(self, method="scrypt:32768:8:1", workers=None, max_pending=None, timeout=30):
+        self.method = method
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_pending = max_pending or max(self.workers, 1) * 4
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._prefix = None
+
+    def hash(self, password):
+        """
+        Hash a password with the configured method.
+        """
+        return self._run(generate_password_hash, password, self.method)
+
+    def hash_many(self, passwords):
+        """
+        Hash many passwords, spread across every worker process. The batch
+        takes one admission slot and is submitted in waves of one password
+        per worker, so single hashes and verifications submitted meanwhile
+        wait for at most one wave rather than the whole batch.
+        """
+        passwords = list(passwords)
+        if not passwords:
+            return []
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            if self.workers == 0:
+                return [generate_password_hash(password, self.method) for password in passwords]
+            executor = self._get_executor()
+            hashes = []
+            for start in range(0, len(passwords), self.workers):
+                wave = [
+                    executor.submit(generate_password_hash, password, self.method)
+                    for password in passwords[start:start + self.workers]
+                ]
+                hashes.extend(self._result(future) for future in wave)
+            return hashes
+        finally:
+            self._slots.release()
+
+    def verify(self, pwhash, password):
+        """
+        Check a password against a stored hash.
+        """
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """
+        Return True when a stored hash was made with different parameters.
+        """
+        if self._prefix is None:
+            # werkzeug expands defaults (e.g. "scrypt" -> "scrypt:32768:8:1")
+            self._prefix = generate_password_hash("", self.method).split("$", 1)[0]
+        return pwhash.split("$", 1)[0] != self._prefix
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            if self.workers == 0:
+                return func(*args)
+            return self._result(self._get_executor().submit(func, *args))
+        finally:
+            self._slots.release()
+
+    def _result(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # The pool is backed up; shed the request instead of failing it
+            future.cancel()
+            raise HasherBusy()
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                # spawn, not fork: the service process runs other threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
@@ -0,0 +1,91 @@
+# user_service/store.py
+import threading
+from common.records import Record
+
+
+def normalize_email(email):
+    """
+    Return the lookup key for an email address (trimmed and lower-cased).
+    """
+    return email.strip().lower()
+
+
+class User(Record):
+    """
+    A registered user; roles are interned.
+    """
+
+    __slots__ = ("email", "name", "password", "role")
+    INTERNED = frozenset({"role"})
+
+
+class UserStore:
+    """
+    In-memory users indexed by normalized email.
+
+    Users are kept as compact User records, converted from dicts on the way
+    in. Iterating yields them in registration order, so the store can be
+    handed to the storage engine for compaction like a plain list.
+
+    Writes and iteration take a lock; get() and membership tests are single
+    dict lookups, which are atomic, so logins never wait on registrations.
+    """
+
+    def __init__(self, users=()):
+        self._by_email = {}
+        for user in users:
+            self._by_email[normalize_email(user["email"])] = User.coerce(user)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._by_email)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._by_email.values()))
+
+    def __contains__(self, email):
+        return normalize_email(email) in self._by_email
+
+    def get(self, email):
+        """
+        Return the user registered under email (any casing), or None.
+        """
+        return self._by_email.get(normalize_email(email))
+
+    def add(self, user):
+        """
+        Add or replace the user keyed by its email.
+        """
+        user = User.coerce(user)
+        with self._lock:
+            self._by_email[normalize_email(user["email"])] = user
+
+    def add_if_absent(self, user):
+        """
+        Add the user unless its email is already registered. Returns True if
+        the user was added; the check and insert are atomic.
+        """
+        key = normalize_email(user["email"])
+        user = User.coerce(user)
+        with self._lock:
+            if key in self._by_email:
+                return False
+            self._by_email[key] = user
+            return True
+
+    def delete(self, email):
+        """
+        Remove and return the user registered under email, or None.
+        """
+        with self._lock:
+            return self._by_email.pop(normalize_email(email), None)
+
+    def apply(self, entry):
+        """
+        Apply a storage log entry written by another process.
+        """
+        if entry["op"] == "put":
+            self.add(entry["record"])
+        elif entry["op"] == "delete":
+            self.delete(entry["key"])
@@ -1 +0,0 @@
-users = [{'email': 'a@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$L4b2maEZd0FiBh9x$57428664f1517f760f8de04bfb77bf5bcdd06045d094b9d2083c6af488a302528cf8b3630f1ad502639a22cdb223659a3bf2141e39eec4cbbe80ab8d71fc83cd', 'role': 'User'}, {'email': 'user@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$G5lK69gOInOGgW5H$bce3b8f10f6868a938e7681e21a59b89e2084a7b7eda45547f78865b06cd31b68f5915112e0de273fef0214863228e0d4d6f5725c34543d224dc319a9e1dc91e', 'role': 'User'}, {'email': 'a_1@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$zFzPiiWwKbWvbeoU$cacf402e49877224af4d960bfb143eea4fd07985c233960f572589d791cc35631ce575c517d3e73f3300b58466fba066da5b6382a2b74ad3bd3417d8b9b0bb02', 'role': 'Admin'}, {'email': 'a_2@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$TxEXDMBwlA4IKiTR$68b2fdcae1f0c699490a938c9a8cd130c6de430e7046650461fcef86855030b749b20cb621f3c5a470cfd905f8935f760246c789bf6d1a3b0837e983c68b297a', 'role': 'Admin'}, {'email': 'admin@example.com', 'name': 'Test Admin', 'password': 'scrypt:32768:8:1$fnojZcyS1o2f9G00$bf337a31f6734070a518f85c31191da22cc01fedc7be3908985fac8980c95e39a0b2c26d21670fd6c65842cb047de24ba7cde373761aee7e31c755028ef47f64', 'role': 'Admin'}, {'email': 'u_11@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$JHcwdbEO9aLhrjnQ$61f3aee36c1590557a89da03cff3df77329eac7afb8fbf4d94ba893efbef3c14130b29f7224f3e7d7c2be1ee858a994d5bfdad94dd1ada1fdbb968429ffcd780', 'role': 'User'}, {'email': 'a_11@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$3UQwJoN4FVdUZaeZ$4fd44cf456e34c25d52862d8b6cd7315abd3d14afa47999057dc917fd333895171cc07b9c17d18c28bd6f515b4f8a964286cdd8fd8902d8975f552632b70d8e8', 'role': 'Admin'}, {'email': 'user-1@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$u4TnfKw54j5Lm21w$000fff8d38dfa7ca61d1e04de01a32b935e2a614d7c7af09004babdc67cfbf035c478a81d944d11329740a9c0a1d2da9ee814f8a44f74949b9c8878cece44934', 'role': 'User'}, {'email': 'admin-1@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$YNR9qZKrlCXReass$224caaf948ea92bd3aaa38eb1e25ed515ae4d6f376cbd519c4e992600d2f582ed59f9770e4627c279c79471884351f5eac80aff3cb7d6d6dc5aefe9710400a50', 'role': 'Admin'}, {'email': 'user-2@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$H3AeZ2Fd7Ob3Mul4$7d53b0872bb8c5d05646a535ebe972f28a1f21e6aceed4a588feddd2ba4c987729ee9eded4a86a14529c4761aa16b724ea14ffdbb7f2e0d2db3d5c5dae71f167', 'role': 'User'}, {'email': 'admin-2@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$yYw6sEB6wnBSARM0$e6285bd3c82d64c670eb5bc791734e1b7ed273e4cee2d6abb379204f469ff7b42a98be23921ac4c19c06b00eb7119d2745e48476877bebbb28abb04b9f9385c1', 'role': 'Admin'}, {'email': 'user_2@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$379aNtawvLC112eb$d00e2b9a4100b64b9c28f1332c571e4c0668db70fa8a9cbef9f00df4e2cec415328446a932a16166dc9af55f8aed188e60de300324f10773bdbe5a1ad0751fb4', 'role': 'User'}, {'email': 'user-4@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$377g2FehlHnjKdIo$bb420ea43bc385db8cdd7e137615c04efd93331255a05bc8a4662733ecbda21926408e12188bddfb86da16d13c2e8d6d9e5ee5cf8b6acf1c9173c0c7ed6fb0b6', 'role': 'User'}, {'email': 'nadim@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$pR7xUEz6qyHGpMSV$35db353a30145336aa78ca40e1911de5cbb52a537a084a6aa5861ffaa1d34c9e8b02fa34e51d4467bbea2ee19b530f6e3bbc2db54f01b0221b82f35077705d51', 'role': 'User'}, {'email': 'aa_nadim@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$itEpO5op2FVL47eU$fcbbc8fddab5306eec724b9ddd1e67f48737e0ca06afdef7a82a04ae06eee229f93069ef48a666b0f38244079e0941857d989130e0011c13440900aedcfa3468', 'role': 'Admin'}, {'email': 'akib@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$bIjPThEE4ivTEhY7$ae798efa5a7bfe81a81c1c96bfcef5cc4679d081069b693b19f5e2eac990e610f2a63f0a48ac78faf27ca5bff4d698f677c8d00343bd10ac57d2d6701072dd88', 'role': 'Admin'}, {'email': 'fahim@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$m7g0GGVuZumeECF0$691e9b5a81be2569a81f642d2535a65c3fa7309bd91df1e00c1da6f6fa3ebb2018423d075e1b3dcda7354e78af38bd99a9414ddf4e49b863288659a4d6853dcc', 'role': 'User'}, {'email': 'wasi@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$4x4hl6nWO9MpSJt7$da95162d18882044812f4cef6cd27b5f55a36bfb20db4367ce56376ce62f0d37084f15dae53679e68ba8c4c310d222f84de9ec7c1b2020e46511f0edffcf7e9a', 'role': 'Admin'}, {'email': 'dorjoy@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$uHa7OHJvrXBQMXtf$f61e0dfc467225dfa426af3e1c92fa09266265bba095a5b3418ded8da9fc5fd78d455d8773f4195e33d6d8554462d825f55ea7d2ad076346bd7a1f6a7a6d8f5a', 'role': 'User'}, {'email': 'admin_001@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$PSSU5zK8nWBO2ppr$f67215d1a0c53fe542e0bf087861e7459bcd30db1a76948d611836e54c2452bb2d909efef90f2243f1c935eb1f055cca46bf4a14d1660e0090f4e6c0db81541e', 'role': 'Admin'}, {'email': 'user_001@example.com', 'name': 'John Doe', 'password': 'scrypt:32768:8:1$y9Z8l15l4VA4fFZf$c1821b0889afa109effd0b501feb12b1a0a1832d6812f6021272ecc8d76b633a7a9df1c09e02d452c299f058ac211d537fbdc168000476162eb6751ce4c4ca12', 'role': 'User'}]
\ No newline at end of file